@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
 from Projects.models import Project
+from Tasks.models import Task
+from utils.instrumentation import InstrumentedSerializerMixin
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = [
@@ -17,7 +19,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     """Serializer for project detail view with nested tasks"""
 
     from Tasks.serializers import TaskSerializer
@@ -48,3 +50,16 @@ class UpdateProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = ["name", "description", "deadline"]
+
+
+class BoardQuerySerializer(serializers.Serializer):
+    """Query parameters of the board: the whole board, or one column's next page."""
+
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    cursor = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if "cursor" in attrs and "status" not in attrs:
+            raise serializers.ValidationError({"status": "Required with a cursor."})
+        return attrs
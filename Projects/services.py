@@ -1,15 +1,35 @@
+import base64
+import binascii
 import logging
+from typing import Optional
+from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q, Window
+from django.db.models.functions import RowNumber
 from Projects.models import Project
+from Tasks.models import Task
 from Workspaces.models import Workspace
 
 logger = logging.getLogger(__name__)
 
+# What a board card shows (Tasks.serializers.BoardTaskSerializer): no
+# descriptions, and only the ids of the assignees
+BOARD_TASK_FIELDS = ("id", "name", "status", "priority", "due_date", "position")
+
+
+def _board_tasks():
+    return Task.objects.only(*BOARD_TASK_FIELDS).prefetch_related(
+        Prefetch("assignees", queryset=get_user_model().objects.only("id"))
+    )
+
 
 def create_project_service(
     name: str, workspace_id: int, description: str = "", deadline=None
 ) -> Project:
-    logger.info(f"Creating project: {name} in workspace: {workspace_id}")
+    logger.info(
+        "Creating project",
+        extra={"project_name": name, "workspace_id": workspace_id},
+    )
     with transaction.atomic():
         try:
             workspace = Workspace.objects.get(id=workspace_id)
@@ -19,20 +39,23 @@ def create_project_service(
                 description=description,
                 deadline=deadline,
             )
-            logger.info(f"Project created successfully: {project.id}")
+            logger.info("Project created successfully", extra={"project_id": project.id})
             return project
         except Workspace.DoesNotExist:
-            logger.error(f"Cannot create project - Workspace not found: {workspace_id}")
+            logger.error(
+                "Cannot create project - Workspace not found",
+                extra={"workspace_id": workspace_id},
+            )
             raise
         except Exception as e:
-            logger.error(f"Error creating project: {str(e)}")
+            logger.error("Error creating project", extra={"error": str(e)})
             raise
 
 
 def update_project_service(
     project_id: int, name: str, description: str = "", deadline=None
 ) -> Project:
-    logger.info(f"Updating project: {project_id}")
+    logger.info("Updating project", extra={"project_id": project_id})
     with transaction.atomic():
         try:
             project = Project.objects.get(id=project_id)
@@ -40,52 +63,147 @@ def update_project_service(
             project.description = description
             project.deadline = deadline
             project.save()
-            logger.info(f"Project updated successfully: {project_id}")
+            logger.info("Project updated successfully", extra={"project_id": project_id})
             return project
         except Project.DoesNotExist:
-            logger.error(f"Cannot update - Project not found: {project_id}")
+            logger.error(
+                "Cannot update - Project not found", extra={"project_id": project_id}
+            )
             raise
         except Exception as e:
-            logger.error(f"Error updating project {project_id}: {str(e)}")
+            logger.error(
+                "Error updating project", extra={"project_id": project_id, "error": str(e)}
+            )
             raise
 
 
 def list_projects_service():
     logger.debug("Fetching all projects")
     projects = Project.objects.all()
-    logger.info("Projects retrieved successfully")
+    logger.info("Projects retrieved successfully", extra={"sampled": True})
     return projects
 
 
 def list_workspace_projects_service(workspace_id: int):
-    logger.debug(f"Fetching projects for workspace: {workspace_id}")
+    logger.debug("Fetching projects for workspace", extra={"workspace_id": workspace_id})
     projects = Project.objects.filter(workspace_id=workspace_id)
-    logger.info(f"Projects retrieved successfully for workspace: {workspace_id}")
+    logger.info(
+        "Projects retrieved successfully for workspace",
+        extra={"workspace_id": workspace_id, "sampled": True},
+    )
     return projects
 
 
 def get_project_by_id_service(project_id: int) -> Project:
-    logger.debug(f"Fetching project by id: {project_id}")
+    logger.debug("Fetching project by id", extra={"project_id": project_id})
     try:
-        project = Project.objects.get(id=project_id)
-        logger.info(f"Project found: {project_id}")
+        project = Project.objects.prefetch_related("tasks__assignees").get(id=project_id)
+        logger.info("Project found", extra={"project_id": project_id, "sampled": True})
         return project
     except Project.DoesNotExist:
-        logger.error(f"Project not found: {project_id}")
+        logger.error("Project not found", extra={"project_id": project_id})
         raise
 
 
 def delete_project_service(project_id: int) -> bool:
-    logger.warning(f"Deleting project: {project_id}")
+    logger.warning("Deleting project", extra={"project_id": project_id})
     with transaction.atomic():
         try:
             project = Project.objects.get(id=project_id)
             project.delete()
-            logger.info(f"Project deleted successfully: {project_id}")
+            logger.info("Project deleted successfully", extra={"project_id": project_id})
             return True
         except Project.DoesNotExist:
-            logger.error(f"Cannot delete - Project not found: {project_id}")
+            logger.error(
+                "Cannot delete - Project not found", extra={"project_id": project_id}
+            )
             raise
         except Exception as e:
-            logger.error(f"Error deleting project {project_id}: {str(e)}")
+            logger.error(
+                "Error deleting project", extra={"project_id": project_id, "error": str(e)}
+            )
             raise
+
+
+def encode_board_cursor(task: Task) -> str:
+    """Opaque "load more" cursor: the (position, id) of the last task sent."""
+    return base64.urlsafe_b64encode(f"{task.position}.{task.id}".encode()).decode()
+
+
+def decode_board_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        position, _, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().rpartition(".")
+        return position, int(task_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def get_project_board_service(project_id: int, limit: int) -> list[dict]:
+    """
+    The first ``limit`` tasks of every status column of a project, in board
+    order, with the number of tasks in each column.
+
+    One window query ranks the tasks within their column and keeps the
+    first ``limit`` of each; the column totals come from the same query.
+    Returns one ``{"status", "total", "tasks"}`` dict per ``Task.Status``,
+    empty columns included.
+    """
+    logger.debug("Fetching project board", extra={"project_id": project_id, "limit": limit})
+    try:
+        project = Project.objects.only("id").get(id=project_id)
+    except Project.DoesNotExist:
+        logger.error("Project not found", extra={"project_id": project_id})
+        raise
+    column = {"partition_by": [F("status")]}
+    tasks = (
+        _board_tasks()
+        .filter(project=project)
+        .annotate(
+            row=Window(RowNumber(), order_by=[F("position").asc(), F("id").asc()], **column),
+            column_total=Window(Count("id"), **column),
+        )
+        .filter(row__lte=limit)
+        .order_by("status", "row")
+    )
+    columns = {status: {"status": status, "total": 0, "tasks": []} for status in Task.Status}
+    for task in tasks:
+        columns[task.status]["total"] = task.column_total
+        columns[task.status]["tasks"].append(task)
+    logger.info(
+        "Project board retrieved successfully",
+        extra={"project_id": project_id, "sampled": True},
+    )
+    return list(columns.values())
+
+
+def list_board_column_service(
+    project_id: int, status: str, limit: int, cursor: Optional[str] = None
+) -> tuple[list[Task], bool]:
+    """
+    The next ``limit`` tasks of one board column after ``cursor`` (from the
+    start without one), and whether more follow.
+
+    Keyset pagination on (position, id), read from the column index, so a
+    page costs the same however deep it is. Raises ``Project.DoesNotExist``
+    for an unknown project.
+    """
+    logger.debug(
+        "Fetching board column",
+        extra={"project_id": project_id, "status": status, "limit": limit},
+    )
+    try:
+        project = Project.objects.only("id").get(id=project_id)
+    except Project.DoesNotExist:
+        logger.error("Project not found", extra={"project_id": project_id})
+        raise
+    tasks = _board_tasks().filter(project=project, status=status)
+    if cursor:
+        position, task_id = decode_board_cursor(cursor)
+        tasks = tasks.filter(Q(position__gt=position) | Q(position=position, id__gt=task_id))
+    # One extra row tells whether there is a next page
+    page = list(tasks.order_by("position", "id")[: limit + 1])
+    logger.info(
+        "Board column retrieved successfully",
+        extra={"project_id": project_id, "status": status, "sampled": True},
+    )
+    return page[:limit], len(page) > limit
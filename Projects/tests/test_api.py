@@ -8,6 +8,7 @@ from django.utils import timezone
 from datetime import timedelta
 from rest_framework import status
 from Projects.models import Project
+from Tasks.models import Task
 
 pytestmark = pytest.mark.django_db
 
@@ -255,3 +256,87 @@ class TestDeleteProjectAPI:
         response = authenticated_client.delete(url)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.integration
+class TestProjectBoardAPI:
+    """Test cases for project board endpoint."""
+
+    def test_board_columns(self, authenticated_client, project_factory, task_factory):
+        """Test the board lists every status column with a page of cards and a total."""
+        project = project_factory()
+        tasks = task_factory.create_batch(3, project=project)
+        url = reverse("project_board", kwargs={"project_id": project.id})
+
+        response = authenticated_client.get(url, {"limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        columns = response.data["data"]["columns"]
+        assert [column["status"] for column in columns] == ["todo", "in_progress", "done"]
+        todo = columns[0]
+        assert todo["total"] == 3
+        assert [card["id"] for card in todo["tasks"]] == [tasks[0].id, tasks[1].id]
+        assert "description" not in todo["tasks"][0]
+        assert todo["next_cursor"] is not None
+        assert columns[1] == {
+            "status": "in_progress", "total": 0, "tasks": [], "next_cursor": None
+        }
+
+    def test_load_more(self, authenticated_client, project_factory, task_factory):
+        """Test the next cursor of a column returns the rest of that column."""
+        project = project_factory()
+        tasks = task_factory.create_batch(3, project=project)
+        task_factory(project=project, status=Task.Status.DONE)
+        url = reverse("project_board", kwargs={"project_id": project.id})
+        cursor = authenticated_client.get(url, {"limit": 2}).data["data"]["columns"][0][
+            "next_cursor"
+        ]
+
+        response = authenticated_client.get(
+            url, {"status": "todo", "cursor": cursor, "limit": 2}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [card["id"] for card in response.data["data"]["tasks"]] == [tasks[2].id]
+        assert response.data["data"]["next_cursor"] is None
+
+    def test_cursor_requires_status(self, authenticated_client, project_factory):
+        """Test a cursor without the column it belongs to fails validation."""
+        url = reverse("project_board", kwargs={"project_id": project_factory().id})
+
+        response = authenticated_client.get(url, {"cursor": "aTAuMQ=="})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "status" in response.data["errors"]
+
+    def test_invalid_limit(self, authenticated_client, project_factory):
+        """Test limits outside 1..100 fail validation."""
+        url = reverse("project_board", kwargs={"project_id": project_factory().id})
+
+        response = authenticated_client.get(url, {"limit": 1000})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_board_nonexistent_project(self, authenticated_client):
+        """Test retrieving the board of a nonexistent project."""
+        url = reverse("project_board", kwargs={"project_id": 9999})
+
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_load_more_nonexistent_project(self, authenticated_client):
+        """Test loading more of a column of a nonexistent project."""
+        url = reverse("project_board", kwargs={"project_id": 9999})
+
+        response = authenticated_client.get(url, {"status": "todo"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_board_unauthenticated(self, api_client, project_factory):
+        """Test retrieving a board fails without authentication."""
+        url = reverse("project_board", kwargs={"project_id": project_factory().id})
+
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -13,7 +13,13 @@ from Projects.services import (
     list_workspace_projects_service,
     get_project_by_id_service,
     delete_project_service,
+    encode_board_cursor,
+    get_project_board_service,
+    list_board_column_service,
 )
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from Tasks.models import Task
 
 pytestmark = pytest.mark.django_db
 
@@ -179,3 +185,59 @@ class TestDeleteProjectService:
         """Test deleting nonexistent project raises error."""
         with pytest.raises(Project.DoesNotExist):
             delete_project_service(9999)
+
+
+@pytest.mark.unit
+class TestProjectBoardServices:
+    """Test cases for get_project_board_service and list_board_column_service."""
+
+    def test_board_returns_first_tasks_and_totals_per_column(
+        self, project_factory, task_factory
+    ):
+        """Test each column holds its first tasks in position order and its full count."""
+        project = project_factory()
+        todo = task_factory.create_batch(4, project=project)
+        done = task_factory.create_batch(2, project=project, status=Task.Status.DONE)
+        task_factory.create_batch(3, project=project_factory())
+        Task.objects.filter(id=todo[3].id).update(position="h0")  # moved to the top
+
+        with CaptureQueriesContext(connection) as queries:
+            columns = get_project_board_service(project.id, limit=3)
+
+        # Project, one window query for every column, assignees
+        assert len(queries) == 3
+        assert "ROW_NUMBER() OVER (PARTITION BY" in queries[1]["sql"]
+        assert [column["status"] for column in columns] == list(Task.Status)
+        by_status = {column["status"]: column for column in columns}
+        assert by_status["todo"]["total"] == 4
+        assert [t.id for t in by_status["todo"]["tasks"]] == [todo[3].id, todo[0].id, todo[1].id]
+        assert by_status["in_progress"] == {"status": "in_progress", "total": 0, "tasks": []}
+        assert [t.id for t in by_status["done"]["tasks"]] == [t.id for t in done]
+
+    def test_board_of_missing_project(self):
+        """Test a board of a nonexistent project raises error."""
+        with pytest.raises(Project.DoesNotExist):
+            get_project_board_service(9999, limit=3)
+
+    def test_column_pages_follow_the_cursor(self, project_factory, task_factory):
+        """Test loading more walks a column page by page without repeats."""
+        project = project_factory()
+        tasks = task_factory.create_batch(5, project=project)
+
+        first, more = list_board_column_service(project.id, Task.Status.TODO, limit=2)
+        second, _ = list_board_column_service(
+            project.id, Task.Status.TODO, limit=2, cursor=encode_board_cursor(first[-1])
+        )
+        last, no_more = list_board_column_service(
+            project.id, Task.Status.TODO, limit=2, cursor=encode_board_cursor(second[-1])
+        )
+
+        assert more and not no_more
+        assert [t.id for t in first + second + last] == [t.id for t in tasks]
+
+    def test_invalid_cursor(self, project_factory):
+        """Test a cursor that does not decode raises ValueError."""
+        with pytest.raises(ValueError):
+            list_board_column_service(
+                project_factory().id, Task.Status.TODO, limit=2, cursor="not-a-cursor"
+            )
@@ -5,6 +5,7 @@ urlpatterns = [
     path("", views.project_list, name="project_list"),
     path("create/", views.create_project, name="create_project"),
     path("<int:project_id>/", views.project_detail, name="project_detail"),
+    path("<int:project_id>/board/", views.project_board, name="project_board"),
     path("<int:project_id>/update/", views.update_project, name="update_project"),
     path("<int:project_id>/delete/", views.delete_project, name="delete_project"),
 ]
@@ -1,5 +1,5 @@
 import logging
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.request import Request
@@ -9,6 +9,7 @@ from typing import Any, cast
 logger = logging.getLogger(__name__)
 
 from Projects.serializers import (
+    BoardQuerySerializer,
     CreateProjectSerializer,
     ProjectSerializer,
     ProjectDetailSerializer,
@@ -17,38 +18,52 @@ from Projects.serializers import (
 from Projects.services import (
     create_project_service,
     delete_project_service,
+    encode_board_cursor,
+    get_project_board_service,
     get_project_by_id_service,
+    list_board_column_service,
     list_projects_service,
     list_workspace_projects_service,
     update_project_service,
 )
+from Projects.models import Project
+from Tasks.serializers import BoardTaskSerializer
+from utils.idempotency import idempotent
+from utils.instrumentation import query_budget
 from utils.responses import success_response, error_response, validation_error_response
+from utils.throttling import LIST_THROTTLES
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@throttle_classes(LIST_THROTTLES)
 def project_list(request: Request) -> Response:
     workspace_id = request.query_params.get("workspace_id")
     logger.debug(
-        f"Project list requested by user: {request.user.id}, workspace_id: {workspace_id}"
+        "Project list requested",
+        extra={"user_id": request.user.id, "workspace_id": workspace_id},
     )
     if workspace_id:
         projects = list_workspace_projects_service(int(workspace_id))
     else:
         projects = list_projects_service()
-    serializer = ProjectSerializer(projects, many=True)
-    logger.info(f"Retrieved {len(projects)} projects")
+    data = ProjectSerializer(projects, many=True).data
+    logger.info("Retrieved projects", extra={"count": len(data), "sampled": True})
     return success_response(
-        data=serializer.data,
+        data=data,
         message="Projects retrieved successfully",
     )
 
 
+@query_budget(6)
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent
 def create_project(request: Request) -> Response:
     logger.info(
-        f"Create project request by user: {request.user.id} - name: {request.data.get('name')}"
+        "Create project request",
+        extra={"user_id": request.user.id, "project_name": request.data.get("name")},
     )
     serializer = CreateProjectSerializer(data=request.data)
     if serializer.is_valid():
@@ -62,7 +77,8 @@ def create_project(request: Request) -> Response:
             )
             response_serializer = ProjectSerializer(project)
             logger.info(
-                f"Project created successfully: {project.id} by user: {request.user.id}"
+                "Project created successfully",
+                extra={"project_id": project.id, "user_id": request.user.id},
             )
             return success_response(
                 data=response_serializer.data,
@@ -70,32 +86,40 @@ def create_project(request: Request) -> Response:
                 status_code=status.HTTP_201_CREATED,
             )
         except Exception as e:
-            logger.error(f"Failed to create project - Error: {str(e)}")
+            logger.error("Failed to create project", extra={"error": str(e)})
             return error_response(
                 message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
-    logger.warning(f"Create project validation failed: {serializer.errors}")
+    logger.warning(
+        "Create project validation failed", extra={"errors": serializer.errors}
+    )
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(4)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def project_detail(request: Request, project_id: int) -> Response:
     logger.debug(
-        f"Project detail requested for project_id: {project_id} by user: {request.user.id}"
+        "Project detail requested",
+        extra={"project_id": project_id, "user_id": request.user.id},
     )
     try:
         project = get_project_by_id_service(project_id)
         serializer = ProjectDetailSerializer(project)
-        logger.info(f"Project detail retrieved successfully: {project_id}")
+        logger.info(
+            "Project detail retrieved successfully",
+            extra={"project_id": project_id, "sampled": True},
+        )
         return success_response(
             data=serializer.data,
             message="Project retrieved successfully",
         )
     except Exception as e:
         logger.error(
-            f"Failed to retrieve project detail for project_id: {project_id} - Error: {str(e)}"
+            "Failed to retrieve project detail",
+            extra={"project_id": project_id, "error": str(e)},
         )
         return error_response(
             message=str(e),
@@ -103,11 +127,84 @@ def project_detail(request: Request, project_id: int) -> Response:
         )
 
 
+@query_budget(4)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@throttle_classes(LIST_THROTTLES)
+def project_board(request: Request, project_id: int) -> Response:
+    query = BoardQuerySerializer(data=request.query_params)
+    if not query.is_valid():
+        logger.warning(
+            "Project board validation failed",
+            extra={"project_id": project_id, "errors": query.errors},
+        )
+        return validation_error_response(errors=query.errors)
+    params = cast(dict[str, Any], query.validated_data)
+    logger.debug(
+        "Project board requested",
+        extra={
+            "project_id": project_id,
+            "user_id": request.user.id,
+            "column": params.get("status"),
+        },
+    )
+
+    if "status" in params:
+        # "Load more" of one column
+        try:
+            tasks, more = list_board_column_service(
+                project_id, params["status"], params["limit"], params.get("cursor")
+            )
+        except Project.DoesNotExist:
+            return error_response(
+                message="Project not found",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+        except ValueError as e:
+            return error_response(message=str(e), status_code=status.HTTP_400_BAD_REQUEST)
+        return success_response(
+            data={
+                "status": params["status"],
+                "tasks": BoardTaskSerializer(tasks, many=True).data,
+                "next_cursor": encode_board_cursor(tasks[-1]) if more else None,
+            },
+            message="Board column retrieved successfully",
+        )
+
+    try:
+        columns = get_project_board_service(project_id, params["limit"])
+    except Project.DoesNotExist:
+        return error_response(
+            message="Project not found",
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    data = [
+        {
+            "status": column["status"],
+            "total": column["total"],
+            "tasks": BoardTaskSerializer(column["tasks"], many=True).data,
+            "next_cursor": (
+                encode_board_cursor(column["tasks"][-1])
+                if column["total"] > len(column["tasks"])
+                else None
+            ),
+        }
+        for column in columns
+    ]
+    logger.info("Retrieved project board", extra={"project_id": project_id, "sampled": True})
+    return success_response(
+        data={"project": project_id, "columns": data},
+        message="Board retrieved successfully",
+    )
+
+
+@query_budget(5)
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_project(request: Request, project_id: int) -> Response:
     logger.info(
-        f"Update project request for project_id: {project_id} by user: {request.user.id}"
+        "Update project request",
+        extra={"project_id": project_id, "user_id": request.user.id},
     )
     serializer = UpdateProjectSerializer(data=request.data)
     if serializer.is_valid():
@@ -120,45 +217,53 @@ def update_project(request: Request, project_id: int) -> Response:
                 deadline=data.get("deadline"),
             )
             response_serializer = ProjectSerializer(project)
-            logger.info(f"Project updated successfully: {project_id}")
+            logger.info("Project updated successfully", extra={"project_id": project_id})
             return success_response(
                 data=response_serializer.data,
                 message="Project updated successfully",
             )
         except Exception as e:
-            logger.error(f"Failed to update project {project_id} - Error: {str(e)}")
+            logger.error(
+                "Failed to update project",
+                extra={"project_id": project_id, "error": str(e)},
+            )
             return error_response(
                 message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     logger.warning(
-        f"Update project validation failed for project_id: {project_id} - Errors: {serializer.errors}"
+        "Update project validation failed",
+        extra={"project_id": project_id, "errors": serializer.errors},
     )
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(6)
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_project(request: Request, project_id: int) -> Response:
     logger.warning(
-        f"Delete project request for project_id: {project_id} by user: {request.user.id}"
+        "Delete project request",
+        extra={"project_id": project_id, "user_id": request.user.id},
     )
     try:
         success = delete_project_service(project_id)
         if success:
-            logger.info(f"Project deleted successfully: {project_id}")
+            logger.info("Project deleted successfully", extra={"project_id": project_id})
             return success_response(
                 message="Project deleted successfully",
                 status_code=status.HTTP_200_OK,
             )
         else:
-            logger.error(f"Failed to delete project: {project_id}")
+            logger.error("Failed to delete project", extra={"project_id": project_id})
             return error_response(
                 message="Failed to delete project",
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     except Exception as e:
-        logger.error(f"Error deleting project {project_id} - Error: {str(e)}")
+        logger.error(
+            "Error deleting project", extra={"project_id": project_id, "error": str(e)}
+        )
         return error_response(
             message=str(e),
             status_code=status.HTTP_400_BAD_REQUEST,
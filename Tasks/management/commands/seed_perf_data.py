@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from time import perf_counter
+
+from utils.seeding import SEED_PASSWORD, seed_dataset
+
+
+class Command(BaseCommand):
+    help = 'Seed a large synthetic dataset for performance testing (bulk inserts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of users')
+        parser.add_argument('--workspaces', type=int, default=100, help='Number of workspaces')
+        parser.add_argument('--projects-per', type=int, default=10, help='Projects per workspace')
+        parser.add_argument(
+            '--tasks-per', type=int, default=100, help='Average tasks per project'
+        )
+        parser.add_argument(
+            '--assignees-per', type=int, default=2, help='Average assignees per task'
+        )
+        parser.add_argument(
+            '--members-per', type=int, default=10, help='Members per workspace'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000, help='Rows per INSERT statement'
+        )
+        parser.add_argument(
+            '--prefix', default='perf', help='Username prefix of the seeded users'
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if get_user_model().objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Users starting with "{prefix}" already exist; '
+                'use another --prefix or an empty database'
+            )
+        for name in ('users', 'workspaces', 'projects_per', 'tasks_per', 'chunk_size'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} must be at least 1')
+
+        total = options['workspaces'] * options['projects_per'] * options['tasks_per']
+        self.stdout.write(self.style.WARNING('\n' + '=' * 60))
+        self.stdout.write(self.style.WARNING('🌱 Seeding performance dataset'))
+        self.stdout.write(self.style.WARNING('=' * 60 + '\n'))
+        self.stdout.write(
+            f'{options["users"]:,} users, {options["workspaces"]:,} workspaces, '
+            f'{options["workspaces"] * options["projects_per"]:,} projects, '
+            f'{total:,} tasks (seed {options["seed"]})\n'
+        )
+
+        started = perf_counter()
+        summary = seed_dataset(
+            users=options['users'],
+            workspaces=options['workspaces'],
+            projects_per=options['projects_per'],
+            tasks_per=options['tasks_per'],
+            assignees_per=options['assignees_per'],
+            members_per=options['members_per'],
+            seed=options['seed'],
+            chunk_size=options['chunk_size'],
+            prefix=prefix,
+            progress=self._progress_reporter(started),
+        )
+
+        self.stdout.write(self.style.WARNING('\n' + '=' * 60))
+        self.stdout.write(self.style.WARNING('📋 Seed Summary'))
+        self.stdout.write(self.style.WARNING('=' * 60))
+        self.stdout.write(f'\n👤 Users: {summary.users:,}')
+        self.stdout.write(f'🏢 Workspaces: {summary.workspaces:,}')
+        self.stdout.write(f'📁 Projects: {summary.projects:,}')
+        self.stdout.write(f'✅ Tasks: {summary.tasks:,}')
+        self.stdout.write(f'🔗 Assignments: {summary.assignments:,}')
+        self.stdout.write(
+            f'⏱️  {summary.seconds:.1f}s ({summary.tasks / summary.seconds:,.0f} tasks/s)\n'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n🔑 Log in as {prefix}0 ... {prefix}{summary.users - 1} '
+                f'with password "{SEED_PASSWORD}"\n'
+            )
+        )
+
+    def _progress_reporter(self, started):
+        # Print each stage at most every 5%, plus when it completes.
+        last_step = {}
+
+        def report(stage, done, total):
+            step = done * 20 // total
+            if last_step.get(stage) == step and done != total:
+                return
+            last_step[stage] = step
+            elapsed = perf_counter() - started
+            self.stdout.write(
+                f'   {stage:<12} {done:>12,} / {total:,} ({done * 100 // total:>3}%)  {elapsed:7.1f}s'
+            )
+
+        return report
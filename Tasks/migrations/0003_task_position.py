@@ -0,0 +1,46 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+from utils.fractional_index import integer_key
+
+
+def number_existing_tasks(apps, schema_editor):
+    # Existing columns keep their creation order
+    Task = apps.get_model("Tasks", "Task")
+    tasks = Task.objects.order_by("project_id", "status", "id").values_list(
+        "id", "project_id", "status"
+    )
+    batch, column, index = [], None, 0
+    for task_id, project_id, status in tasks.iterator(chunk_size=2000):
+        if (project_id, status) != column:
+            column, index = (project_id, status), 0
+        batch.append(Task(id=task_id, position=integer_key(index)))
+        index += 1
+        if len(batch) == 1000:
+            Task.objects.bulk_update(batch, ["position"])
+            batch = []
+    Task.objects.bulk_update(batch, ["position"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Projects', '0003_alter_project_table'),
+        ('Tasks', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(number_existing_tasks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', 'position', 'id'], name='task_column_order_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 
 from Projects.models import Project
+from utils.fractional_index import key_between
 
 
 # Create your models here.
@@ -34,8 +35,35 @@ class Task(models.Model):
         max_length=50, choices=Priority.choices, default=Priority.MEDIUM
     )
     due_date = models.DateTimeField(blank=True, null=True)
+    # Order within the (project, status) column: a fractional index key (see
+    # utils.fractional_index), so a move rewrites only the moved task.
+    position = models.CharField(max_length=255, default="", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Board columns: filter by project and status, read in position
+            # order (id breaks ties between concurrently created tasks)
+            models.Index(
+                fields=["project", "status", "position", "id"], name="task_column_order_idx"
+            ),
+        ]
+
+    @classmethod
+    def end_of_column(cls, project_id: int, status: str) -> str:
+        """A position after every task of the column."""
+        last = cls.objects.filter(project_id=project_id, status=status).aggregate(
+            last=models.Max("position")
+        )["last"]
+        return key_between(last or None, None)
+
+    def save(self, *args, **kwargs):
+        # Tasks created outside the services (admin, shell) go to the end of
+        # their column; bulk_create skips this and must set position itself.
+        if not self.position:
+            self.position = self.end_of_column(self.project_id, self.status)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} | {self.project.name} | {self.project.workspace.name} | {self.author.username if self.author else 'No Author'}"
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
 from Tasks.models import Task
+from utils.instrumentation import InstrumentedSerializerMixin
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = [
@@ -16,11 +17,28 @@ class TaskSerializer(serializers.ModelSerializer):
             "status",
             "priority",
             "due_date",
+            "position",
             "created_at",
             "updated_at",
         ]
 
 
+class BoardTaskSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    """The fields a board card shows; the full task comes from task_detail."""
+
+    class Meta:
+        model = Task
+        fields = [
+            "id",
+            "name",
+            "status",
+            "priority",
+            "due_date",
+            "position",
+            "assignees",
+        ]
+
+
 class CreateTaskSerializer(serializers.ModelSerializer):
     assignee_ids = serializers.ListField(
         child=serializers.IntegerField(), required=False, write_only=True
@@ -54,3 +72,11 @@ class UpdateTaskSerializer(serializers.ModelSerializer):
             "due_date",
             "assignee_ids",
         ]
+
+
+class MoveTaskSerializer(serializers.Serializer):
+    """Where to put a task: a column and the tasks it goes between."""
+
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    after_id = serializers.IntegerField(required=False, allow_null=True)
+    before_id = serializers.IntegerField(required=False, allow_null=True)
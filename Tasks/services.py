@@ -1,10 +1,17 @@
 import logging
+from functools import partial
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Max
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from Tasks.models import Task
 from Projects.models import Project
 from typing import Optional
 
+from utils.fractional_index import integer_key, key_between
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,7 +26,8 @@ def create_task_service(
     assignee_ids: Optional[list[int]] = None,
 ) -> Task:
     logger.info(
-        f"Creating task: {name} in project: {project_id} by author: {author.id}"
+        "Creating task",
+        extra={"task_name": name, "project_id": project_id, "author_id": author.id},
     )
     with transaction.atomic():
         try:
@@ -32,17 +40,23 @@ def create_task_service(
                 status=status,
                 priority=priority,
                 due_date=due_date,
+                position=Task.end_of_column(project.id, status),
             )
             if assignee_ids:
-                logger.debug(f"Assigning task {task.id} to users: {assignee_ids}")
+                logger.debug(
+                    "Assigning task",
+                    extra={"task_id": task.id, "assignee_ids": assignee_ids},
+                )
                 task.assignees.set(assignee_ids)
-            logger.info(f"Task created successfully: {task.id}")
+            logger.info("Task created successfully", extra={"task_id": task.id})
             return task
         except Project.DoesNotExist:
-            logger.error(f"Cannot create task - Project not found: {project_id}")
+            logger.error(
+                "Cannot create task - Project not found", extra={"project_id": project_id}
+            )
             raise
         except Exception as e:
-            logger.error(f"Error creating task: {str(e)}")
+            logger.error("Error creating task", extra={"error": str(e)})
             raise
 
 
@@ -55,72 +69,243 @@ def update_task_service(
     due_date=None,
     assignee_ids: Optional[list[int]] = None,
 ) -> Task:
-    logger.info(f"Updating task: {task_id}")
+    logger.info("Updating task", extra={"task_id": task_id})
     with transaction.atomic():
         try:
             task = Task.objects.get(id=task_id)
+            if status != task.status:
+                task.position = Task.end_of_column(task.project_id, status)
             task.name = name
             task.description = description
             task.status = status
             task.priority = priority
             task.due_date = due_date
             if assignee_ids is not None:
-                logger.debug(f"Updating assignees for task {task_id}: {assignee_ids}")
+                logger.debug(
+                    "Updating assignees",
+                    extra={"task_id": task_id, "assignee_ids": assignee_ids},
+                )
                 task.assignees.set(assignee_ids)
             task.save()
-            logger.info(f"Task updated successfully: {task_id}")
+            logger.info("Task updated successfully", extra={"task_id": task_id})
             return task
         except Task.DoesNotExist:
-            logger.error(f"Cannot update - Task not found: {task_id}")
+            logger.error("Cannot update - Task not found", extra={"task_id": task_id})
             raise
         except Exception as e:
-            logger.error(f"Error updating task {task_id}: {str(e)}")
+            logger.error(
+                "Error updating task", extra={"task_id": task_id, "error": str(e)}
+            )
             raise
 
 
 def list_tasks_service():
     logger.debug("Fetching all tasks")
-    tasks = Task.objects.all()
-    logger.info("Tasks retrieved successfully")
+    tasks = Task.objects.prefetch_related("assignees")
+    logger.info("Tasks retrieved successfully", extra={"sampled": True})
     return tasks
 
 
 def list_project_tasks_service(project_id: int):
-    logger.debug(f"Fetching tasks for project: {project_id}")
-    tasks = Task.objects.filter(project_id=project_id)
-    logger.info(f"Tasks retrieved successfully for project: {project_id}")
+    logger.debug("Fetching tasks for project", extra={"project_id": project_id})
+    tasks = Task.objects.filter(project_id=project_id).prefetch_related("assignees")
+    logger.info(
+        "Tasks retrieved successfully for project",
+        extra={"project_id": project_id, "sampled": True},
+    )
     return tasks
 
 
 def list_user_tasks_service(user: AbstractUser):
-    logger.debug(f"Fetching tasks for user: {user.id}")
-    tasks = Task.objects.filter(assignees=user)
-    logger.info(f"Tasks retrieved successfully for user: {user.id}")
+    logger.debug("Fetching tasks for user", extra={"user_id": user.id})
+    tasks = Task.objects.filter(assignees=user).prefetch_related("assignees")
+    logger.info(
+        "Tasks retrieved successfully for user",
+        extra={"user_id": user.id, "sampled": True},
+    )
     return tasks
 
 
 def get_task_by_id_service(task_id: int) -> Task:
-    logger.debug(f"Fetching task by id: {task_id}")
+    logger.debug("Fetching task by id", extra={"task_id": task_id})
     try:
         task = Task.objects.get(id=task_id)
-        logger.info(f"Task found: {task_id}")
+        logger.info("Task found", extra={"task_id": task_id, "sampled": True})
         return task
     except Task.DoesNotExist:
-        logger.error(f"Task not found: {task_id}")
+        logger.error("Task not found", extra={"task_id": task_id})
         raise
 
 
 def delete_task_service(task_id: int) -> bool:
-    logger.warning(f"Deleting task: {task_id}")
+    logger.warning("Deleting task", extra={"task_id": task_id})
     with transaction.atomic():
         try:
             task = Task.objects.get(id=task_id)
             task.delete()
-            logger.info(f"Task deleted successfully: {task_id}")
+            logger.info("Task deleted successfully", extra={"task_id": task_id})
             return True
         except Task.DoesNotExist:
-            logger.error(f"Cannot delete - Task not found: {task_id}")
+            logger.error("Cannot delete - Task not found", extra={"task_id": task_id})
             raise
         except Exception as e:
-            logger.error(f"Error deleting task {task_id}: {str(e)}")
+            logger.error(
+                "Error deleting task", extra={"task_id": task_id, "error": str(e)}
+            )
             raise
+
+
+def _neighbour_positions(
+    task: Task, status: str, after_id: Optional[int], before_id: Optional[int]
+) -> Optional[tuple[Optional[str], Optional[str]]]:
+    """
+    Positions of the tasks ``task`` goes between in the ``status`` column,
+    or None when a neighbour shares its key with another task (tasks created
+    concurrently) or has none (created by bulk_create) and the column must
+    be renumbered first.
+
+    A neighbour that is not given is the one next to the other (the end of
+    the column when neither is). Given neighbours are locked, so a
+    concurrent rebalance cannot renumber them under this move.
+    """
+    column = Task.objects.filter(project_id=task.project_id, status=status).exclude(id=task.id)
+    given = [task_id for task_id in (after_id, before_id) if task_id is not None]
+    found = dict(
+        column.filter(id__in=given).select_for_update().values_list("id", "position")
+    )
+    if len(found) != len(given):
+        raise ValueError("Neighbour tasks must be in the same project and target column")
+    if "" in found.values():
+        # Created without a position (bulk_create): no key sorts before it
+        return None
+    after, before = found.get(after_id), found.get(before_id)
+    if after_id is None and before_id is None:
+        after = column.aggregate(last=Max("position"))["last"] or None
+    elif before_id is None:
+        # The next task, or a twin of after_id (same key): no room after it
+        before = (
+            column.filter(position__gte=after)
+            .exclude(id=after_id)
+            .order_by("position", "id")
+            .values_list("position", flat=True)
+            .first()
+        )
+        if before == after:
+            return None
+    elif after_id is None:
+        after = (
+            column.filter(position__lte=before)
+            .exclude(id=before_id)
+            .order_by("-position", "-id")
+            .values_list("position", flat=True)
+            .first()
+        )
+        if after == before or after == "":
+            return None
+    elif after > before:
+        raise ValueError("after_id must come before before_id in the column")
+    elif after == before:
+        return None
+    return after, before
+
+
+def move_task_service(
+    task_id: int,
+    status: Optional[str] = None,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+) -> Task:
+    """
+    Move a task to ``status`` (default: its own column), between the tasks
+    ``after_id`` and ``before_id``.
+
+    Only the moved task's row is written: it gets a fractional index key
+    between its new neighbours. When that key is longer than
+    ``TASK_POSITION_REBALANCE_LENGTH`` the column is renumbered synchronously
+    after commit, so the (rare) request that triggers it also pays for
+    rewriting the column.
+    """
+    logger.info(
+        "Moving task",
+        extra={"task_id": task_id, "status": status, "after_id": after_id, "before_id": before_id},
+    )
+    with transaction.atomic():
+        try:
+            task = Task.objects.select_for_update().get(id=task_id)
+            status = status or task.status
+            positions = _neighbour_positions(task, status, after_id, before_id)
+            if positions is None:
+                # Tied keys: renumber (under the column's row locks), then retry
+                _rebalance_column(task.project_id, status)
+                positions = _neighbour_positions(task, status, after_id, before_id)
+            after, before = positions
+            task.status = status
+            task.position = key_between(after, before)
+            task.updated_at = timezone.now()
+            Task.objects.filter(id=task.id).update(
+                status=task.status, position=task.position, updated_at=task.updated_at
+            )
+            if len(task.position) > settings.TASK_POSITION_REBALANCE_LENGTH:
+                transaction.on_commit(
+                    partial(rebalance_column_once, task.project_id, status)
+                )
+            logger.info(
+                "Task moved successfully",
+                extra={"task_id": task_id, "position": task.position},
+            )
+            return task
+        except Task.DoesNotExist:
+            logger.error("Cannot move - Task not found", extra={"task_id": task_id})
+            raise
+        except Exception as e:
+            logger.error("Error moving task", extra={"task_id": task_id, "error": str(e)})
+            raise
+
+
+def column_positions(count: int) -> list[str]:
+    """The shortest evenly spaced position keys for a column of ``count`` tasks."""
+    return [integer_key(index) for index in range(count)]
+
+
+def _rebalance_lock_key(project_id: int, status: str) -> str:
+    return f"tasks:rebalance:{project_id}:{status}"
+
+
+def rebalance_column_once(project_id: int, status: str) -> None:
+    """
+    Renumber a column (after the move that lengthened its keys commits),
+    skipping it while another request is already renumbering that column.
+    """
+    lock_key = _rebalance_lock_key(project_id, status)
+    if not cache.add(lock_key, True, 300):
+        return
+    try:
+        _rebalance_column(project_id, status)
+    finally:
+        cache.delete(lock_key)
+
+
+def _rebalance_column(project_id: int, status: str) -> int:
+    """
+    Give every task of a column a short, evenly spaced position, keeping
+    the current order. Returns the number of rows rewritten.
+    """
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.filter(project_id=project_id, status=status)
+            .select_for_update()
+            .order_by("position", "id")
+            .only("id", "position")
+        )
+        positions = column_positions(len(tasks))
+        changed = []
+        for task, position in zip(tasks, positions):
+            if task.position != position:
+                task.position = position
+                changed.append(task)
+        Task.objects.bulk_update(changed, ["position"], batch_size=500)
+    logger.info(
+        "Column rebalanced",
+        extra={"project_id": project_id, "status": status, "updated": len(changed)},
+    )
+    return len(changed)
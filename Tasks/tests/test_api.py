@@ -346,6 +346,58 @@ class TestDeleteTaskAPI:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
+@pytest.mark.integration
+class TestMoveTaskAPI:
+    """Test cases for task move endpoint."""
+
+    def test_move_task(self, authenticated_client, project_factory, task_factory):
+        """Test moving a task to another column between two tasks."""
+        project = project_factory()
+        task = task_factory(project=project)
+        first, second = task_factory.create_batch(2, project=project, status=Task.Status.DONE)
+        url = reverse("move_task", kwargs={"task_id": task.id})
+
+        response = authenticated_client.post(
+            url,
+            {"status": Task.Status.DONE, "after_id": first.id, "before_id": second.id},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["data"]["status"] == Task.Status.DONE
+        assert first.position < response.data["data"]["position"] < second.position
+
+    def test_move_with_invalid_neighbour(
+        self, authenticated_client, project_factory, task_factory
+    ):
+        """Test moving next to a task of another project fails."""
+        task = task_factory()
+        other = task_factory(project=project_factory())
+        url = reverse("move_task", kwargs={"task_id": task.id})
+
+        response = authenticated_client.post(url, {"after_id": other.id}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_move_invalid_status(self, authenticated_client, task_factory):
+        """Test moving to an unknown status fails validation."""
+        task = task_factory()
+        url = reverse("move_task", kwargs={"task_id": task.id})
+
+        response = authenticated_client.post(url, {"status": "archived"}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "status" in response.data["errors"]
+
+    def test_move_nonexistent_task(self, authenticated_client):
+        """Test moving nonexistent task."""
+        url = reverse("move_task", kwargs={"task_id": 9999})
+
+        response = authenticated_client.post(url, {}, format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.integration
 class TestTaskAuthorBehavior:
     """Test cases for task author-related behavior."""
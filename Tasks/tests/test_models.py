@@ -154,3 +154,11 @@ class TestTaskModel:
         task = task_factory()
 
         assert task.updated_at is not None
+
+    def test_save_without_position_goes_to_end_of_column(self, task_factory):
+        """Test a task created through the ORM gets a position after its column."""
+        last = task_factory()
+
+        task = Task.objects.create(name="ORM task", project=last.project)
+
+        assert task.position > last.position
@@ -14,7 +14,10 @@ from Tasks.services import (
     list_user_tasks_service,
     get_task_by_id_service,
     delete_task_service,
+    move_task_service,
 )
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 pytestmark = pytest.mark.django_db
 
@@ -250,3 +253,135 @@ class TestDeleteTaskService:
         delete_task_service(task_id)
 
         assert not Task.objects.filter(id=task_id).exists()
+
+
+def column(project, status=Task.Status.TODO):
+    return list(
+        Task.objects.filter(project=project, status=status)
+        .order_by("position", "id")
+        .values_list("id", flat=True)
+    )
+
+
+@pytest.mark.unit
+class TestMoveTaskService:
+    """Test cases for move_task_service and task positions."""
+
+    def test_new_tasks_are_appended_to_their_column(self, project_factory, user_factory):
+        """Test created tasks, and tasks changing status, go to the end of the column."""
+        project = project_factory()
+        author = user_factory()
+        first = create_task_service(name="A", project_id=project.id, author=author)
+        second = create_task_service(name="B", project_id=project.id, author=author)
+        done = create_task_service(
+            name="C", project_id=project.id, author=author, status=Task.Status.DONE
+        )
+
+        update_task_service(done.id, name="C", status=Task.Status.TODO)
+
+        assert column(project) == [first.id, second.id, done.id]
+
+    def test_move_between_neighbours_writes_one_row(self, project_factory, task_factory):
+        """Test a move updates only the moved task."""
+        project = project_factory()
+        first, second, third = task_factory.create_batch(3, project=project)
+        untouched = {
+            task.id: task.position for task in Task.objects.exclude(id=third.id)
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            move_task_service(third.id, after_id=first.id, before_id=second.id)
+
+        writes = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        assert len(writes) == 1
+        assert column(project) == [first.id, third.id, second.id]
+        assert untouched == {task.id: task.position for task in Task.objects.exclude(id=third.id)}
+
+    def test_move_with_one_neighbour_or_none(self, project_factory, task_factory):
+        """Test a single neighbour or no neighbour places the task next to it or at the end."""
+        project = project_factory()
+        first, second, third = task_factory.create_batch(3, project=project)
+
+        move_task_service(third.id, before_id=first.id)
+        assert column(project) == [third.id, first.id, second.id]
+
+        move_task_service(first.id, after_id=second.id)
+        assert column(project) == [third.id, second.id, first.id]
+
+        move_task_service(third.id)
+        assert column(project) == [second.id, first.id, third.id]
+
+    def test_move_to_another_column(self, project_factory, task_factory):
+        """Test a task moved to another status lands between the given tasks."""
+        project = project_factory()
+        task = task_factory(project=project)
+        done = task_factory.create_batch(2, project=project, status=Task.Status.DONE)
+
+        moved = move_task_service(task.id, status=Task.Status.DONE, after_id=done[0].id)
+
+        assert moved.status == Task.Status.DONE
+        assert column(project, Task.Status.DONE) == [done[0].id, task.id, done[1].id]
+
+    def test_neighbour_from_another_column_is_rejected(self, project_factory, task_factory):
+        """Test neighbours must be in the target column."""
+        project = project_factory()
+        task = task_factory(project=project)
+        other = task_factory(project=project, status=Task.Status.DONE)
+
+        with pytest.raises(ValueError):
+            move_task_service(task.id, after_id=other.id)
+
+    def test_tied_positions_are_renumbered(self, project_factory, task_factory):
+        """Test moving between tasks with equal keys rebalances the column first."""
+        project = project_factory()
+        first, second, third = task_factory.create_batch(3, project=project)
+        Task.objects.filter(id__in=[first.id, second.id]).update(position="i5")
+
+        move_task_service(third.id, after_id=first.id, before_id=second.id)
+
+        assert column(project) == [first.id, third.id, second.id]
+
+    def test_move_next_to_a_task_with_a_tied_key(self, project_factory, task_factory):
+        """Test a single neighbour sharing its key with a twin still gets the task beside it."""
+        project = project_factory()
+        first, twin, third, fourth = task_factory.create_batch(4, project=project)
+        Task.objects.filter(id__in=[first.id, twin.id]).update(position="i5")
+
+        move_task_service(third.id, after_id=first.id)
+        assert column(project) == [first.id, third.id, twin.id, fourth.id]
+
+        Task.objects.filter(id__in=[first.id, third.id]).update(position="i0")
+        move_task_service(fourth.id, before_id=third.id)
+        assert column(project) == [first.id, fourth.id, third.id, twin.id]
+
+    def test_move_next_to_a_task_without_a_position(self, project_factory, task_factory):
+        """Test neighbours created by bulk_create (no position) are renumbered first."""
+        project = project_factory()
+        first, moved = task_factory.create_batch(2, project=project)
+        [bulk] = Task.objects.bulk_create([Task(name="Bulk", project=project)])
+
+        # An empty position sorts before every key
+        move_task_service(moved.id, before_id=first.id)
+        assert column(project) == [bulk.id, moved.id, first.id]
+
+        Task.objects.filter(id=bulk.id).update(position="")
+        move_task_service(first.id, after_id=bulk.id)
+        assert column(project) == [bulk.id, first.id, moved.id]
+
+    def test_long_keys_trigger_a_rebalance_after_commit(
+        self, project_factory, task_factory, settings, django_capture_on_commit_callbacks
+    ):
+        """Test repeated drops in one gap end with a renumbered column in the same order."""
+        settings.TASK_POSITION_REBALANCE_LENGTH = 6
+        project = project_factory()
+        first, second = task_factory.create_batch(2, project=project)
+        order = [first.id, second.id]
+
+        for task in task_factory.create_batch(30, project=project):
+            with django_capture_on_commit_callbacks(execute=True):
+                move_task_service(task.id, after_id=first.id, before_id=order[1])
+            order.insert(1, task.id)
+
+        assert column(project) == order
+        positions = Task.objects.filter(project=project).values_list("position", flat=True)
+        assert max(len(position) for position in positions) <= 6
@@ -6,5 +6,6 @@ urlpatterns = [
     path("create/", views.create_task, name="create_task"),
     path("<int:task_id>/", views.task_detail, name="task_detail"),
     path("<int:task_id>/update/", views.update_task, name="update_task"),
+    path("<int:task_id>/move/", views.move_task, name="move_task"),
     path("<int:task_id>/delete/", views.delete_task, name="delete_task"),
 ]
@@ -1,5 +1,5 @@
 import logging
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.request import Request
@@ -8,8 +8,10 @@ from typing import Any, cast
 
 logger = logging.getLogger(__name__)
 
+from Tasks.models import Task
 from Tasks.serializers import (
     CreateTaskSerializer,
+    MoveTaskSerializer,
     TaskSerializer,
     UpdateTaskSerializer,
 )
@@ -20,18 +22,29 @@ from Tasks.services import (
     list_project_tasks_service,
     list_tasks_service,
     list_user_tasks_service,
+    move_task_service,
     update_task_service,
 )
+from utils.idempotency import idempotent
+from utils.instrumentation import query_budget
 from utils.responses import success_response, error_response, validation_error_response
+from utils.throttling import LIST_THROTTLES
 
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@throttle_classes(LIST_THROTTLES)
 def task_list(request: Request) -> Response:
     project_id = request.query_params.get("project_id")
     user_id = request.query_params.get("user_id")
     logger.debug(
-        f"Task list requested by user: {request.user.id}, project_id: {project_id}, user_id: {user_id}"
+        "Task list requested",
+        extra={
+            "user_id": request.user.id,
+            "project_id": project_id,
+            "filter_user_id": user_id,
+        },
     )
 
     if project_id:
@@ -41,19 +54,22 @@ def task_list(request: Request) -> Response:
     else:
         tasks = list_tasks_service()
 
-    serializer = TaskSerializer(tasks, many=True)
-    logger.info(f"Retrieved {len(tasks)} tasks")
+    data = TaskSerializer(tasks, many=True).data
+    logger.info("Retrieved tasks", extra={"count": len(data), "sampled": True})
     return success_response(
-        data=serializer.data,
+        data=data,
         message="Tasks retrieved successfully",
     )
 
 
+@query_budget(10)
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent
 def create_task(request: Request) -> Response:
     logger.info(
-        f"Create task request by user: {request.user.id} - name: {request.data.get('name')}"
+        "Create task request",
+        extra={"user_id": request.user.id, "task_name": request.data.get("name")},
     )
     serializer = CreateTaskSerializer(data=request.data)
     if serializer.is_valid():
@@ -71,7 +87,8 @@ def create_task(request: Request) -> Response:
             )
             response_serializer = TaskSerializer(task)
             logger.info(
-                f"Task created successfully: {task.id} by user: {request.user.id}"
+                "Task created successfully",
+                extra={"task_id": task.id, "user_id": request.user.id},
             )
             return success_response(
                 data=response_serializer.data,
@@ -79,32 +96,40 @@ def create_task(request: Request) -> Response:
                 status_code=status.HTTP_201_CREATED,
             )
         except Exception as e:
-            logger.error(f"Failed to create task - Error: {str(e)}")
+            logger.error("Failed to create task", extra={"error": str(e)})
             return error_response(
                 message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
-    logger.warning(f"Create task validation failed: {serializer.errors}")
+    logger.warning(
+        "Create task validation failed", extra={"errors": serializer.errors}
+    )
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def task_detail(request: Request, task_id: int) -> Response:
     logger.debug(
-        f"Task detail requested for task_id: {task_id} by user: {request.user.id}"
+        "Task detail requested",
+        extra={"task_id": task_id, "user_id": request.user.id},
     )
     try:
         task = get_task_by_id_service(task_id)
         serializer = TaskSerializer(task)
-        logger.info(f"Task detail retrieved successfully: {task_id}")
+        logger.info(
+            "Task detail retrieved successfully",
+            extra={"task_id": task_id, "sampled": True},
+        )
         return success_response(
             data=serializer.data,
             message="Task retrieved successfully",
         )
     except Exception as e:
         logger.error(
-            f"Failed to retrieve task detail for task_id: {task_id} - Error: {str(e)}"
+            "Failed to retrieve task detail",
+            extra={"task_id": task_id, "error": str(e)},
         )
         return error_response(
             message=str(e),
@@ -112,11 +137,13 @@ def task_detail(request: Request, task_id: int) -> Response:
         )
 
 
+@query_budget(7)
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_task(request: Request, task_id: int) -> Response:
     logger.info(
-        f"Update task request for task_id: {task_id} by user: {request.user.id}"
+        "Update task request",
+        extra={"task_id": task_id, "user_id": request.user.id},
     )
     serializer = UpdateTaskSerializer(data=request.data)
     if serializer.is_valid():
@@ -132,45 +159,92 @@ def update_task(request: Request, task_id: int) -> Response:
                 assignee_ids=data.get("assignee_ids"),
             )
             response_serializer = TaskSerializer(task)
-            logger.info(f"Task updated successfully: {task_id}")
+            logger.info("Task updated successfully", extra={"task_id": task_id})
             return success_response(
                 data=response_serializer.data,
                 message="Task updated successfully",
             )
         except Exception as e:
-            logger.error(f"Failed to update task {task_id} - Error: {str(e)}")
+            logger.error(
+                "Failed to update task", extra={"task_id": task_id, "error": str(e)}
+            )
             return error_response(
                 message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     logger.warning(
-        f"Update task validation failed for task_id: {task_id} - Errors: {serializer.errors}"
+        "Update task validation failed",
+        extra={"task_id": task_id, "errors": serializer.errors},
     )
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(7)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def move_task(request: Request, task_id: int) -> Response:
+    logger.info(
+        "Move task request",
+        extra={"task_id": task_id, "user_id": request.user.id},
+    )
+    serializer = MoveTaskSerializer(data=request.data)
+    if not serializer.is_valid():
+        logger.warning(
+            "Move task validation failed",
+            extra={"task_id": task_id, "errors": serializer.errors},
+        )
+        return validation_error_response(errors=serializer.errors)
+    data = cast(dict[str, Any], serializer.validated_data)
+    try:
+        task = move_task_service(
+            task_id=task_id,
+            status=data.get("status"),
+            after_id=data.get("after_id"),
+            before_id=data.get("before_id"),
+        )
+    except Task.DoesNotExist:
+        return error_response(
+            message="Task not found",
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    except ValueError as e:
+        return error_response(
+            message=str(e),
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    logger.info("Task moved successfully", extra={"task_id": task_id})
+    return success_response(
+        data={"id": task.id, "status": task.status, "position": task.position},
+        message="Task moved successfully",
+    )
+
+
+@query_budget(6)
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_task(request: Request, task_id: int) -> Response:
     logger.warning(
-        f"Delete task request for task_id: {task_id} by user: {request.user.id}"
+        "Delete task request",
+        extra={"task_id": task_id, "user_id": request.user.id},
     )
     try:
         success = delete_task_service(task_id)
         if success:
-            logger.info(f"Task deleted successfully: {task_id}")
+            logger.info("Task deleted successfully", extra={"task_id": task_id})
             return success_response(
                 message="Task deleted successfully",
                 status_code=status.HTTP_200_OK,
             )
         else:
-            logger.error(f"Failed to delete task: {task_id}")
+            logger.error("Failed to delete task", extra={"task_id": task_id})
             return error_response(
                 message="Failed to delete task",
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     except Exception as e:
-        logger.error(f"Error deleting task {task_id} - Error: {str(e)}")
+        logger.error(
+            "Error deleting task", extra={"task_id": task_id, "error": str(e)}
+        )
         return error_response(
             message=str(e),
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from Users.models import AvatarFile, User
+from utils.media_transfer import MB, delete_files
+from utils.thumbnails import FORMATS, SIZES, thumbnail_name
+
+
+class Command(BaseCommand):
+    help = 'Delete stored avatars (and their thumbnails) no user references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be deleted without actually doing it',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=24,
+            help='Only delete avatars unreferenced for at least this long',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000, help='Avatars deleted per batch'
+        )
+        parser.add_argument(
+            '--recount',
+            action='store_true',
+            help='Recompute every reference count from the users table first',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        self.stdout.write(self.style.WARNING('\n' + '=' * 60))
+        self.stdout.write(self.style.WARNING('🧹 Avatar Garbage Collection'))
+        self.stdout.write(self.style.WARNING('=' * 60 + '\n'))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.NOTICE('🔍 DRY RUN MODE - Nothing will be deleted\n'))
+
+        if options['recount']:
+            fixed = self._recount(options['dry_run'])
+            self.stdout.write(f'🔢 {fixed:,} reference counts corrected')
+
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        garbage = AvatarFile.objects.filter(refcount=0, updated_at__lt=cutoff)
+
+        if options['dry_run']:
+            count = garbage.count()
+            for name in garbage.values_list('name', flat=True)[:20]:
+                self.stdout.write(self.style.NOTICE(f'   Would delete: {name}'))
+            if count > 20:
+                self.stdout.write(self.style.NOTICE(f'   ... and {count - 20:,} more'))
+            self.stdout.write(f'\n📊 {count:,} unreferenced avatars older than the grace period')
+            self.stdout.write(
+                self.style.NOTICE('\n💡 Run without --dry-run to actually delete them\n')
+            )
+            return
+
+        deleted = freed = failed = 0
+        while True:
+            batch, size, errors = self._collect_batch(garbage, options['batch_size'])
+            if not batch:
+                break
+            for name in errors[:20]:
+                self.stdout.write(self.style.ERROR(f'   Could not delete {name}'))
+            deleted += len(batch)
+            freed += size
+            failed += len(errors)
+
+        self.stdout.write(self.style.WARNING('\n' + '=' * 60))
+        self.stdout.write(self.style.WARNING('📋 Garbage Collection Summary'))
+        self.stdout.write(self.style.WARNING('=' * 60))
+        self.stdout.write(f'\n✅ Deleted: {deleted:,} avatars ({freed / MB:,.1f} MB)')
+        self.stdout.write(f'❌ Errors: {failed:,}\n')
+        if failed:
+            raise CommandError(f'{failed} objects could not be deleted from storage')
+
+    def _collect_batch(self, garbage, batch_size):
+        """
+        Delete up to ``batch_size`` garbage avatars, rows and stored objects.
+
+        Returns their names, total size and the objects storage failed to
+        delete. The objects are deleted while the rows are locked: an upload
+        of the same image arriving meanwhile waits for the lock, then finds
+        neither row nor object and stores the file again, instead of
+        referencing an object that is about to disappear.
+        """
+        storage = User._meta.get_field('avatar').storage
+        with transaction.atomic():
+            rows = list(
+                garbage.select_for_update(skip_locked=True)
+                .order_by('updated_at')
+                .values_list('pk', 'name', 'size')[:batch_size]
+            )
+            if not rows:
+                return [], 0, []
+            # Safety net: a row whose count drifted to zero while users still
+            # point at it is corrected instead of deleted
+            referenced = dict(
+                User.objects.filter(avatar__in=[name for _, name, _ in rows])
+                .values_list('avatar')
+                .annotate(refcount=Count('id'))
+            )
+            for name, refcount in referenced.items():
+                AvatarFile.objects.filter(name=name).update(refcount=refcount)
+            doomed = [(pk, name, size) for pk, name, size in rows if name not in referenced]
+            AvatarFile.objects.filter(pk__in=[pk for pk, _, _ in doomed]).delete()
+            names = [name for _, name, _ in doomed]
+            errors = delete_files(
+                storage, [stored for name in names for stored in self._stored_names(name)]
+            )
+            if errors:
+                # Keep a row for whatever could not be deleted, so a later run retries it
+                failed = set(errors)
+                AvatarFile.objects.bulk_create(
+                    AvatarFile(name=name, size=size, refcount=0)
+                    for _, name, size in doomed
+                    if failed.intersection(self._stored_names(name))
+                )
+        return names, sum(size for _, _, size in doomed), errors
+
+    def _stored_names(self, avatar):
+        yield avatar
+        for size in SIZES:
+            for extension in FORMATS:
+                yield thumbnail_name(avatar, size, extension)
+
+    def _recount(self, dry_run):
+        """Set every ``refcount`` to the number of users pointing at the name."""
+        actual = dict(
+            User.objects.exclude(avatar='')
+            .exclude(avatar=None)
+            .values_list('avatar')
+            .annotate(refcount=Count('id'))
+        )
+        fixed = 0
+        rows = AvatarFile.objects.values_list('name', 'refcount').iterator(chunk_size=2000)
+        for name, refcount in rows:
+            expected = actual.pop(name, 0)
+            if expected != refcount:
+                fixed += 1
+                if not dry_run:
+                    AvatarFile.objects.filter(name=name).update(refcount=expected)
+        # Avatars no row accounts for (stored before reference counting)
+        fixed += len(actual)
+        if not dry_run:
+            AvatarFile.objects.bulk_create(
+                [AvatarFile(name=name, refcount=refcount) for name, refcount in actual.items()],
+                ignore_conflicts=True,
+            )
+        return fixed
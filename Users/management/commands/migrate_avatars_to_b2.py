@@ -1,13 +1,23 @@
-from django.core.management.base import BaseCommand
-from django.core.files.storage import default_storage, storages
-from django.core.files import File
-from Users.models import User
 import os
-from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.management.base import BaseCommand, CommandError
+
+from Users.models import User
+from utils.media_transfer import (
+    MB,
+    Checkpoint,
+    TransferItem,
+    list_object_sizes,
+    object_key,
+    upload_files,
+)
 
 
 class Command(BaseCommand):
-    help = 'Migrate local avatar files to Backblaze B2'
+    help = 'Migrate local avatar files (and their thumbnails) to Backblaze B2'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -15,88 +25,167 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be migrated without actually doing it',
         )
+        parser.add_argument(
+            '--workers', type=int, default=8, help='Files uploaded in parallel'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default='avatar_migration.checkpoint',
+            help='File recording finished uploads; a rerun skips them',
+        )
+        parser.add_argument(
+            '--fresh', action='store_true', help='Ignore and replace an existing checkpoint'
+        )
+        parser.add_argument(
+            '--source',
+            default=settings.MEDIA_ROOT,
+            help='Local media directory (default: MEDIA_ROOT)',
+        )
+        parser.add_argument(
+            '--multipart-threshold',
+            type=int,
+            default=8,
+            help='Files larger than this many MB are uploaded in parallel parts',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=8, help='Multipart part size in MB (min 5)'
+        )
 
     def handle(self, *args, **options):
-        dry_run = options['dry_run']
-        
-        self.stdout.write(self.style.WARNING('\n' + '='*60))
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+        if options['chunk_size'] < 5:
+            raise CommandError('--chunk-size must be at least 5 (the S3 minimum part size)')
+
+        self.stdout.write(self.style.WARNING('\n' + '=' * 60))
         self.stdout.write(self.style.WARNING('📤 Avatar Migration to Backblaze B2'))
-        self.stdout.write(self.style.WARNING('='*60 + '\n'))
+        self.stdout.write(self.style.WARNING('=' * 60 + '\n'))
 
-        if dry_run:
+        if options['dry_run']:
             self.stdout.write(self.style.NOTICE('🔍 DRY RUN MODE - No files will be uploaded\n'))
 
-        # Get B2 storage
-        b2_storage = storages['default']
-        
-        # Check if using B2
-        if 'S3' not in str(type(b2_storage)):
+        if not settings.USE_B2_STORAGE:
             self.stdout.write(self.style.ERROR('❌ B2 Storage is not configured!'))
             self.stdout.write(self.style.ERROR('   Set USE_B2_STORAGE=True in your .env file\n'))
             return
+        b2_storage = storages['default']
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ B2 Storage Active: {type(b2_storage).__name__}\n')
+        )
 
-        self.stdout.write(self.style.SUCCESS(f'✅ B2 Storage Active: {type(b2_storage).__name__}\n'))
-
-        # Get all users with avatars
-        users_with_avatars = User.objects.exclude(avatar='').exclude(avatar=None)
-        total_users = users_with_avatars.count()
-
-        if total_users == 0:
-            self.stdout.write(self.style.WARNING('⚠️  No users with avatars found\n'))
+        local_storage = FileSystemStorage(location=options['source'])
+        items, missing = self._local_files(local_storage)
+        if not items:
+            self.stdout.write(self.style.WARNING('⚠️  No local avatar files found\n'))
             return
 
-        self.stdout.write(f'📊 Found {total_users} users with avatars\n')
-
-        migrated = 0
-        skipped = 0
-        errors = 0
-
-        for user in users_with_avatars:
-            avatar_path = user.avatar.name
-            
-            self.stdout.write(f'\n👤 User: {user.username}')
-            self.stdout.write(f'   Avatar: {avatar_path}')
-
-            try:
-                # Check if file exists locally
-                local_path = user.avatar.path
-                if not os.path.exists(local_path):
-                    self.stdout.write(self.style.WARNING(f'   ⚠️  Local file not found: {local_path}'))
-                    skipped += 1
-                    continue
+        if options['fresh'] and os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+        checkpoint = Checkpoint(options['checkpoint'])
+        # One listing of the bucket instead of a HEAD request per file
+        remote = list_object_sizes(b2_storage, 'avatars/')
+        pending = [
+            item
+            for item in items
+            if item.name not in checkpoint
+            and remote.get(object_key(b2_storage, item.name)) != item.size
+        ]
+        skipped = len(items) - len(pending)
+        total_bytes = sum(item.size for item in pending)
+
+        self.stdout.write(f'📊 {len(items):,} local files, {missing:,} missing')
+        self.stdout.write(f'⏭️  {skipped:,} already in B2 or in {options["checkpoint"]}')
+        self.stdout.write(
+            f'➡️  {len(pending):,} to upload ({total_bytes / MB:,.1f} MB) '
+            f'with {options["workers"]} workers\n'
+        )
 
-                # Check if already in B2
-                if b2_storage.exists(avatar_path):
-                    self.stdout.write(self.style.NOTICE(f'   ℹ️  Already in B2, skipping'))
-                    skipped += 1
-                    continue
+        if options['dry_run']:
+            for item in pending[:20]:
+                self.stdout.write(self.style.NOTICE(f'   Would upload: {item.name}'))
+            if len(pending) > 20:
+                self.stdout.write(self.style.NOTICE(f'   ... and {len(pending) - 20:,} more'))
+            self.stdout.write(
+                self.style.NOTICE('\n💡 Run without --dry-run to actually migrate files\n')
+            )
+            checkpoint.close()
+            return
 
-                if dry_run:
-                    self.stdout.write(self.style.NOTICE(f'   ➡️  Would upload to B2: {avatar_path}'))
-                    migrated += 1
-                else:
-                    # Upload to B2
-                    with open(local_path, 'rb') as f:
-                        file_obj = File(f)
-                        b2_storage.save(avatar_path, file_obj)
-                    
-                    self.stdout.write(self.style.SUCCESS(f'   ✅ Uploaded to B2'))
-                    migrated += 1
-
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'   ❌ Error: {str(e)}'))
-                errors += 1
+        try:
+            stats = upload_files(
+                pending,
+                b2_storage,
+                workers=options['workers'],
+                checkpoint=checkpoint,
+                multipart_threshold=options['multipart_threshold'] * MB,
+                multipart_chunksize=options['chunk_size'] * MB,
+                progress=self._progress_reporter(),
+            )
+        finally:
+            checkpoint.close()
 
         # Summary
-        self.stdout.write(self.style.WARNING('\n' + '='*60))
+        self.stdout.write(self.style.WARNING('\n' + '=' * 60))
         self.stdout.write(self.style.WARNING('📋 Migration Summary'))
-        self.stdout.write(self.style.WARNING('='*60))
-        self.stdout.write(f'\n✅ Migrated: {migrated}')
-        self.stdout.write(f'⏭️  Skipped: {skipped}')
-        self.stdout.write(f'❌ Errors: {errors}')
-        self.stdout.write(f'📊 Total: {total_users}\n')
-
-        if dry_run:
-            self.stdout.write(self.style.NOTICE('\n💡 Run without --dry-run to actually migrate files\n'))
-        elif migrated > 0:
-            self.stdout.write(self.style.SUCCESS('\n🎉 Migration complete! Check your B2 bucket.\n'))
+        self.stdout.write(self.style.WARNING('=' * 60))
+        self.stdout.write(
+            f'\n✅ Migrated: {stats.uploaded:,} ({stats.uploaded_bytes / MB:,.1f} MB)'
+        )
+        self.stdout.write(f'⏭️  Skipped: {skipped:,}')
+        self.stdout.write(f'❌ Errors: {stats.failed:,}')
+        self.stdout.write(
+            f'⏱️  {stats.seconds:.1f}s ({stats.bytes_per_second / MB:,.2f} MB/s, '
+            f'{stats.uploaded / stats.seconds if stats.seconds else 0:,.1f} files/s)\n'
+        )
+        for name, error in stats.errors[:20]:
+            self.stdout.write(self.style.ERROR(f'   {name}: {error}'))
+        if stats.failed:
+            raise CommandError(
+                f'{stats.failed} uploads failed; run the command again to retry only those'
+            )
+        self.stdout.write(self.style.SUCCESS('\n🎉 Migration complete! Check your B2 bucket.\n'))
+
+    def _local_files(self, local_storage):
+        """Return the avatars and thumbnails present locally, and how many are missing."""
+        items, missing = [], 0
+        # Avatars are content-addressed: users with the same image share its files
+        seen = set()
+        rows = (
+            User.objects.exclude(avatar='')
+            .exclude(avatar=None)
+            .values_list('avatar', 'avatar_thumbnails')
+            .iterator(chunk_size=2000)
+        )
+        for avatar, thumbnails in rows:
+            names = [avatar]
+            for variants in thumbnails.values():
+                names.extend(variants.values())
+            for name in names:
+                if name in seen:
+                    continue
+                seen.add(name)
+                path = local_storage.path(name)
+                try:
+                    items.append(TransferItem(name, path, os.path.getsize(path)))
+                except OSError:
+                    missing += 1
+        return items, missing
+
+    def _progress_reporter(self):
+        # A line every 2 seconds, plus one when the last file finishes
+        last = [0.0]
+
+        def report(stats):
+            now = perf_counter()
+            if now - last[0] < 2 and stats.done != stats.files:
+                return
+            last[0] = now
+            eta = stats.eta_seconds
+            self.stdout.write(
+                f'   {stats.done:>8,} / {stats.files:,} files  '
+                f'{stats.uploaded_bytes / MB:>9,.1f} MB  '
+                f'{stats.bytes_per_second / MB:>7,.2f} MB/s  '
+                f'ETA {"-" if eta is None else f"{eta:,.0f}s"}'
+            )
+
+        return report
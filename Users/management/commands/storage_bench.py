@@ -0,0 +1,209 @@
+import json
+import os
+import statistics
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import perf_counter
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.media_transfer import MB
+
+UNITS = {'B': 1, 'KB': 1024, 'MB': MB}
+OPERATIONS = ('upload', 'presign', 'download', 'delete')
+
+
+def parse_size(value: str) -> int:
+    """``"64KB"`` -> 65536; a bare number is bytes."""
+    value = value.strip().upper()
+    for unit in ('KB', 'MB', 'B'):
+        if value.endswith(unit):
+            return int(float(value[: -len(unit)]) * UNITS[unit])
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    for unit in ('MB', 'KB'):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f'{size // UNITS[unit]}{unit}'
+    return f'{size}B'
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure upload, download, presign and delete latency and throughput of the '
+        'default storage backend across object sizes and concurrency levels'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1KB,64KB,1MB', help='Comma-separated object sizes (B, KB, MB)'
+        )
+        parser.add_argument(
+            '--concurrency', default='1,8', help='Comma-separated numbers of parallel clients'
+        )
+        parser.add_argument(
+            '--objects', type=int, default=20, help='Objects per size and concurrency level'
+        )
+        parser.add_argument(
+            '--prefix', default='storage-bench', help='Storage path the test objects go under'
+        )
+        parser.add_argument(
+            '--disk-cache',
+            action='store_true',
+            help="Read through the local media cache (default: measure the backend itself)",
+        )
+        parser.add_argument(
+            '--output', help='Write the JSON report to this file ("-" for stdout only)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [parse_size(size) for size in options['sizes'].split(',')]
+            levels = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError as e:
+            raise CommandError(f'Invalid --sizes or --concurrency: {e}')
+        if min(sizes) < 1 or min(levels) < 1 or options['objects'] < 1:
+            raise CommandError('Sizes, concurrency levels and --objects must be positive')
+
+        # A private instance, so the benchmark can bypass the disk cache
+        storage = storages.create_storage(settings.STORAGES['default'])
+        if getattr(storage, 'disk_cache', None) is not None and not options['disk_cache']:
+            storage.disk_cache = None
+        quiet = options['output'] == '-'
+        if not quiet:
+            self._print_configuration(storage)
+
+        run = f'{options["prefix"].strip("/")}/{uuid.uuid4().hex[:12]}'
+        results = []
+        for size in sizes:
+            payload = os.urandom(size)
+            for level in levels:
+                results.append(
+                    self._measure(storage, payload, level, options['objects'], run)
+                )
+                if not quiet:
+                    self._print_result(results[-1])
+
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'backend': f'{type(storage).__module__}.{type(storage).__name__}',
+            'disk_cache': getattr(storage, 'disk_cache', None) is not None,
+            'objects': options['objects'],
+            'results': results,
+        }
+        if quiet:
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\n📄 Report written to {options["output"]}\n'))
+
+        failed = sum(op['errors'] for result in results for op in result['operations'].values())
+        if failed:
+            raise CommandError(f'{failed} storage operations failed')
+
+    def _measure(self, storage, payload, concurrency, count, run):
+        """Upload, presign, download and delete ``count`` objects ``concurrency`` at a time."""
+        size = len(payload)
+        label = f'{format_size(size)}-c{concurrency}'
+        names = [f'{run}/{label}-{index}.bin' for index in range(count)]
+        operations = {}
+
+        def upload(name):
+            return storage.save(name, ContentFile(payload))
+
+        def download(name):
+            with storage.open(name, 'rb') as fh:
+                if len(fh.read()) != size:
+                    raise ValueError(f'{name}: short read')
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for operation, func in (
+                ('upload', upload),
+                ('presign', storage.url),
+                ('download', download),
+                ('delete', storage.delete),
+            ):
+                timings, errors = [], []
+
+                def timed(name):
+                    start = perf_counter()
+                    try:
+                        result = func(name)
+                    except Exception as e:
+                        errors.append(f'{name}: {e}')
+                        return name
+                    timings.append(perf_counter() - start)
+                    return result
+
+                started = perf_counter()
+                saved = list(pool.map(timed, names))
+                wall = perf_counter() - started
+                if operation == 'upload':
+                    names = saved  # storage may have renamed them
+                operations[operation] = self._summarize(
+                    timings, errors, wall, size if operation in ('upload', 'download') else 0
+                )
+
+        return {'size': size, 'concurrency': concurrency, 'operations': operations}
+
+    def _summarize(self, timings, errors, wall, size):
+        stats = {
+            'ops': len(timings),
+            'errors': len(errors),
+            'ops_per_second': len(timings) / wall if wall else 0.0,
+        }
+        if timings:
+            stats.update(
+                mean_ms=statistics.fmean(timings) * 1000,
+                p50_ms=percentile(timings, 50) * 1000,
+                p95_ms=percentile(timings, 95) * 1000,
+                p99_ms=percentile(timings, 99) * 1000,
+                max_ms=max(timings) * 1000,
+            )
+        if size:
+            stats['mb_per_second'] = len(timings) * size / MB / wall if wall else 0.0
+        if errors:
+            stats['first_errors'] = errors[:5]
+        return stats
+
+    def _print_configuration(self, storage):
+        self.stdout.write(self.style.WARNING('\n' + '=' * 60))
+        self.stdout.write(self.style.WARNING('📦 Storage Benchmark'))
+        self.stdout.write(self.style.WARNING('=' * 60 + '\n'))
+        self.stdout.write(f'Backend: {type(storage).__module__}.{type(storage).__name__}')
+        if settings.USE_B2_STORAGE:
+            self.stdout.write(f'Bucket: {storage.bucket_name}')
+            self.stdout.write(f'Endpoint: {storage.endpoint_url or "AWS default"}')
+            self.stdout.write(
+                f'Disk cache: {"on" if getattr(storage, "disk_cache", None) else "off"}'
+            )
+        else:
+            self.stdout.write(f'Location: {getattr(storage, "location", "-")}')
+        self.stdout.write('Latencies in ms')
+        self.stdout.write(
+            f'\n{"size":>7}{"conc":>6}  {"operation":<10}{"ops/s":>9}{"MB/s":>9}'
+            f'{"p50":>9}{"p95":>9}{"p99":>9}{"err":>5}'
+        )
+
+    def _print_result(self, result):
+        for operation in OPERATIONS:
+            stats = result['operations'][operation]
+            self.stdout.write(
+                f'{format_size(result["size"]):>7}{result["concurrency"]:>6}  {operation:<10}'
+                f'{stats["ops_per_second"]:>9.1f}'
+                + (f'{stats["mb_per_second"]:>9.2f}' if 'mb_per_second' in stats else f'{"":>9}')
+                + ''.join(f'{stats.get(key, 0):>9.2f}' for key in ('p50_ms', 'p95_ms', 'p99_ms'))
+                + f'{stats["errors"]:>5}'
+            )
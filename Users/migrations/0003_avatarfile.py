@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_avatars(apps, schema_editor):
+    User = apps.get_model("Users", "User")
+    AvatarFile = apps.get_model("Users", "AvatarFile")
+    counts = (
+        User.objects.exclude(avatar="")
+        .exclude(avatar=None)
+        .values_list("avatar")
+        .annotate(refcount=Count("id"))
+    )
+    AvatarFile.objects.bulk_create(
+        (AvatarFile(name=name, refcount=refcount) for name, refcount in counts.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Users', '0002_user_avatar_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvatarFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['refcount', 'updated_at'], name='avatarfile_gc_idx')],
+            },
+        ),
+        migrations.RunPython(count_existing_avatars, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,34 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+from utils.fields import ImageField
+
 
 # Create your models here.
 class User(AbstractUser):
-    avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
+    avatar = ImageField(upload_to="avatars/", blank=True, null=True)
+    # {"<size>": {"webp": name, "jpg": name}} of the current avatar, filled in
+    # in the background by Users.services.generate_avatar_thumbnails_service
+    avatar_thumbnails = models.JSONField(default=dict, blank=True)
+
+
+class AvatarFile(models.Model):
+    """
+    One stored avatar object and how many users' ``avatar`` point at it.
+
+    Uploaded avatars are stored under a hash of their bytes, so users who
+    upload the same image share one object. Objects whose ``refcount``
+    dropped to zero are deleted, with their thumbnails, by
+    ``manage.py gc_avatars``.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["refcount", "updated_at"], name="avatarfile_gc_idx")]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
@@ -1,31 +1,83 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from Users.services import (
+    AVATAR_CONTENT_TYPES,
+    AVATAR_PROBE_BYTES,
+    attach_avatar_service,
+    check_avatar_image,
+)
+from utils.instrumentation import InstrumentedSerializerMixin
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class AvatarField(serializers.FileField):
+    """
+    Uploaded avatar, validated from its header instead of a full decode.
+
+    DRF's ``ImageField`` has Pillow decode and verify the whole image in the
+    request thread. This reads only the first ``AVATAR_PROBE_BYTES``, checks
+    format and dimensions (``check_avatar_image``) and records the detected
+    type as the file's ``content_type``, so validation costs the same for
+    every image size. Thumbnail rendering decodes it later, off the request
+    thread.
+    """
+
+    def to_internal_value(self, data):
+        file = super().to_internal_value(data)
+        if file.size > settings.AVATAR_MAX_UPLOAD_BYTES:
+            raise serializers.ValidationError(
+                f"Avatars can be at most {settings.AVATAR_MAX_UPLOAD_BYTES} bytes."
+            )
+        file.seek(0)
+        head = file.read(AVATAR_PROBE_BYTES)
+        file.seek(0)
+        try:
+            file.content_type = check_avatar_image(head)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return file
+
+
+class RegisterSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
+    avatar = AvatarField(required=False, allow_null=True)
 
     class Meta:
         model = get_user_model()
         fields = ("username", "email", "password", "avatar")
 
     def create(self, validated_data):
-        user = get_user_model().objects.create_user(
+        avatar = validated_data.get("avatar")
+        if not avatar:
+            return self._create_user(validated_data)
+        with transaction.atomic():
+            user = self._create_user(validated_data)
+            attach_avatar_service(user, avatar)
+            user.save(update_fields=["avatar", "avatar_thumbnails"])
+        return user
+
+    def _create_user(self, validated_data):
+        return get_user_model().objects.create_user(
             username=validated_data["username"],
             email=validated_data["email"],
             password=validated_data["password"],
-            avatar=validated_data.get("avatar"),
         )
-        return user
 
 
 class UpdateUserSerializer(serializers.ModelSerializer):
+    avatar = AvatarField(required=False, allow_null=True)
+
     class Meta:
         model = get_user_model()
         fields = ("username", "email", "avatar")
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    # {"32": {"webp": url, "jpg": url}, "64": ..., "256": ...}; empty until the
+    # thumbnails of a new avatar are rendered, clients then fall back to avatar
+    avatar_thumbnails = serializers.SerializerMethodField()
+
     class Meta:
         model = get_user_model()
         fields = [
@@ -35,5 +87,29 @@ class UserSerializer(serializers.ModelSerializer):
             "first_name",
             "last_name",
             "avatar",
+            "avatar_thumbnails",
             "date_joined",
         ]
+
+    def get_avatar_thumbnails(self, user) -> dict[str, dict[str, str]]:
+        storage = user.avatar.storage
+        return {
+            size: {extension: storage.url(name) for extension, name in variants.items()}
+            for size, variants in user.avatar_thumbnails.items()
+        }
+
+
+class AvatarUploadSerializer(serializers.Serializer):
+    content_type = serializers.ChoiceField(choices=sorted(AVATAR_CONTENT_TYPES))
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        if value > settings.AVATAR_MAX_UPLOAD_BYTES:
+            raise serializers.ValidationError(
+                f"Avatars can be at most {settings.AVATAR_MAX_UPLOAD_BYTES} bytes."
+            )
+        return value
+
+
+class AvatarConfirmSerializer(serializers.Serializer):
+    key = serializers.CharField(max_length=255)
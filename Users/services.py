@@ -1,65 +1,351 @@
+import functools
+import hashlib
 import logging
+import os
+import uuid
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
 from typing import Optional
 
+from Users.models import AvatarFile
+
+from utils.background import run_in_background
+from utils.thumbnails import SIZES, probe_image, render_thumbnails, thumbnail_name
+
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Content types accepted for avatars, and the extension they are stored with
+AVATAR_CONTENT_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+# Bytes fetched to identify an uploaded image; headers (with EXIF or ICC
+# profiles) fit comfortably
+AVATAR_PROBE_BYTES = 256 * 1024
+
+
+class DirectUploadUnavailable(Exception):
+    """The default storage cannot take uploads straight from clients."""
+
 
 def list_users_service():
     logger.debug("Fetching all users")
     users = User.objects.all()
-    logger.info("Users retrieved successfully")
+    logger.info("Users retrieved successfully", extra={"sampled": True})
     return users
 
 
 def get_user_by_id_service(user_id: int):
-    logger.debug(f"Fetching user by id: {user_id}")
+    logger.debug("Fetching user by id", extra={"user_id": user_id})
     try:
         user = User.objects.get(id=user_id)
-        logger.info(f"User found: {user_id}")
+        logger.info("User found", extra={"user_id": user_id, "sampled": True})
         return user
     except User.DoesNotExist:
-        logger.error(f"User not found: {user_id}")
+        logger.error("User not found", extra={"user_id": user_id})
         raise
 
 
 def update_user_service(
-    user_id: int, username: Optional[str] = None, email: Optional[str] = None
+    user_id: int,
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    avatar: Optional[UploadedFile] = None,
 ):
-    logger.info(f"Updating user: {user_id}")
+    logger.info("Updating user", extra={"user_id": user_id})
     with transaction.atomic():
         try:
             user = User.objects.get(id=user_id)
             if username:
-                logger.debug(f"Updating username for user {user_id}: {username}")
+                logger.debug(
+                    "Updating username", extra={"user_id": user_id, "username": username}
+                )
                 user.username = username
             if email:
-                logger.debug(f"Updating email for user {user_id}: {email}")
+                logger.debug(
+                    "Updating email", extra={"user_id": user_id, "email": email}
+                )
                 user.email = email
+            if avatar:
+                logger.debug("Updating avatar", extra={"user_id": user_id})
+                attach_avatar_service(user, avatar)
             user.save()
-            logger.info(f"User updated successfully: {user_id}")
+            logger.info("User updated successfully", extra={"user_id": user_id})
             return user
         except User.DoesNotExist:
-            logger.error(f"Cannot update - User not found: {user_id}")
+            logger.error("Cannot update - User not found", extra={"user_id": user_id})
             raise
         except Exception as e:
-            logger.error(f"Error updating user {user_id}: {str(e)}")
+            logger.error(
+                "Error updating user", extra={"user_id": user_id, "error": str(e)}
+            )
             raise
 
 
 def delete_user_service(user_id: int) -> bool:
-    logger.warning(f"Deleting user: {user_id}")
+    logger.warning("Deleting user", extra={"user_id": user_id})
     with transaction.atomic():
         try:
             user = User.objects.get(id=user_id)
+            _release_avatar(user.avatar.name)
             user.delete()
-            logger.info(f"User deleted successfully: {user_id}")
+            logger.info("User deleted successfully", extra={"user_id": user_id})
             return True
         except User.DoesNotExist:
-            logger.error(f"Cannot delete - User not found: {user_id}")
+            logger.error("Cannot delete - User not found", extra={"user_id": user_id})
             raise
         except Exception as e:
-            logger.error(f"Error deleting user {user_id}: {str(e)}")
+            logger.error(
+                "Error deleting user", extra={"user_id": user_id, "error": str(e)}
+            )
             raise
+
+
+def check_avatar_image(head: bytes) -> str:
+    """
+    Return the content type of an avatar image given its first bytes.
+
+    Only the header is parsed (``probe_image``), so this costs the same for
+    any image size and never decodes pixels. Raises ``ValueError`` for files
+    that are not a supported image or have more than ``AVATAR_MAX_PIXELS``
+    pixels, which also rules out decompression bombs before anything
+    decodes them.
+    """
+    content_type, width, height = probe_image(head)
+    if content_type not in AVATAR_CONTENT_TYPES:
+        raise ValueError("Avatars must be JPEG, PNG, WebP or GIF images")
+    if width * height > settings.AVATAR_MAX_PIXELS:
+        raise ValueError("The image has too many pixels")
+    return content_type
+
+
+def avatar_content_name(content: File) -> str:
+    """
+    Storage name of an avatar, derived from its bytes: ``avatars/<hash>.<ext>``.
+
+    The hash is a 128-bit BLAKE2b of the content, read in chunks. The
+    extension comes from the type Pillow detected while validating the upload
+    (``content_type``), falling back to the uploaded file name's.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    extension = AVATAR_CONTENT_TYPES.get(getattr(content, "content_type", None))
+    if extension is None:
+        extension = os.path.splitext(content.name or "")[1].lstrip(".").lower() or "img"
+    return f"avatars/{digest.hexdigest()}.{extension}"
+
+
+def _acquire_avatar(name: str, size: int) -> None:
+    """Count one more user of the stored avatar ``name``."""
+    updated = AvatarFile.objects.filter(name=name).update(
+        refcount=F("refcount") + 1, updated_at=timezone.now()
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            AvatarFile.objects.create(name=name, size=size, refcount=1)
+    except IntegrityError:
+        # Created concurrently by an upload of the same image
+        AvatarFile.objects.filter(name=name).update(
+            refcount=F("refcount") + 1, updated_at=timezone.now()
+        )
+
+
+def _release_avatar(name: Optional[str]) -> None:
+    """Count one user less of ``name``; at zero it becomes garbage (gc_avatars)."""
+    if name:
+        AvatarFile.objects.filter(name=name, refcount__gt=0).update(
+            refcount=F("refcount") - 1, updated_at=timezone.now()
+        )
+
+
+def _set_avatar(user, name: str) -> None:
+    _release_avatar(user.avatar.name)
+    user.avatar.name = name
+    user.avatar_thumbnails = {}
+    generate_avatar_thumbnails_service(user)
+
+
+def attach_avatar_service(user, content: File) -> None:
+    """
+    Store an uploaded avatar content-addressed and make it ``user``'s avatar.
+
+    An image that is already stored (another user, or an earlier upload, has
+    the same bytes) is not written again; its object just gains a reference.
+    Names never change content, so their URLs can be cached forever. The
+    caller saves ``user``, in the same transaction.
+    """
+    name = avatar_content_name(content)
+    if user.avatar.name == name:
+        return
+    storage = User._meta.get_field("avatar").storage
+    _acquire_avatar(name, content.size)
+    if storage.exists(name):
+        logger.info("Avatar already stored", extra={"user_id": user.pk, "key": name})
+    else:
+        saved = storage.save(name, content)
+        if saved != name:
+            # The same bytes were stored concurrently under ``name``
+            storage.delete(saved)
+    _set_avatar(user, name)
+
+
+def generate_avatar_thumbnails_service(user) -> None:
+    """
+    Render the thumbnails of ``user.avatar`` once the current transaction commits.
+
+    Reading, decoding and resizing the original run in the background
+    process pool (utils.background), so the request returns without waiting
+    for them; until they are stored ``user.avatar_thumbnails`` stays empty
+    and clients fall back to ``avatar``.
+    """
+    if not user.avatar:
+        return
+    transaction.on_commit(
+        functools.partial(_submit_avatar_thumbnails, user.pk, user.avatar.name)
+    )
+
+
+def _submit_avatar_thumbnails(user_id: int, avatar_name: str):
+    # Another user with the same stored avatar already has its thumbnails
+    existing = (
+        User.objects.filter(avatar=avatar_name)
+        .exclude(avatar_thumbnails={})
+        .values_list("avatar_thumbnails", flat=True)
+        .first()
+    )
+    if existing:
+        User.objects.filter(pk=user_id, avatar=avatar_name).update(avatar_thumbnails=existing)
+        return None
+    storage = User._meta.get_field("avatar").storage
+    # The worker process reads the original itself: from disk (local storage
+    # or the remote storage's disk cache), or from a (presigned) URL, so the
+    # request never downloads it
+    try:
+        source = storage.path(avatar_name)
+    except NotImplementedError:
+        local_path = getattr(storage, "local_path", None)
+        source = (local_path and local_path(avatar_name)) or storage.url(avatar_name)
+    logger.debug("Scheduling avatar thumbnails", extra={"user_id": user_id})
+    return run_in_background(
+        render_thumbnails,
+        source,
+        SIZES,
+        settings.AVATAR_MAX_PIXELS,
+        on_done=functools.partial(store_avatar_thumbnails, user_id, avatar_name),
+    )
+
+
+def store_avatar_thumbnails(
+    user_id: int, avatar_name: str, rendered: dict[tuple[int, str], bytes]
+) -> None:
+    storage = User._meta.get_field("avatar").storage
+    thumbnails: dict[str, dict[str, str]] = {}
+    for (size, extension), content in rendered.items():
+        name = thumbnail_name(avatar_name, size, extension)
+        # Thumbnail names derive from the avatar's, so an existing one is identical
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(content))
+        thumbnails.setdefault(str(size), {})[extension] = name
+    # Only attach them if the avatar was not replaced while they rendered;
+    # otherwise gc_avatars deletes them with the avatar
+    updated = User.objects.filter(pk=user_id, avatar=avatar_name).update(
+        avatar_thumbnails=thumbnails
+    )
+    if not updated:
+        logger.info("Avatar replaced before its thumbnails were stored", extra={"user_id": user_id})
+        return
+    logger.info(
+        "Avatar thumbnails stored",
+        extra={"user_id": user_id, "bytes": sum(map(len, rendered.values()))},
+    )
+
+
+def _pending_upload_key(user_id: int, name: str) -> str:
+    return f"avatar-upload:{user_id}:{name}"
+
+
+def create_avatar_upload_service(user, content_type: str, size: int) -> dict:
+    """
+    Authorise one direct upload of an avatar to the storage bucket.
+
+    Returns the presigned PUT the client sends the file with. The object name
+    is chosen here and remembered (per user, in the default cache) until the
+    URL expires, so only that user can confirm it.
+    """
+    storage = User._meta.get_field("avatar").storage
+    if not hasattr(storage, "presigned_put"):
+        raise DirectUploadUnavailable("Direct uploads need S3-compatible storage")
+    name = f"avatars/{uuid.uuid4().hex}.{AVATAR_CONTENT_TYPES[content_type]}"
+    expire = settings.AVATAR_UPLOAD_EXPIRE
+    url = storage.presigned_put(name, content_type, size, expire)
+    cache.set(
+        _pending_upload_key(user.pk, name),
+        {"content_type": content_type, "size": size},
+        expire + 60,
+    )
+    logger.info(
+        "Avatar upload authorised", extra={"user_id": user.pk, "key": name, "bytes": size}
+    )
+    return {
+        "key": name,
+        "method": "PUT",
+        "url": url,
+        "headers": {"Content-Type": content_type},
+        "expires_in": expire,
+    }
+
+
+def confirm_avatar_upload_service(user, name: str):
+    """
+    Attach a directly uploaded object as ``user``'s avatar.
+
+    The object must be one this user was authorised to upload, have the
+    announced size and type, and its header (fetched with one ranged GET)
+    must describe an image within ``AVATAR_MAX_PIXELS``. Rejected objects
+    are deleted. Raises ``ValueError`` with the reason.
+    """
+    storage = User._meta.get_field("avatar").storage
+    if not hasattr(storage, "presigned_put"):
+        raise DirectUploadUnavailable("Direct uploads need S3-compatible storage")
+    pending_key = _pending_upload_key(user.pk, name)
+    pending = cache.get(pending_key)
+    if pending is None:
+        raise ValueError("Unknown or expired upload")
+    try:
+        stored = storage.head(name)
+    except FileNotFoundError:
+        raise ValueError("The file has not been uploaded")
+
+    try:
+        if stored["size"] != pending["size"]:
+            raise ValueError("The uploaded file does not have the announced size")
+        content_type = check_avatar_image(storage.read_prefix(name, AVATAR_PROBE_BYTES))
+        if content_type != pending["content_type"]:
+            raise ValueError("The uploaded file is not a " + pending["content_type"])
+    except ValueError as e:
+        logger.warning(
+            "Avatar upload rejected", extra={"user_id": user.pk, "key": name, "error": str(e)}
+        )
+        storage.delete(name)
+        cache.delete(pending_key)
+        raise
+
+    cache.delete(pending_key)
+    with transaction.atomic():
+        _acquire_avatar(name, stored["size"])
+        _set_avatar(user, name)
+        user.save(update_fields=["avatar", "avatar_thumbnails"])
+    logger.info("Avatar upload confirmed", extra={"user_id": user.pk, "key": name})
+    return user
@@ -2,6 +2,8 @@
 Unit tests for Users app models.
 """
 
+import sys
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
@@ -62,6 +64,13 @@ class TestUserModel:
 
         assert user.avatar.name is None or user.avatar.name == ""
 
+    def test_avatar_check_does_not_import_pillow(self, monkeypatch):
+        """Test the system check finds Pillow without importing it."""
+        monkeypatch.delitem(sys.modules, "PIL.Image", raising=False)
+
+        assert User._meta.get_field("avatar").check() == []
+        assert "PIL.Image" not in sys.modules
+
     def test_user_str_representation(self, user_factory):
         """Test string representation of user."""
         user = user_factory(username="testuser")
@@ -3,12 +3,24 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from utils.instrumentation import query_budget
+from utils.throttling import LOGIN_THROTTLES
 from . import views
 
 urlpatterns = [
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "token/",
+        query_budget(1)(TokenObtainPairView.as_view(throttle_classes=LOGIN_THROTTLES)),
+        name="token_obtain_pair",
+    ),
+    path(
+        "token/refresh/",
+        query_budget(1)(TokenRefreshView.as_view()),
+        name="token_refresh",
+    ),
     path("register/", views.register, name="register"),
+    path("avatar/upload/", views.avatar_upload, name="avatar-upload"),
+    path("avatar/confirm/", views.avatar_confirm, name="avatar-confirm"),
     path("", views.user_list, name="user-list"),
     path("<int:user_id>/", views.user_detail, name="user-detail"),
     path("<int:user_id>/update/", views.update_user, name="user-update"),
@@ -1,5 +1,5 @@
 import logging
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.request import Request
@@ -8,65 +8,89 @@ from typing import Any, cast
 
 logger = logging.getLogger(__name__)
 
-from Users.serializers import RegisterSerializer, UpdateUserSerializer, UserSerializer
+from Users.serializers import (
+    AvatarConfirmSerializer,
+    AvatarUploadSerializer,
+    RegisterSerializer,
+    UpdateUserSerializer,
+    UserSerializer,
+)
 from Users.services import (
+    DirectUploadUnavailable,
+    confirm_avatar_upload_service,
+    create_avatar_upload_service,
     delete_user_service,
     get_user_by_id_service,
     list_users_service,
     update_user_service,
 )
+from utils.instrumentation import query_budget
 from utils.responses import success_response, error_response, validation_error_response
+from utils.throttling import LIST_THROTTLES, RegisterIPThrottle
 
 
+@query_budget(2)
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
 def register(request: Request) -> Response:
     logger.info(
-        f"User registration attempt with username: {request.data.get('username')}"
+        "User registration attempt", extra={"username": request.data.get("username")}
     )
     serializer = RegisterSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save()
-        logger.info(f"User registered successfully: {serializer.data.get('username')}")
+        logger.info(
+            "User registered successfully",
+            extra={"username": serializer.data.get("username")},
+        )
         return success_response(
             data=serializer.data,
             message="User registered successfully",
             status_code=status.HTTP_201_CREATED,
         )
-    logger.warning(f"User registration failed: {serializer.errors}")
+    logger.warning("User registration failed", extra={"errors": serializer.errors})
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@throttle_classes(LIST_THROTTLES)
 def user_list(request: Request) -> Response:
-    logger.debug(f"User list requested by user: {request.user.id}")
+    logger.debug("User list requested", extra={"user_id": request.user.id})
     users = list_users_service()
-    serializer = UserSerializer(users, many=True)
-    logger.info(f"Retrieved {len(users)} users")
+    data = UserSerializer(users, many=True).data
+    logger.info("Retrieved users", extra={"count": len(data), "sampled": True})
     return success_response(
-        data=serializer.data,
+        data=data,
         message="Users retrieved successfully",
     )
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def user_detail(request: Request, user_id: int) -> Response:
     logger.debug(
-        f"User detail requested for user_id: {user_id} by user: {request.user.id}"
+        "User detail requested",
+        extra={"target_user_id": user_id, "user_id": request.user.id},
     )
     try:
         user = get_user_by_id_service(user_id)
         serializer = UserSerializer(user)
-        logger.info(f"User detail retrieved successfully for user_id: {user_id}")
+        logger.info(
+            "User detail retrieved successfully",
+            extra={"target_user_id": user_id, "sampled": True},
+        )
         return success_response(
             data=serializer.data,
             message="User retrieved successfully",
         )
     except Exception as e:
         logger.error(
-            f"Failed to retrieve user detail for user_id: {user_id} - Error: {str(e)}"
+            "Failed to retrieve user detail",
+            extra={"target_user_id": user_id, "error": str(e)},
         )
         return error_response(
             message=str(e),
@@ -74,11 +98,13 @@ def user_detail(request: Request, user_id: int) -> Response:
         )
 
 
+@query_budget(6)
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_user(request: Request, user_id: int) -> Response:
     logger.info(
-        f"Update user request for user_id: {user_id} by user: {request.user.id}"
+        "Update user request",
+        extra={"target_user_id": user_id, "user_id": request.user.id},
     )
     serializer = UpdateUserSerializer(data=request.data)
     if serializer.is_valid():
@@ -88,48 +114,97 @@ def update_user(request: Request, user_id: int) -> Response:
                 user_id=user_id,
                 username=data.get("username"),
                 email=data.get("email"),
+                avatar=data.get("avatar"),
             )
             response_serializer = UserSerializer(user)
-            logger.info(f"User updated successfully: user_id={user_id}")
+            logger.info("User updated successfully", extra={"target_user_id": user_id})
             return success_response(
                 data=response_serializer.data,
                 message="User updated successfully",
             )
         except Exception as e:
-            logger.error(f"Failed to update user {user_id} - Error: {str(e)}")
+            logger.error(
+                "Failed to update user",
+                extra={"target_user_id": user_id, "error": str(e)},
+            )
             return error_response(
                 message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     logger.warning(
-        f"Update user validation failed for user_id: {user_id} - Errors: {serializer.errors}"
+        "Update user validation failed",
+        extra={"target_user_id": user_id, "errors": serializer.errors},
     )
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(12)
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_user(request: Request, user_id: int) -> Response:
     logger.warning(
-        f"Delete user request for user_id: {user_id} by user: {request.user.id}"
+        "Delete user request",
+        extra={"target_user_id": user_id, "user_id": request.user.id},
     )
     try:
         success = delete_user_service(user_id)
         if success:
-            logger.info(f"User deleted successfully: user_id={user_id}")
+            logger.info("User deleted successfully", extra={"target_user_id": user_id})
             return success_response(
                 message="User deleted successfully",
                 status_code=status.HTTP_200_OK,
             )
         else:
-            logger.error(f"Failed to delete user: user_id={user_id}")
+            logger.error("Failed to delete user", extra={"target_user_id": user_id})
             return error_response(
                 message="Failed to delete user",
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     except Exception as e:
-        logger.error(f"Error deleting user {user_id} - Error: {str(e)}")
+        logger.error(
+            "Error deleting user", extra={"target_user_id": user_id, "error": str(e)}
+        )
         return error_response(
             message=str(e),
             status_code=status.HTTP_400_BAD_REQUEST,
         )
+
+
+@query_budget(1)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def avatar_upload(request: Request) -> Response:
+    serializer = AvatarUploadSerializer(data=request.data)
+    if not serializer.is_valid():
+        logger.warning("Avatar upload request invalid", extra={"errors": serializer.errors})
+        return validation_error_response(errors=serializer.errors)
+    data = cast(dict[str, Any], serializer.validated_data)
+    try:
+        upload = create_avatar_upload_service(
+            request.user, content_type=data["content_type"], size=data["size"]
+        )
+    except DirectUploadUnavailable as e:
+        return error_response(message=str(e), status_code=status.HTTP_501_NOT_IMPLEMENTED)
+    return success_response(
+        data=upload,
+        message="Upload the file with the returned request, then confirm it",
+    )
+
+
+@query_budget(2)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def avatar_confirm(request: Request) -> Response:
+    serializer = AvatarConfirmSerializer(data=request.data)
+    if not serializer.is_valid():
+        return validation_error_response(errors=serializer.errors)
+    try:
+        user = confirm_avatar_upload_service(request.user, serializer.validated_data["key"])
+    except DirectUploadUnavailable as e:
+        return error_response(message=str(e), status_code=status.HTTP_501_NOT_IMPLEMENTED)
+    except ValueError as e:
+        return error_response(message=str(e), status_code=status.HTTP_400_BAD_REQUEST)
+    return success_response(
+        data=UserSerializer(user).data,
+        message="Avatar updated successfully",
+    )
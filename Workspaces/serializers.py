@@ -1,15 +1,16 @@
 from rest_framework import serializers
 
 from Workspaces.models import Workspace
+from utils.instrumentation import InstrumentedSerializerMixin
 
 
-class WorkspaceSerializer(serializers.ModelSerializer):
+class WorkspaceSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Workspace
         fields = ["id", "name", "description", "created_at"]
 
 
-class WorkspaceDetailSerializer(serializers.ModelSerializer):
+class WorkspaceDetailSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     """Serializer for workspace detail view with nested projects"""
 
     from Projects.serializers import ProjectSerializer
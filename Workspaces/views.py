@@ -1,5 +1,5 @@
 import logging
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.request import Request
@@ -21,40 +21,53 @@ from Workspaces.services import (
     update_workspace_service,
     user_list_workspaces_service,
 )
+from utils.idempotency import idempotent
+from utils.instrumentation import query_budget
 from utils.responses import success_response, error_response, validation_error_response
+from utils.throttling import LIST_THROTTLES
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@throttle_classes(LIST_THROTTLES)
 def workspace_list(request: Request) -> Response:
-    logger.debug(f"Workspace list requested by user: {request.user.id}")
+    logger.debug("Workspace list requested", extra={"user_id": request.user.id})
     workspaces = list_workspaces_service()
-    serializer = WorkspaceSerializer(workspaces, many=True)
-    logger.info(f"Retrieved {len(workspaces)} workspaces")
+    data = WorkspaceSerializer(workspaces, many=True).data
+    logger.info("Retrieved workspaces", extra={"count": len(data), "sampled": True})
     return success_response(
-        data=serializer.data,
+        data=data,
         message="Workspaces retrieved successfully",
     )
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@throttle_classes(LIST_THROTTLES)
 def user_workspace_list(request: Request) -> Response:
-    logger.debug(f"User workspace list requested by user: {request.user.id}")
+    logger.debug("User workspace list requested", extra={"user_id": request.user.id})
     workspaces = user_list_workspaces_service(request.user)
-    serializer = WorkspaceSerializer(workspaces, many=True)
-    logger.info(f"Retrieved {len(workspaces)} workspaces for user: {request.user.id}")
+    data = WorkspaceSerializer(workspaces, many=True).data
+    logger.info(
+        "Retrieved user workspaces",
+        extra={"user_id": request.user.id, "count": len(data), "sampled": True},
+    )
     return success_response(
-        data=serializer.data,
+        data=data,
         message="User workspaces retrieved successfully",
     )
 
 
+@query_budget(5)
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent
 def create_workspace(request: Request) -> Response:
     logger.info(
-        f"Create workspace request by user: {request.user.id} - name: {request.data.get('name')}"
+        "Create workspace request",
+        extra={"user_id": request.user.id, "workspace_name": request.data.get("name")},
     )
     serializer = WorkspaceSerializer(data=request.data)
     if serializer.is_valid():
@@ -67,7 +80,8 @@ def create_workspace(request: Request) -> Response:
             )
             response_serializer = WorkspaceSerializer(workspace)
             logger.info(
-                f"Workspace created successfully: {workspace.id} by user: {request.user.id}"
+                "Workspace created successfully",
+                extra={"workspace_id": workspace.id, "user_id": request.user.id},
             )
             return success_response(
                 data=response_serializer.data,
@@ -75,32 +89,40 @@ def create_workspace(request: Request) -> Response:
                 status_code=status.HTTP_201_CREATED,
             )
         except Exception as e:
-            logger.error(f"Failed to create workspace - Error: {str(e)}")
+            logger.error("Failed to create workspace", extra={"error": str(e)})
             return error_response(
                 message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
-    logger.warning(f"Create workspace validation failed: {serializer.errors}")
+    logger.warning(
+        "Create workspace validation failed", extra={"errors": serializer.errors}
+    )
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def workspace_detail(request: Request, workspace_id: int) -> Response:
     logger.debug(
-        f"Workspace detail requested for workspace_id: {workspace_id} by user: {request.user.id}"
+        "Workspace detail requested",
+        extra={"workspace_id": workspace_id, "user_id": request.user.id},
     )
     try:
         workspace = get_workspace_by_id_service(workspace_id)
         serializer = WorkspaceDetailSerializer(workspace)
-        logger.info(f"Workspace detail retrieved successfully: {workspace_id}")
+        logger.info(
+            "Workspace detail retrieved successfully",
+            extra={"workspace_id": workspace_id, "sampled": True},
+        )
         return success_response(
             data=serializer.data,
             message="Workspace retrieved successfully",
         )
     except Exception as e:
         logger.error(
-            f"Failed to retrieve workspace detail for workspace_id: {workspace_id} - Error: {str(e)}"
+            "Failed to retrieve workspace detail",
+            extra={"workspace_id": workspace_id, "error": str(e)},
         )
         return error_response(
             message=str(e),
@@ -108,11 +130,13 @@ def workspace_detail(request: Request, workspace_id: int) -> Response:
         )
 
 
+@query_budget(5)
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_workspace(request: Request, workspace_id: int) -> Response:
     logger.info(
-        f"Update workspace request for workspace_id: {workspace_id} by user: {request.user.id}"
+        "Update workspace request",
+        extra={"workspace_id": workspace_id, "user_id": request.user.id},
     )
     serializer = UpdateWorkspaceSerializer(data=request.data)
     if serializer.is_valid():
@@ -124,45 +148,60 @@ def update_workspace(request: Request, workspace_id: int) -> Response:
                 description=data.get("description", ""),
             )
             response_serializer = WorkspaceSerializer(workspace)
-            logger.info(f"Workspace updated successfully: {workspace_id}")
+            logger.info(
+                "Workspace updated successfully", extra={"workspace_id": workspace_id}
+            )
             return success_response(
                 data=response_serializer.data,
                 message="Workspace updated successfully",
             )
         except Exception as e:
-            logger.error(f"Failed to update workspace {workspace_id} - Error: {str(e)}")
+            logger.error(
+                "Failed to update workspace",
+                extra={"workspace_id": workspace_id, "error": str(e)},
+            )
             return error_response(
                 message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     logger.warning(
-        f"Update workspace validation failed for workspace_id: {workspace_id} - Errors: {serializer.errors}"
+        "Update workspace validation failed",
+        extra={"workspace_id": workspace_id, "errors": serializer.errors},
     )
     return validation_error_response(errors=serializer.errors)
 
 
+@query_budget(7)
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_workspace(request: Request, workspace_id: int) -> Response:
     logger.warning(
-        f"Delete workspace request for workspace_id: {workspace_id} by user: {request.user.id}"
+        "Delete workspace request",
+        extra={"workspace_id": workspace_id, "user_id": request.user.id},
     )
     try:
         success = delete_workspace_service(workspace_id)
         if success:
-            logger.info(f"Workspace deleted successfully: {workspace_id}")
+            logger.info(
+                "Workspace deleted successfully", extra={"workspace_id": workspace_id}
+            )
             return success_response(
                 message="Workspace deleted successfully",
                 status_code=status.HTTP_200_OK,
             )
         else:
-            logger.error(f"Failed to delete workspace: {workspace_id}")
+            logger.error(
+                "Failed to delete workspace", extra={"workspace_id": workspace_id}
+            )
             return error_response(
                 message="Failed to delete workspace",
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
     except Exception as e:
-        logger.error(f"Error deleting workspace {workspace_id} - Error: {str(e)}")
+        logger.error(
+            "Error deleting workspace",
+            extra={"workspace_id": workspace_id, "error": str(e)},
+        )
         return error_response(
             message=str(e),
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,87 @@
+"""
+Benchmark avatar upload validation: DRF's ImageField against AvatarField.
+
+DRF's ImageField has Pillow open and verify() the whole upload;
+Users.serializers.AvatarField parses only the first AVATAR_PROBE_BYTES. Times
+both on PNG and JPEG uploads of growing size; AvatarField's cost should not
+grow with the image.
+
+Usage:
+    python -m benchmarks.avatar_validation [--repeat 20]
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pmtool.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("LOG_QUEUE_ENABLED", "False")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from PIL import Image  # noqa: E402
+from rest_framework import serializers  # noqa: E402
+
+from Users.serializers import AvatarField  # noqa: E402
+
+SIDES = (256, 1024, 4096)
+
+
+def encode(side: int, format: str) -> bytes:
+    # Noise, so the encoded size grows with the pixel count like a photo's
+    image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format)
+    return buffer.getvalue()
+
+
+def best_ms(field, data: bytes, name: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        upload = SimpleUploadedFile(name, data)
+        start = time.perf_counter()
+        field.run_validation(upload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+    # Measure the validation, not the size limit
+    settings.AVATAR_MAX_UPLOAD_BYTES = 1 << 30
+
+    results = []
+    print(f"{'format':<7}{'side':>6}{'KB':>9}{'ImageField':>12}{'AvatarField':>13}  (ms)")
+    for format in ("PNG", "JPEG"):
+        for side in SIDES:
+            data = encode(side, format)
+            name = f"me.{format.lower()}"
+            row = {
+                "format": format,
+                "side": side,
+                "bytes": len(data),
+                "image_field_ms": best_ms(serializers.ImageField(), data, name, args.repeat),
+                "avatar_field_ms": best_ms(AvatarField(), data, name, args.repeat),
+            }
+            results.append(row)
+            print(
+                f"{format:<7}{side:>6}{len(data) / 1024:>9.0f}"
+                f"{row['image_field_ms']:>12.2f}{row['avatar_field_ms']:>13.2f}"
+            )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
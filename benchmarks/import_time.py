@@ -0,0 +1,156 @@
+"""
+Report the import time of a web worker boot and of a management command.
+
+Each scenario runs in a fresh interpreter under ``python -X importtime``:
+
+    wsgi     import pmtool.wsgi (settings, apps, middleware) and load the
+             URLconf, i.e. what a gunicorn worker does before its first request
+    manage   python manage.py check, the start-up every command pays
+
+The self times of all imported modules are summed per top-level package.
+Each scenario runs --runs times and the fastest run is reported, since
+noise (other processes, a cold disk cache) only ever adds time. The command exits with status 1 when a scenario exceeds its
+--budget-ms, or when --compare finds a total more than --threshold percent
+above the baseline:
+
+    python -m benchmarks.import_time --output imports.json
+    python -m benchmarks.import_time --budget-ms wsgi=400 manage=500
+    python -m benchmarks.import_time --compare before.json --threshold 10
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = {
+    "wsgi": [
+        "-c",
+        "import pmtool.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns",
+    ],
+    "manage": ["manage.py", "check"],
+}
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str) -> dict[str, int]:
+    """Sum the self time (us) of every module in ``-X importtime`` output by top-level package."""
+    packages: dict[str, int] = {}
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match:
+            package = match.group(4).split(".")[0]
+            packages[package] = packages.get(package, 0) + int(match.group(1))
+    return packages
+
+
+def measure(scenario: str) -> dict[str, int]:
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "pmtool.settings",
+    }
+    env.setdefault("DATABASE_URL", "sqlite://:memory:")
+    env.setdefault("DEBUG", "False")
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *SCENARIOS[scenario]],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode:
+        raise SystemExit(f"{scenario} failed:\n{process.stderr[-2000:]}")
+    return parse_importtime(process.stderr)
+
+
+def report(scenario: str, runs: int) -> dict:
+    samples = [measure(scenario) for _ in range(runs)]
+    totals = [sum(sample.values()) for sample in samples]
+    fastest = samples[totals.index(min(totals))]
+    return {
+        "total_ms": sum(fastest.values()) / 1000,
+        "spread_ms": (max(totals) - min(totals)) / 1000,
+        "stdev_ms": statistics.pstdev(totals) / 1000,
+        "packages_ms": {
+            name: us / 1000 for name, us in sorted(fastest.items(), key=lambda item: -item[1])
+        },
+    }
+
+
+def print_report(results: dict, top: int) -> None:
+    for scenario, result in results.items():
+        print(
+            f"\n{scenario}: {result['total_ms']:.1f} ms of imports "
+            f"(spread {result['spread_ms']:.1f} ms)"
+        )
+        for name, ms in list(result["packages_ms"].items())[:top]:
+            print(f"  {name:<32}{ms:>8.1f} ms")
+
+
+def check(results: dict, budgets: dict[str, float], baseline: dict, threshold: float) -> bool:
+    """Print every budget or baseline violation; return whether there were any."""
+    failed = False
+    for scenario, result in results.items():
+        total = result["total_ms"]
+        if scenario in budgets and total > budgets[scenario]:
+            print(f"FAIL {scenario}: {total:.1f} ms is over the {budgets[scenario]:.0f} ms budget")
+            failed = True
+        if scenario in baseline:
+            before = baseline[scenario]["total_ms"]
+            change = (total - before) / before * 100
+            if change > threshold:
+                print(f"FAIL {scenario}: {before:.1f} -> {total:.1f} ms ({change:+.1f}%)")
+                failed = True
+            else:
+                print(f"ok   {scenario}: {before:.1f} -> {total:.1f} ms ({change:+.1f}%)")
+    return failed
+
+
+def parse_budget(value: str) -> tuple[str, float]:
+    scenario, _, ms = value.partition("=")
+    if scenario not in SCENARIOS or not ms:
+        raise argparse.ArgumentTypeError(f"expected <{'|'.join(SCENARIOS)}>=<ms>, got {value!r}")
+    return scenario, float(ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--runs", type=int, default=10, help="interpreters per scenario")
+    parser.add_argument("--top", type=int, default=15, help="packages listed per scenario")
+    parser.add_argument(
+        "--budget-ms", nargs="+", type=parse_budget, default=[], metavar="SCENARIO=MS"
+    )
+    parser.add_argument("--compare", metavar="BASELINE", help="result file of an earlier run")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="total increase (%%) counted as a regression"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {scenario: report(scenario, args.runs) for scenario in args.scenarios}
+    print_report(results, args.top)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    print()
+    if check(results, dict(args.budget_ms), baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
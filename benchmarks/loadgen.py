@@ -0,0 +1,509 @@
+"""
+Load generator: replay recorded traffic or a synthetic mix against a running server.
+
+Requests are sent over keep-alive HTTP connections by --concurrency worker
+threads. Without --rate the load is closed-loop (each worker sends its next
+request as soon as the previous one completes). With --rate requests arrive
+on a Poisson schedule whatever the server's speed (open loop), and latency
+is measured from the scheduled arrival time, so queueing in an overloaded
+server shows up in the percentiles. Every user logs in through
+/api/auth/token/ and logs in again when its access token expires.
+
+All the load comes from one client IP, which the default throttles
+(utils.throttling) limit within seconds, so start the target server with
+THROTTLE_ENABLED=False. Throttled (429) responses are reported separately
+from errors, and a warning is printed when there were any.
+
+Traffic sources:
+    (default)        synthetic mix of task, project and workspace reads and
+                     writes (MIX), over the ids each user can see
+    --replay FILE    JSONL, one request per line:
+                     {"method": "GET", "path": "/api/tasks/?project_id=3",
+                      "body": {...}, "user": "perf3", "at": 12.5}
+                     "body", "user" and "at" (seconds since the start, honoured
+                     unless --rate is given) are optional
+
+Record traffic from a server's performance log (GET requests only, since
+bodies are not logged; arrival times have one-second resolution). Replay it
+against a copy of the database it came from, because the recorded ids must
+exist:
+    python -m benchmarks.loadgen extract logs/performance.log > traffic.jsonl
+
+Examples (users from manage.py seed_perf_data):
+    python -m benchmarks.loadgen run --base-url http://127.0.0.1:8000 \\
+        --concurrency 16 --duration 60 --output sync.json --label "sync x4"
+    python -m benchmarks.loadgen run --replay traffic.jsonl --rate 200 --duration 120
+"""
+
+import argparse
+import ast
+import http.client
+import json
+import queue
+import random
+import re
+import statistics
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import count, cycle
+from time import perf_counter, sleep
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+# Synthetic traffic mix: share of requests per kind
+MIX = {
+    "task_list": 30,
+    "task_detail": 20,
+    "project_detail": 10,
+    "user_workspace_list": 10,
+    "workspace_detail": 5,
+    "project_list": 5,
+    "update_task": 10,
+    "create_task": 10,
+}
+
+_ID = re.compile(r"/\d+(?=/|$)")
+_LOG_TIME = re.compile(r"\] (\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)")
+_LOG_FIELD = re.compile(r"(\w+)=('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\S+)")
+
+
+@dataclass
+class Target:
+    method: str
+    path: str
+    body: Optional[dict] = None
+    user: Optional[str] = None
+    at: Optional[float] = None
+
+    @property
+    def label(self) -> str:
+        """Endpoint label: ids replaced by {id}, query reduced to its keys."""
+        path, _, query = self.path.partition("?")
+        label = f"{self.method} {_ID.sub('/{id}', path)}"
+        if query:
+            keys = sorted({pair.split("=", 1)[0] for pair in query.split("&") if pair})
+            label += "?" + "&".join(keys)
+        return label
+
+
+@dataclass
+class Result:
+    label: str
+    latency: float
+    status: int  # 0 when the request failed without a response
+
+
+@dataclass
+class UserData:
+    workspaces: list[int] = field(default_factory=list)
+    projects: list[int] = field(default_factory=list)
+    tasks: list[int] = field(default_factory=list)
+
+
+class Session:
+    """One keep-alive connection plus the shared token store."""
+
+    def __init__(self, base_url: str, tokens: "TokenStore", timeout: float):
+        parts = urlsplit(base_url)
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self.connect = lambda: connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.prefix = parts.path.rstrip("/")
+        self.tokens = tokens
+        self.connection: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body=None, token: Optional[str] = None):
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if self.connection is None:
+            self.connection = self.connect()
+        try:
+            self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            raise
+        return response.status, data
+
+    def send(self, target: Target, user: str) -> int:
+        """Send ``target`` as ``user``; log in again once if the token expired."""
+        for attempt in range(2):
+            token = self.tokens.get(self, user)
+            status, _ = self.request(target.method, target.path, target.body, token)
+            if status != 401 or attempt:
+                return status
+            self.tokens.invalidate(user, token)
+        return status
+
+
+class TokenStore:
+    """Access tokens per user, obtained through /api/auth/token/."""
+
+    def __init__(self, password: str):
+        self.password = password
+        self.tokens: dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def get(self, session: Session, user: str) -> str:
+        token = self.tokens.get(user)
+        if token:
+            return token
+        with self.lock:
+            if user not in self.tokens:
+                status, data = session.request(
+                    "POST", "/api/auth/token/", {"username": user, "password": self.password}
+                )
+                if status != 200:
+                    raise SystemExit(f"login failed for {user!r}: HTTP {status} {data[:200]!r}")
+                self.tokens[user] = json.loads(data)["access"]
+            return self.tokens[user]
+
+    def invalidate(self, user: str, token: str) -> None:
+        with self.lock:
+            if self.tokens.get(user) == token:
+                del self.tokens[user]
+
+
+def discover(session: Session, user: str, limit: int = 50) -> UserData:
+    """Collect the workspace, project and task ids ``user`` can work with."""
+
+    def get(path):
+        status, data = session.request("GET", path, token=session.tokens.get(session, user))
+        return json.loads(data)["data"] if status == 200 else []
+
+    found = UserData()
+    found.workspaces = [w["id"] for w in get("/api/workspaces/me/")][:limit]
+    for workspace_id in found.workspaces[:5]:
+        found.projects += [p["id"] for p in get(f"/api/projects/?workspace_id={workspace_id}")]
+    for project_id in found.projects[:5]:
+        found.tasks += [t["id"] for t in get(f"/api/tasks/?project_id={project_id}")][:limit]
+    return found
+
+
+def synthetic(rng: random.Random, users: dict[str, UserData]) -> Iterator[Target]:
+    names = [name for name, data in users.items() if data.tasks]
+    if not names:
+        raise SystemExit("none of the users can see any task; seed data first (seed_perf_data)")
+    return _synthetic_mix(rng, users, names)
+
+
+def _synthetic_mix(
+    rng: random.Random, users: dict[str, UserData], names: list[str]
+) -> Iterator[Target]:
+    kinds, weights = zip(*MIX.items())
+    counter = 0
+    while True:
+        user = rng.choice(names)
+        data = users[user]
+        kind = rng.choices(kinds, weights)[0]
+        counter += 1
+        if kind == "task_list":
+            yield Target("GET", f"/api/tasks/?project_id={rng.choice(data.projects)}", user=user)
+        elif kind == "task_detail":
+            yield Target("GET", f"/api/tasks/{rng.choice(data.tasks)}/", user=user)
+        elif kind == "project_detail":
+            yield Target("GET", f"/api/projects/{rng.choice(data.projects)}/", user=user)
+        elif kind == "user_workspace_list":
+            yield Target("GET", "/api/workspaces/me/", user=user)
+        elif kind == "workspace_detail":
+            yield Target("GET", f"/api/workspaces/{rng.choice(data.workspaces)}/", user=user)
+        elif kind == "project_list":
+            workspace_id = rng.choice(data.workspaces)
+            yield Target("GET", f"/api/projects/?workspace_id={workspace_id}", user=user)
+        elif kind == "update_task":
+            body = {"name": f"Load task {counter}", "status": rng.choice(["todo", "done"])}
+            yield Target("PUT", f"/api/tasks/{rng.choice(data.tasks)}/update/", body, user)
+        else:
+            body = {"name": f"Load task {counter}", "project": rng.choice(data.projects)}
+            yield Target("POST", "/api/tasks/create/", body, user)
+
+
+def replay(path: str, loop: bool) -> Iterator[Target]:
+    with open(path) as fh:
+        targets = [Target(**json.loads(line)) for line in fh if line.strip()]
+    if not targets:
+        raise SystemExit(f"{path} has no requests")
+    if not loop:
+        yield from targets
+        return
+    # Shift the timestamps of each pass so arrival times keep increasing.
+    span = max((t.at or 0.0) for t in targets) + 1.0
+    for iteration in count():
+        for target in targets:
+            at = None if target.at is None else target.at + iteration * span
+            yield Target(target.method, target.path, target.body, target.user, at)
+
+
+class LoadRun:
+    def __init__(self, args, targets: Iterator[Target], users: list[str], tokens: TokenStore):
+        self.args = args
+        self.targets = targets
+        self.users = cycle(users)
+        self.tokens = tokens
+        self.results: list[Result] = []
+        self.issued = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def next_target(self) -> Optional[Target]:
+        with self.lock:
+            if self.args.requests and self.issued >= self.args.requests:
+                return None
+            target = next(self.targets, None)
+            if target is None:
+                return None
+            if target.user is None:
+                target.user = next(self.users)
+            self.issued += 1
+            return target
+
+    def execute(self, session: Session, target: Target, started: float) -> None:
+        try:
+            status = session.send(target, target.user)
+        except (OSError, http.client.HTTPException):
+            status = 0
+        result = Result(target.label, perf_counter() - started, status)
+        with self.lock:
+            self.results.append(result)
+
+    def closed_loop_worker(self) -> None:
+        session = Session(self.args.base_url, self.tokens, self.args.timeout)
+        while not self.stop.is_set():
+            target = self.next_target()
+            if target is None:
+                return
+            self.execute(session, target, perf_counter())
+
+    def open_loop_worker(self, arrivals: queue.Queue) -> None:
+        session = Session(self.args.base_url, self.tokens, self.args.timeout)
+        while True:
+            item = arrivals.get()
+            if item is None:
+                return
+            scheduled, target = item
+            self.execute(session, target, scheduled)
+
+    def dispatch(self, arrivals: queue.Queue, start: float) -> None:
+        rng = random.Random(self.args.seed)
+        next_arrival = start
+        while not self.stop.is_set():
+            target = self.next_target()
+            if target is None:
+                break
+            if self.args.rate:
+                next_arrival += rng.expovariate(self.args.rate)
+            elif target.at is not None:
+                next_arrival = start + target.at / self.args.speed
+            delay = next_arrival - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            arrivals.put((next_arrival, target))
+        for _ in range(self.args.concurrency):
+            arrivals.put(None)
+
+    def run(self) -> float:
+        open_loop = bool(self.args.rate) or self.args.timed_replay
+        start = perf_counter()
+        if open_loop:
+            arrivals: queue.Queue = queue.Queue()
+            workers = [
+                threading.Thread(target=self.open_loop_worker, args=(arrivals,), daemon=True)
+                for _ in range(self.args.concurrency)
+            ]
+            workers.append(
+                threading.Thread(target=self.dispatch, args=(arrivals, start), daemon=True)
+            )
+        else:
+            workers = [
+                threading.Thread(target=self.closed_loop_worker, daemon=True)
+                for _ in range(self.args.concurrency)
+            ]
+        for worker in workers:
+            worker.start()
+        deadline = start + self.args.duration if self.args.duration else None
+        while any(worker.is_alive() for worker in workers):
+            if deadline and perf_counter() > deadline:
+                self.stop.set()
+                break
+            sleep(0.05)
+        elapsed = perf_counter() - start
+        self.stop.set()
+        with self.lock:
+            self.results = list(self.results)
+        return elapsed
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(results: list[Result], elapsed: float) -> dict:
+    def stats(group: list[Result]) -> dict:
+        latencies = [r.latency for r in group]
+        throttled = sum(1 for r in group if r.status == 429)
+        errors = sum(1 for r in group if r.status == 0 or r.status >= 400) - throttled
+        return {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": errors / len(group),
+            "throttled": throttled,
+            "throttled_rate": throttled / len(group),
+            "throughput_rps": len(group) / elapsed,
+            "mean_ms": statistics.fmean(latencies) * 1000,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": max(latencies) * 1000,
+            "statuses": {
+                str(status): sum(1 for r in group if r.status == status)
+                for status in sorted({r.status for r in group})
+            },
+        }
+
+    by_label: dict[str, list[Result]] = {}
+    for result in results:
+        by_label.setdefault(result.label, []).append(result)
+    return {
+        "elapsed_s": elapsed,
+        "total": stats(results),
+        "endpoints": {label: stats(group) for label, group in sorted(by_label.items())},
+    }
+
+
+def print_report(summary: dict) -> None:
+    print(
+        f"\n{'endpoint':<44}{'reqs':>7}{'err%':>7}{'429%':>7}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}"
+    )
+    rows = list(summary["endpoints"].items()) + [("TOTAL", summary["total"])]
+    for label, s in rows:
+        print(
+            f"{label:<44}{s['requests']:>7}{s['error_rate'] * 100:>6.1f}%"
+            f"{s['throttled_rate'] * 100:>6.1f}%"
+            f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['throughput_rps']:>9.1f}"
+        )
+    print("(latencies in ms)")
+    if summary["total"]["throttled"]:
+        print(
+            f"warning: {summary['total']['throttled']} requests were throttled (429); "
+            "start the server with THROTTLE_ENABLED=False",
+            file=sys.stderr,
+        )
+
+
+def run_command(args) -> None:
+    if args.user:
+        users = args.user
+    else:
+        users = [f"{args.user_prefix}{i}" for i in range(args.user_count)]
+    tokens = TokenStore(args.password)
+    session = Session(args.base_url, tokens, args.timeout)
+    for user in users:
+        tokens.get(session, user)  # fail fast on bad credentials
+
+    if args.replay:
+        targets = replay(args.replay, args.loop)
+        first = next(targets)
+        args.timed_replay = not args.rate and first.at is not None
+        targets = _chain(first, targets)
+    else:
+        args.timed_replay = False
+        print(f"Discovering data for {len(users)} users...", file=sys.stderr)
+        targets = synthetic(
+            random.Random(args.seed), {user: discover(session, user) for user in users}
+        )
+
+    load = LoadRun(args, targets, users, tokens)
+    elapsed = load.run()
+    if not load.results:
+        raise SystemExit("no requests completed")
+    summary = summarize(load.results, elapsed)
+    print_report(summary)
+
+    if args.output:
+        report = {
+            "label": args.label,
+            "timestamp": datetime.now().isoformat(),
+            "base_url": args.base_url,
+            "source": args.replay or "synthetic",
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            **summary,
+        }
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+def _chain(first: Target, rest: Iterator[Target]) -> Iterator[Target]:
+    yield first
+    yield from rest
+
+
+def extract_command(args) -> None:
+    """Convert GET requests of a performance log into replayable JSONL."""
+    start = None
+    with open(args.log) as fh:
+        for line in fh:
+            match = _LOG_TIME.search(line)
+            if " | " not in line or match is None:
+                continue
+            fields = {}
+            for key, raw in _LOG_FIELD.findall(line.split(" | ", 1)[1]):
+                try:
+                    fields[key] = ast.literal_eval(raw)
+                except (ValueError, SyntaxError):
+                    fields[key] = raw
+            if fields.get("method") != "GET" or "path" not in fields:
+                continue
+            timestamp = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+            start = timestamp if start is None else start
+            print(json.dumps({"method": "GET", "path": fields["path"], "at": timestamp - start}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="generate load")
+    run.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run.add_argument("--replay", help="JSONL file of requests to replay")
+    run.add_argument("--loop", action="store_true", help="replay the file repeatedly")
+    run.add_argument(
+        "--speed", type=float, default=1.0, help="replay speed-up for recorded 'at' times"
+    )
+    run.add_argument("--concurrency", type=int, default=8, help="worker threads")
+    run.add_argument("--rate", type=float, help="open-loop arrival rate (requests/s)")
+    run.add_argument("--duration", type=float, default=30.0, help="seconds (0: until done)")
+    run.add_argument("--requests", type=int, help="stop after this many requests")
+    run.add_argument("--timeout", type=float, default=30.0, help="per-request timeout (s)")
+    run.add_argument("--user", action="append", help="username (repeatable)")
+    run.add_argument("--user-prefix", default="perf", help="usernames <prefix>0..N-1")
+    run.add_argument("--user-count", type=int, default=20)
+    run.add_argument("--password", default="perfpass123")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--label", default="", help="free-form label stored in the JSON output")
+    run.add_argument("--output", help="write results as JSON to this file")
+    run.set_defaults(handler=run_command)
+
+    extract = commands.add_parser("extract", help="performance log -> replay JSONL")
+    extract.add_argument("log", help="path to logs/performance.log")
+    extract.set_defaults(handler=extract_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Compare request latency under load with the log queue on and off.
+
+gunicorn is started in turn with LOG_QUEUE_ENABLED=True and False (and,
+with --sample-every, with each LOG_SAMPLE_EVERY given), benchmarks.loadgen
+sends its synthetic mix of API reads and writes for --duration seconds, and
+the server is stopped again. The report lists throughput, error rate and
+latency percentiles per configuration; the p99 column is the one the queue
+is meant to move, since a write stalled on disk holds up the request that
+logged it. Repeat with --repeat to see the run-to-run spread:
+
+    python manage.py seed_perf_data --users 200 --workspaces 40 --tasks-per 100
+    python -m benchmarks.logging_load --database-url sqlite:////tmp/bench.sqlite3 \\
+        --rate 30 --concurrency 32 --duration 40 --repeat 3
+    python -m benchmarks.logging_load --sample-every 100 1 --output logging_load.json
+
+--rate sends requests on a fixed schedule (open loop), so a slow response
+does not also slow the load down; without it each loadgen thread sends its
+next request as soon as the last one returns. The database must hold the
+seed_perf_data users (perf0, perf1, ...); the load mix creates and deletes
+rows, so use a scratch database.
+"""
+
+import argparse
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.endpoints import _git_commit
+from benchmarks.server_profiles import ROOT, free_port, wait_for_port
+
+
+def run_configuration(queue: bool, sample_every: int, args) -> dict:
+    port = free_port()
+    label = f"queue-{'on' if queue else 'off'} 1/{sample_every}"
+    env = {
+        **os.environ,
+        "GUNICORN_PROFILE": args.profile,
+        "DATABASE_URL": args.database_url,
+        "DEBUG": "False",
+        # One client IP sending the whole load would be throttled
+        "THROTTLE_ENABLED": "False",
+        "LOG_QUEUE_ENABLED": str(queue),
+        "LOG_SAMPLE_EVERY": str(sample_every),
+    }
+    if args.workers:
+        env["WEB_CONCURRENCY"] = str(args.workers)
+    server_log = open(args.server_log, "a")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}"],
+        cwd=ROOT,
+        env=env,
+        stdout=server_log,
+        stderr=subprocess.STDOUT,
+    )
+    command = [
+        sys.executable, "-m", "benchmarks.loadgen", "run",
+        "--base-url", f"http://127.0.0.1:{port}",
+        "--concurrency", str(args.concurrency),
+        "--duration", str(args.duration),
+        "--user-count", str(args.user_count),
+        "--seed", str(args.seed),
+        "--label", label,
+    ]
+    if args.rate:
+        command += ["--rate", str(args.rate)]
+    try:
+        wait_for_port(port, server, args.startup_timeout)
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            subprocess.run(
+                [*command, "--output", output.name],
+                cwd=ROOT,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            report = json.load(open(output.name))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        server_log.close()
+    return {"configuration": label, "queue": queue, "sample_every": sample_every, **report}
+
+
+def print_comparison(results: list[dict]) -> None:
+    print(f"\n{'configuration':<18}{'req/s':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for result in results:
+        total = result["total"]
+        print(
+            f"{result['configuration']:<18}{total['throughput_rps']:>9.1f}"
+            f"{total['error_rate'] * 100:>6.1f}%{total['p50_ms']:>9.1f}"
+            f"{total['p95_ms']:>9.1f}{total['p99_ms']:>9.1f}"
+        )
+    print("(latencies in ms)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--database-url",
+        help="seeded scratch database (default: DATABASE_URL from the environment)",
+    )
+    parser.add_argument(
+        "--sample-every",
+        type=int,
+        nargs="+",
+        default=[100],
+        help="LOG_SAMPLE_EVERY values to run (1 writes every sampled INFO line)",
+    )
+    parser.add_argument("--profile", default="gthread", help="GUNICORN_PROFILE")
+    parser.add_argument("--workers", type=int, help="WEB_CONCURRENCY (default: profile sizing)")
+    parser.add_argument("--concurrency", type=int, default=16, help="loadgen worker threads")
+    parser.add_argument("--rate", type=float, help="requests per second (open loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per run")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per configuration")
+    parser.add_argument("--user-count", type=int, default=20, help="seeded users to log in as")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--server-log", default=os.devnull, help="file for gunicorn and Django console output"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    args.database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) is required")
+
+    results = []
+    # Interleaved, so drift over the session hits every configuration alike
+    for _ in range(args.repeat):
+        for sample_every in args.sample_every:
+            for queue in (True, False):
+                print(
+                    f"Benchmarking queue={queue} sample_every={sample_every}...",
+                    file=sys.stderr,
+                )
+                results.append(run_configuration(queue, sample_every, args))
+    print_comparison(results)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(
+                {
+                    "commit": _git_commit(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "cpus": os.cpu_count(),
+                    "profile": args.profile,
+                    "concurrency": args.concurrency,
+                    "rate": args.rate,
+                    "duration_s": args.duration,
+                    "results": results,
+                },
+                fh,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
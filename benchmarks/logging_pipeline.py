@@ -0,0 +1,129 @@
+"""
+Benchmark the cost of a logger.info call on the request thread.
+
+Compares the old setup, where each call writes synchronously to three
+RotatingFileHandlers and the console, with the same handlers behind
+utils.log.LogPipeline. Several threads log concurrently to simulate request
+threads. Each thread pauses between log calls to stand in for the rest of
+the request (DB and network waits).
+
+Usage:
+    python -m benchmarks.logging_pipeline [--threads 8] [--calls 5000] [--pause-ms 0.5]
+        [--output results.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from time import perf_counter
+
+from utils.log import LogPipeline
+
+FORMAT = "[{levelname}] {asctime} - {name} - {module}.{funcName}:{lineno} - {message}"
+
+
+def build_logger(directory: str) -> logging.Logger:
+    logger = logging.getLogger("benchmarks.logging_pipeline")
+    logger.handlers = []
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter(FORMAT, style="{")
+    console = logging.StreamHandler(open(os.devnull, "w"))
+    console.name = "console"
+    handlers = [console]
+    for name in ("pmtool", "errors", "security"):
+        handler = RotatingFileHandler(
+            os.path.join(directory, f"{name}.log"), maxBytes=1024 * 1024, backupCount=2
+        )
+        handler.name = name
+        handlers.append(handler)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    return logger
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run(logger: logging.Logger, threads: int, calls: int, pause: float) -> list[float]:
+    samples: list[float] = []
+    lock = threading.Lock()
+
+    def worker(worker_id: int) -> None:
+        local = []
+        for i in range(calls):
+            start = perf_counter()
+            logger.info("Task created successfully: %s by user: %s", i, worker_id)
+            local.append(perf_counter() - start)
+            time.sleep(pause)
+        with lock:
+            samples.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return samples
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "calls": len(samples),
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p95_us": percentile(samples, 95) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+        "max_us": max(samples) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=5000, help="log calls per thread")
+    parser.add_argument(
+        "--pause-ms", type=float, default=0.5, help="time between log calls per thread"
+    )
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        results["synchronous"] = summarize(
+            run(build_logger(directory), args.threads, args.calls, args.pause_ms / 1000)
+        )
+
+        logger = build_logger(directory)
+        pipeline = LogPipeline(args.queue_size)
+        pipeline.install([logger])
+        samples = run(logger, args.threads, args.calls, args.pause_ms / 1000)
+        pipeline.stop()
+        results["queued"] = summarize(samples)
+        results["queued"]["dropped"] = pipeline.dropped
+
+    print(f"{'mode':<12}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>12}  (us)")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<12}{stats['mean_us']:>10.1f}{stats['p50_us']:>10.1f}"
+            f"{stats['p95_us']:>10.1f}{stats['p99_us']:>10.1f}{stats['max_us']:>12.1f}"
+        )
+    print(f"dropped records (queued mode): {results['queued']['dropped']}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark the per-request cost of the middleware stack.
+
+Requests go through Django's request handler with each middleware stack to
+a trivial JSON view, so the timings are middleware overhead plus a constant
+(URL resolution, building the request):
+
+    none     no middleware at all (the baseline)
+    django   the stock stack: sessions, CSRF, auth, messages and
+             X-Frame-Options run on every request
+    split    settings.MIDDLEWARE: those five pass API requests straight
+             through (utils.middleware.SkipForAPIMixin)
+    minimal  settings.MIDDLEWARE without the five: the floor for the split
+
+Each stack is timed on an API path (/api/ping/) and on a path outside the
+API, which like the admin keeps the full stack. Stacks are timed in turns
+and the best of --repeat rounds is kept. Logging is disabled.
+
+Usage:
+    python -m benchmarks.middleware_overhead [--requests 5000] [--repeat 10]
+        [--output results.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import timeit
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pmtool.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("LOG_QUEUE_ENABLED", "False")
+os.environ.setdefault("DEBUG", "False")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.base import BaseHandler  # noqa: E402
+from django.http import JsonResponse  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from django.urls import path  # noqa: E402
+
+BROWSER_MIDDLEWARE = {
+    "SessionMiddleware",
+    "CsrfViewMiddleware",
+    "AuthenticationMiddleware",
+    "MessageMiddleware",
+    "XFrameOptionsMiddleware",
+}
+DJANGO_STACK = [
+    "utils.middleware.PerformanceMiddleware",
+    "utils.query_inspector.QueryInspectorMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+PATHS = {"api": "/api/ping/", "other": "/ping/"}
+
+
+def ping(request):
+    return JsonResponse({"success": True})
+
+
+urlpatterns = [path("api/ping/", ping), path("ping/", ping)]
+
+
+def make_handler(middleware: list[str]) -> BaseHandler:
+    handler = BaseHandler()
+    with override_settings(MIDDLEWARE=middleware):
+        handler.load_middleware()
+    return handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000, help="requests per round")
+    parser.add_argument("--repeat", type=int, default=10, help="rounds per stack and path")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    stacks = {
+        "none": [],
+        "django": DJANGO_STACK,
+        "split": settings.MIDDLEWARE,
+        "minimal": [
+            entry for entry in settings.MIDDLEWARE
+            if entry.rsplit(".", 1)[1] not in BROWSER_MIDDLEWARE
+        ],
+    }
+    handlers = {name: make_handler(stack) for name, stack in stacks.items()}
+    factory = RequestFactory()
+    best = {(name, kind): float("inf") for name in stacks for kind in PATHS}
+
+    with override_settings(ROOT_URLCONF=__name__):
+        for _ in range(args.repeat):
+            for (name, kind), value in best.items():
+                handler, url = handlers[name], PATHS[kind]
+                seconds = timeit.timeit(
+                    lambda: handler.get_response(factory.get(url)), number=args.requests
+                )
+                best[name, kind] = min(value, seconds / args.requests * 1e6)
+
+    results = {
+        name: {
+            kind: {
+                "us_per_request": best[name, kind],
+                "middleware_us": best[name, kind] - best["none", kind],
+            }
+            for kind in PATHS
+        }
+        for name in stacks
+    }
+    print(f"Best of {args.repeat} x {args.requests} requests; middleware = stack - none (us)")
+    print(f"{'stack':<10}{'api':>10}{'middleware':>12}{'other':>10}{'middleware':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<10}"
+            + "".join(
+                f"{result[kind]['us_per_request']:>10.1f}{result[kind]['middleware_us']:>12.1f}"
+                for kind in PATHS
+            )
+        )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Compare the gunicorn server profiles of gunicorn.conf.py under the same load.
+
+Each profile (GUNICORN_PROFILE=sync, gthread, uvicorn) is started in turn
+with production settings against the given database, benchmarks.loadgen
+sends its synthetic mix of API reads and writes for --duration seconds,
+and the server is stopped again. The report lists throughput, error rate
+and latency percentiles per profile, plus the memory of the master and its
+workers (PSS, which counts pages shared copy-on-write after preload_app
+only once):
+
+    python manage.py seed_perf_data --users 200 --workspaces 50 --tasks-per 50
+    python -m benchmarks.server_profiles --database-url sqlite:////tmp/bench.sqlite3 \\
+        --concurrency 32 --duration 60 --output profiles.json
+    python -m benchmarks.server_profiles --profiles sync gthread --workers 4 --no-preload
+
+The database must hold the seed_perf_data users (perf0, perf1, ...); the
+load mix creates and deletes rows, so use a scratch database.
+"""
+
+import argparse
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from time import monotonic, sleep
+
+from benchmarks.endpoints import _git_commit
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILES = ["sync", "gthread", "uvicorn"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float) -> None:
+    deadline = monotonic() + timeout
+    while monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"gunicorn exited with status {process.returncode} (see --server-log)"
+            )
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            sleep(0.2)
+    raise RuntimeError(f"gunicorn did not listen on port {port} within {timeout:.0f}s")
+
+
+def process_tree(pid: int) -> list[int]:
+    """``pid`` and its direct children (the gunicorn master and its workers)."""
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(stat.parent.name))
+    return [pid, *children]
+
+
+def memory_kb(pids: list[int]) -> dict:
+    """Summed RSS and PSS of ``pids`` in kB (Linux only; empty elsewhere)."""
+    totals = {"rss_kb": 0, "pss_kb": 0}
+    for pid in pids:
+        try:
+            lines = Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()
+        except OSError:
+            return {}
+        for line in lines:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                totals[f"{key.lower()}_kb"] += int(value.split()[0])
+    return totals
+
+
+def run_profile(profile: str, args) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "GUNICORN_PROFILE": profile,
+        "GUNICORN_PRELOAD": str(args.preload),
+        "DATABASE_URL": args.database_url,
+        "DEBUG": "False",
+        # One client IP sending the whole load would be throttled
+        "THROTTLE_ENABLED": "False",
+    }
+    if args.workers:
+        env["WEB_CONCURRENCY"] = str(args.workers)
+    if args.threads:
+        env["GUNICORN_THREADS"] = str(args.threads)
+    server_log = open(args.server_log, "a")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}"],
+        cwd=ROOT,
+        env=env,
+        stdout=server_log,
+        stderr=subprocess.STDOUT,
+    )
+    try:
+        wait_for_port(port, server, args.startup_timeout)
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.loadgen", "run",
+                    "--base-url", f"http://127.0.0.1:{port}",
+                    "--concurrency", str(args.concurrency),
+                    "--duration", str(args.duration),
+                    "--user-count", str(args.user_count),
+                    "--seed", str(args.seed),
+                    "--label", profile,
+                    "--output", output.name,
+                ],
+                cwd=ROOT,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            # Measured after the load, once every worker has served requests
+            memory = memory_kb(process_tree(server.pid))
+            report = json.load(open(output.name))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        server_log.close()
+    return {"profile": profile, **memory, **report}
+
+
+def print_comparison(results: list[dict]) -> None:
+    print(
+        f"\n{'profile':<10}{'req/s':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}"
+        f"{'RSS MB':>9}{'PSS MB':>9}"
+    )
+    for result in results:
+        total = result["total"]
+        rss = f"{result['rss_kb'] / 1024:>9.0f}" if "rss_kb" in result else f"{'-':>9}"
+        pss = f"{result['pss_kb'] / 1024:>9.0f}" if "pss_kb" in result else f"{'-':>9}"
+        print(
+            f"{result['profile']:<10}{total['throughput_rps']:>9.1f}"
+            f"{total['error_rate'] * 100:>6.1f}%{total['p50_ms']:>9.1f}"
+            f"{total['p95_ms']:>9.1f}{total['p99_ms']:>9.1f}{rss}{pss}"
+        )
+    print("(latencies in ms)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--database-url",
+        help="seeded scratch database (default: DATABASE_URL from the environment)",
+    )
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=PROFILES)
+    parser.add_argument("--workers", type=int, help="WEB_CONCURRENCY (default: profile sizing)")
+    parser.add_argument("--threads", type=int, help="GUNICORN_THREADS (gthread profile)")
+    parser.add_argument(
+        "--preload", action=argparse.BooleanOptionalAction, default=True, help="preload_app"
+    )
+    parser.add_argument("--concurrency", type=int, default=16, help="loadgen worker threads")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per profile")
+    parser.add_argument("--user-count", type=int, default=20, help="seeded users to log in as")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--server-log", default=os.devnull, help="file for gunicorn and Django console output"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    args.database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) is required")
+
+    results = []
+    for profile in args.profiles:
+        print(f"Benchmarking {profile}...", file=sys.stderr)
+        results.append(run_profile(profile, args))
+    print_comparison(results)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(
+                {
+                    "commit": _git_commit(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "cpus": os.cpu_count(),
+                    "preload": args.preload,
+                    "concurrency": args.concurrency,
+                    "duration_s": args.duration,
+                    "results": results,
+                },
+                fh,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
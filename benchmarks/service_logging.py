@@ -0,0 +1,150 @@
+"""
+Benchmark the logging overhead of the service functions.
+
+Calls the list and lookup services against an in-memory SQLite database in
+three logging modes:
+
+    disabled    logging.disable(): no logging at all (the baseline)
+    production  INFO level, sampled messages kept 1 in --sample-every
+    debug       DEBUG level, nothing sampled out
+
+Handlers format each record and discard it, so the numbers include
+formatting but no I/O. The list services return lazy querysets, so their
+time is almost entirely logging. The call-site section compares the old
+eager f-string debug call with the lazy structured one at INFO level.
+
+Usage:
+    python -m benchmarks.service_logging [--calls 20000] [--sample-every 100]
+        [--output results.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import timeit
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pmtool.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("LOG_QUEUE_ENABLED", "False")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+
+from Projects.models import Project  # noqa: E402
+from Projects.services import list_projects_service  # noqa: E402
+from Tasks.models import Task  # noqa: E402
+from Tasks.services import (  # noqa: E402
+    get_task_by_id_service,
+    list_project_tasks_service,
+    list_tasks_service,
+    list_user_tasks_service,
+)
+from Users.services import list_users_service  # noqa: E402
+from utils.log import SamplingFilter, StructuredFormatter  # noqa: E402
+from Workspaces.models import Workspace  # noqa: E402
+from Workspaces.services import list_workspaces_service  # noqa: E402
+
+APP_LOGGERS = ("Users", "Workspaces", "Projects", "Tasks")
+
+
+class FormattingSink(logging.Handler):
+    """Formats every record it receives and throws the result away."""
+
+    def emit(self, record):
+        self.format(record)
+
+
+def configure(level: int, sample_every: int) -> None:
+    logging.disable(logging.NOTSET)
+    sink = FormattingSink()
+    sink.setFormatter(
+        StructuredFormatter(
+            "[{levelname}] {asctime} - {name} - {module}.{funcName}:{lineno} - {message}",
+            style="{",
+        )
+    )
+    sink.addFilter(SamplingFilter(sample_every))
+    for name in APP_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.handlers = [sink]
+        logger.setLevel(level)
+        logger.propagate = False
+
+
+def create_data():
+    call_command("migrate", verbosity=0)
+    user = get_user_model().objects.create_user("bench", password="bench")
+    workspace = Workspace.objects.create(name="Bench", owner=user)
+    project = Project.objects.create(name="Bench", workspace=workspace)
+    task = Task.objects.create(name="Bench", project=project, author=user)
+    return user, project, task
+
+
+def per_call_ns(func, calls: int) -> float:
+    return min(timeit.repeat(func, number=calls, repeat=3)) / calls * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    user, project, task = create_data()
+    services = {
+        "list_tasks_service": list_tasks_service,
+        "list_project_tasks_service": lambda: list_project_tasks_service(project.id),
+        "list_user_tasks_service": lambda: list_user_tasks_service(user),
+        "list_projects_service": list_projects_service,
+        "list_workspaces_service": list_workspaces_service,
+        "list_users_service": list_users_service,
+        "get_task_by_id_service": lambda: get_task_by_id_service(task.id),
+    }
+    modes = {
+        "disabled": None,
+        "production": (logging.INFO, args.sample_every),
+        "debug": (logging.DEBUG, 1),
+    }
+
+    results: dict = {"services": {}, "call_site": {}}
+    for service, func in services.items():
+        results["services"][service] = {}
+        for mode, config in modes.items():
+            if config is None:
+                logging.disable(logging.CRITICAL)
+            else:
+                configure(*config)
+            results["services"][service][mode] = per_call_ns(func, args.calls)
+    logging.disable(logging.NOTSET)
+
+    configure(logging.INFO, args.sample_every)
+    logger = logging.getLogger("Tasks.views")
+    errors = {"name": ["This field is required."], "project_id": ["Invalid pk."]}
+    results["call_site"]["eager_fstring"] = per_call_ns(
+        lambda: logger.debug(f"Update task validation failed: {errors}"), args.calls
+    )
+    results["call_site"]["lazy_extra"] = per_call_ns(
+        lambda: logger.debug("Update task validation failed", extra={"errors": errors}),
+        args.calls,
+    )
+
+    print(f"{'service':<30}" + "".join(f"{mode:>12}" for mode in modes) + "  (ns/call)")
+    for service, timings in results["services"].items():
+        print(f"{service:<30}" + "".join(f"{timings[mode]:>12.0f}" for mode in modes))
+    print()
+    print("disabled debug call with serializer errors (ns/call):")
+    for style, value in results["call_site"].items():
+        print(f"  {style:<16}{value:>8.0f}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
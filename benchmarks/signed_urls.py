@@ -0,0 +1,87 @@
+"""
+Benchmark presigned avatar URLs with and without the signed-URL cache.
+
+Times ``url()`` of S3Boto3Storage (a fresh presigned URL per call) against
+utils.b2_storage.B2Storage (one URL per name and time bucket) for a
+user_list-sized page of avatar names. Presigning is local CPU work, so no
+bucket or network is needed; the credentials are fake. The first B2Storage
+pass signs and fills the caches, later passes are the steady state.
+
+Usage:
+    python -m benchmarks.signed_urls [--names 100] [--passes 20]
+"""
+
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pmtool.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("LOG_QUEUE_ENABLED", "False")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from storages.backends.s3boto3 import S3Boto3Storage  # noqa: E402
+
+from utils.b2_storage import B2Storage  # noqa: E402
+
+OPTIONS = {
+    "access_key": "key-id",
+    "secret_key": "secret",
+    "bucket_name": "pmtool-media",
+    "endpoint_url": "https://s3.us-east-005.backblazeb2.com",
+    "region_name": "us-east-005",
+}
+
+
+def per_page_ms(storage, names: list[str], passes: int) -> list[float]:
+    storage.connection  # create the boto3 client outside the timings
+    timings = []
+    for _ in range(passes):
+        start = time.perf_counter()
+        for name in names:
+            storage.url(name)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=100, help="avatars per page")
+    parser.add_argument("--passes", type=int, default=20)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    for name, default in (
+        ("SIGNED_URL_BUCKET_SECONDS", 1800),
+        ("SIGNED_URL_CACHE_SIZE", 10000),
+        ("SIGNED_URL_CACHE", "default"),
+    ):
+        if not hasattr(settings, name):
+            setattr(settings, name, default)
+
+    names = [f"avatars/user-{i}.png" for i in range(args.names)]
+    plain = per_page_ms(S3Boto3Storage(**OPTIONS), names, args.passes)
+    cached = per_page_ms(B2Storage(**OPTIONS), names, args.passes)
+    results = {
+        "names": args.names,
+        "presign_ms": min(plain),
+        "cached_first_ms": cached[0],
+        "cached_ms": min(cached[1:]),
+    }
+
+    print(f"url() for {args.names} avatars (ms per page)")
+    print(f"  presign every call   {results['presign_ms']:>8.2f}")
+    print(f"  cache, first pass    {results['cached_first_ms']:>8.2f}")
+    print(f"  cache, steady state  {results['cached_ms']:>8.2f}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
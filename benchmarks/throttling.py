@@ -0,0 +1,99 @@
+"""
+Benchmark the per-request cost of the throttles.
+
+Times ``allow_request`` of utils.throttling.ListUserThrottle (token bucket)
+and of DRF's UserRateThrottle (sliding window), at the same rate and for
+one user, against the configured default cache (locmem, or Redis when
+REDIS_URL is set). The sliding window stores one timestamp per request of
+the window, so its cost grows with the rate; the bucket stores two floats.
+
+Usage:
+    python -m benchmarks.throttling [--calls 20000] [--rates 60/min 1000/min 10000/min]
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.throttling
+"""
+
+import argparse
+import json
+import os
+import timeit
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pmtool.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("LOG_QUEUE_ENABLED", "False")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+from rest_framework.throttling import UserRateThrottle  # noqa: E402
+
+from utils.throttling import ListUserThrottle  # noqa: E402
+
+
+class BenchUser(AnonymousUser):
+    pk = id = 1
+    is_authenticated = True
+
+
+def per_call_us(throttle_class, rate: str, calls: int) -> float:
+    caches[settings.THROTTLE_CACHE].clear()
+    request = APIRequestFactory().get("/api/tasks/")
+    force_authenticate(request, user=BenchUser())
+    request = Request(request)
+    request.user  # authenticate once, outside the timed loop
+
+    class Throttle(throttle_class):
+        pass
+
+    Throttle.rate = rate
+    throttle = Throttle()
+    # Each call advances the clock a little more than the rate's interval, so
+    # both throttles stay just under the limit and take their "allow" path
+    # with a full window of history.
+    interval = throttle.duration / throttle.num_requests * 1.01
+    now = [0.0]
+
+    def tick():
+        now[0] += interval
+        return now[0]
+
+    throttle.timer = tick
+    seconds = min(
+        timeit.repeat(lambda: throttle.allow_request(request, None), number=calls, repeat=3)
+    )
+    return seconds / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--rates", nargs="+", default=["60/min", "1000/min", "10000/min"])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    backend = settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[1]
+    results = {
+        rate: {
+            "token_bucket_us": per_call_us(ListUserThrottle, rate, args.calls),
+            "drf_sliding_window_us": per_call_us(UserRateThrottle, rate, args.calls),
+        }
+        for rate in args.rates
+    }
+    print(f"allow_request, {backend} (us/call)")
+    print(f"{'rate':<12}{'token bucket':>14}{'DRF window':>14}")
+    for rate, result in results.items():
+        print(
+            f"{rate:<12}{result['token_bucket_us']:>14.1f}{result['drf_sliding_window_us']:>14.1f}"
+        )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"cache": backend, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
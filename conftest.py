@@ -6,6 +6,7 @@ from tests/conftest.py to make them available throughout the project.
 """
 
 import pytest
+from django.core.cache import caches
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from pytest_factoryboy import register
@@ -24,6 +25,13 @@ register(ProjectFactory)
 register(TaskFactory)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches (throttle buckets live there)."""
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def api_client():
     """Provide an unauthenticated API client."""
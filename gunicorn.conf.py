@@ -0,0 +1,158 @@
+"""
+Gunicorn configuration for pmtool.
+
+Gunicorn loads ./gunicorn.conf.py automatically, so ``gunicorn`` on its own
+(the Render start command) serves the app with these settings. The server
+profile is picked with GUNICORN_PROFILE:
+
+    sync     one request at a time per worker process (2 * CPUs + 1 workers)
+    gthread  GUNICORN_THREADS threads per worker (CPUs + 1 workers); the
+             default, since most request time is spent waiting on the database
+    uvicorn  ASGI (pmtool.asgi) on uvicorn workers (one per CPU). Django runs
+             the sync views in a single thread per worker, so this only pays
+             off once views are async
+
+Sizing can be overridden with WEB_CONCURRENCY (workers) and GUNICORN_THREADS.
+Compare the profiles on a seeded database with ``python -m benchmarks.server_profiles``.
+"""
+
+import os
+import shutil
+import sys
+
+PROFILES = {
+    "sync": {
+        "worker_class": "sync",
+        "wsgi_app": "pmtool.wsgi:application",
+        "workers_per_cpu": 2,
+        "extra_workers": 1,
+        "threads": 1,
+    },
+    "gthread": {
+        "worker_class": "gthread",
+        "wsgi_app": "pmtool.wsgi:application",
+        "workers_per_cpu": 1,
+        "extra_workers": 1,
+        "threads": 4,
+    },
+    "uvicorn": {
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "wsgi_app": "pmtool.asgi:application",
+        "workers_per_cpu": 1,
+        "extra_workers": 0,
+        "threads": 1,
+    },
+}
+
+PROFILE = os.getenv("GUNICORN_PROFILE", "gthread")
+if PROFILE not in PROFILES:
+    raise RuntimeError(
+        f"Unknown GUNICORN_PROFILE {PROFILE!r}; expected one of {', '.join(PROFILES)}"
+    )
+_profile = PROFILES[PROFILE]
+
+
+def cpu_count() -> int:
+    # CPUs this process may run on (honours container CPU sets), not the host's
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+worker_class = _profile["worker_class"]
+wsgi_app = _profile["wsgi_app"]
+workers = int(
+    os.getenv("WEB_CONCURRENCY")
+    or cpu_count() * _profile["workers_per_cpu"] + _profile["extra_workers"]
+)
+threads = int(os.getenv("GUNICORN_THREADS") or _profile["threads"])
+
+# Load Django once in the master so workers share its memory pages
+# copy-on-write and a broken deploy fails before any worker is forked.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+# Recycle workers to bound slow memory growth; the jitter keeps them from
+# all restarting at the same moment.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# Longer than the load balancer's idle timeout would be wasted; shorter
+# forces it to reconnect for every request.
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Worker heartbeat files on tmpfs: a disk-backed /tmp can block workers
+# long enough for the master to kill them.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# Prometheus multiprocess directory, prepared here because gunicorn reads
+# this file before it loads the app: with preload_app the master creates
+# metrics (and their files in this directory) before on_starting runs. It
+# starts empty so samples of workers from a previous run are not aggregated
+# into /metrics, but only while no metric can exist in this process yet:
+# gunicorn reads this file again on reload (SIGHUP), when the preloaded
+# master's files in the directory are live.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if PROMETHEUS_MULTIPROC_DIR:
+    if "prometheus_client" not in sys.modules:
+        shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+# Single log writer: when LOG_WRITER_PORT is set, workers send records meant
+# for logs/*.log to a writer thread in the master instead of each worker
+# rotating the same files. Exported here, before the app is loaded, so that
+# preloaded and forked workers both see it.
+LOG_WRITER_PORT = os.getenv("LOG_WRITER_PORT")
+if LOG_WRITER_PORT:
+    os.environ["LOG_WRITER_ADDRESS"] = f"127.0.0.1:{LOG_WRITER_PORT}"
+
+
+def on_starting(server):
+    if LOG_WRITER_PORT:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pmtool.settings")
+        from django.conf import settings
+
+        from utils.log import start_log_writer
+
+        start_log_writer(("127.0.0.1", int(LOG_WRITER_PORT)), settings.LOGGING)
+
+
+def when_ready(server):
+    server.log.info(
+        "Profile %s: %d x %s workers, %d threads, preload=%s",
+        PROFILE,
+        server.cfg.workers,
+        server.cfg.worker_class_str,
+        server.cfg.threads,
+        server.cfg.preload_app,
+    )
+
+
+def pre_fork(server, worker):
+    # Close any connection opened while preloading, in the master, so no
+    # worker inherits (and shares) its socket.
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def post_fork(server, worker):
+    # The log queue's listener thread started in the preloading master; the
+    # worker needs its own. Without preload the worker configures logging
+    # (and starts a listener) only when it loads the app, after this hook.
+    if server.cfg.preload_app:
+        from utils.log import restart_log_pipeline
+
+        restart_log_pipeline()
+
+
+def child_exit(server, worker):
+    # Drop the live gauges (requests in flight) of a worker that exited.
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -13,14 +13,18 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
-from dotenv import load_dotenv
-import dj_database_url
-
-load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Optional dependencies are imported only when they are used, so that
+# worker boot and management commands don't pay for them
+# (python -m benchmarks.import_time reports the import cost).
+if (BASE_DIR / ".env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -52,7 +56,6 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "rest_framework_simplejwt",
-    "storages",
     "Users",
     "Workspaces",
     "Projects",
@@ -60,22 +63,84 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "utils.middleware.PerformanceMiddleware",
+    "utils.query_inspector.QueryInspectorMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Browser-only middleware below is skipped for API_PATH_PREFIX requests
+    # (see utils.middleware.SkipForAPIMixin); the admin gets the full stack.
+    "utils.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "utils.middleware.CsrfViewMiddleware",
+    "utils.middleware.AuthenticationMiddleware",
+    "utils.middleware.MessageMiddleware",
+    "utils.middleware.XFrameOptionsMiddleware",
 ]
 
+# JWT-only API routes; they must never authenticate with session cookies
+API_PATH_PREFIX = "/api/"
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+    ),
+    # Token buckets (utils.throttling): "N/period" allows bursts of N requests
+    # and N per period sustained, per user or client IP
+    "DEFAULT_THROTTLE_RATES": {
+        "list": os.getenv("THROTTLE_RATE_LIST", "300/min"),
+        "list_ip": os.getenv("THROTTLE_RATE_LIST_IP", "1200/min"),
+        "login_ip": os.getenv("THROTTLE_RATE_LOGIN_IP", "30/min"),
+        "login_username": os.getenv("THROTTLE_RATE_LOGIN_USERNAME", "10/min"),
+        "register_ip": os.getenv("THROTTLE_RATE_REGISTER_IP", "20/hour"),
+    },
+    # Proxies in front of the app that append to X-Forwarded-For (1 on
+    # Render). Unset, the client can pick its own IP for throttling.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES")) if os.getenv("NUM_PROXIES") else None,
 }
 
+# Throttle buckets live in this cache; turn throttling off for load tests
+THROTTLE_ENABLED = os.getenv("THROTTLE_ENABLED", "True") == "True"
+THROTTLE_CACHE = "default"
+
+# Redis when REDIS_URL is set, so every worker shares the same throttle
+# buckets and idempotency keys; otherwise a cache local to each process.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Idempotency-Key support on create endpoints (utils.idempotency): stored
+# responses are kept for IDEMPOTENCY_TTL seconds; a key is locked for at most
+# IDEMPOTENCY_LOCK_TIMEOUT seconds while its first request runs.
+IDEMPOTENCY_CACHE = "default"
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Per-request performance instrumentation (see utils.middleware.PerformanceMiddleware)
+# Exposes query counts and timings to clients, so keep it off in production
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", str(DEBUG)) == "True"
+
+# N+1 / duplicate query detection (see utils.query_inspector)
+# Logs every query shape a request repeats more than the threshold to logs/queries.log;
+# set QUERY_INSPECTOR_RAISE=True to turn findings into errors (e.g. to fail tests)
+QUERY_INSPECTOR_ENABLED = os.getenv("QUERY_INSPECTOR_ENABLED", str(DEBUG)) == "True"
+QUERY_INSPECTOR_THRESHOLD = int(os.getenv("QUERY_INSPECTOR_THRESHOLD", "5"))
+QUERY_INSPECTOR_RAISE = os.getenv("QUERY_INSPECTOR_RAISE", "False") == "True"
+
+# Prometheus metrics endpoint (/metrics); when set, scrapers must send
+# "Authorization: Bearer <METRICS_TOKEN>". With several gunicorn workers also set
+# PROMETHEUS_MULTIPROC_DIR to a directory shared by all of them (see gunicorn.conf.py)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -106,6 +171,8 @@ WSGI_APPLICATION = "pmtool.wsgi.application"
 
 # Check if DATABASE_URL is set (production on Render)
 if os.getenv("DATABASE_URL"):
+    import dj_database_url
+
     DATABASES = {
         "default": dj_database_url.parse(
             os.getenv("DATABASE_URL"),
@@ -148,20 +215,41 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Logging pipeline (see utils.log.configure_logging): loggers only enqueue records
+# and a single background thread formats and writes them. Records that do not fit
+# in the bounded queue are dropped and counted (pmtool_log_records_dropped_total).
+# LOG_WRITER_ADDRESS ("host:port") sends file records to one writer process instead;
+# gunicorn.conf.py sets it and runs the writer in the master when LOG_WRITER_PORT is set.
+LOGGING_CONFIG = "utils.log.configure_logging"
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "True") == "True"
+LOG_QUEUE_MAXSIZE = int(os.getenv("LOG_QUEUE_MAXSIZE", "10000"))
+LOG_WRITER_ADDRESS = os.getenv("LOG_WRITER_ADDRESS", "")
+# Only one in LOG_SAMPLE_EVERY high-volume INFO messages (logged with
+# extra={"sampled": True}, e.g. "Tasks retrieved successfully") is kept
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1" if DEBUG else "100"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "verbose": {
+            "()": "utils.log.StructuredFormatter",
             "format": "[{levelname}] {asctime} - {name} - {module}.{funcName}:{lineno} - {message}",
             "style": "{",
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
         "simple": {
+            "()": "utils.log.StructuredFormatter",
             "format": "[{levelname}] {asctime} - {message}",
             "style": "{",
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
+        "structured": {
+            "()": "utils.log.StructuredFormatter",
+            "format": "[{levelname}] {asctime} - {name} - {message}",
+            "style": "{",
+            "datefmt": "%Y-%m-%d %H:%M:%S",
+        },
     },
     "filters": {
         "require_debug_true": {
@@ -170,12 +258,17 @@ LOGGING = {
         "require_debug_false": {
             "()": "django.utils.log.RequireDebugFalse",
         },
+        "sampling": {
+            "()": "utils.log.SamplingFilter",
+            "every": LOG_SAMPLE_EVERY,
+        },
     },
     "handlers": {
         "console": {
             "level": "DEBUG" if DEBUG else "INFO",
             "class": "logging.StreamHandler",
             "formatter": "simple",
+            "filters": ["sampling"],
         },
         "file": {
             "level": "INFO",
@@ -184,6 +277,7 @@ LOGGING = {
             "maxBytes": 1024 * 1024 * 10,  # 10 MB
             "backupCount": 5,
             "formatter": "verbose",
+            "filters": ["sampling"],
         },
         "error_file": {
             "level": "ERROR",
@@ -200,6 +294,23 @@ LOGGING = {
             "maxBytes": 1024 * 1024 * 10,  # 10 MB
             "backupCount": 5,
             "formatter": "verbose",
+            "filters": ["sampling"],
+        },
+        "performance_file": {
+            "level": "INFO",
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": os.path.join(BASE_DIR, "logs", "performance.log"),
+            "maxBytes": 1024 * 1024 * 10,  # 10 MB
+            "backupCount": 5,
+            "formatter": "structured",
+        },
+        "queries_file": {
+            "level": "INFO",
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": os.path.join(BASE_DIR, "logs", "queries.log"),
+            "maxBytes": 1024 * 1024 * 10,  # 10 MB
+            "backupCount": 5,
+            "formatter": "structured",
         },
     },
     "loggers": {
@@ -223,6 +334,16 @@ LOGGING = {
             "level": "WARNING",
             "propagate": False,
         },
+        "pmtool.performance": {
+            "handlers": ["performance_file"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "pmtool.queries": {
+            "handlers": ["queries_file", "console"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "Users": {
             "handlers": ["console", "file", "error_file"],
             "level": "DEBUG" if DEBUG else "INFO",
@@ -272,12 +393,21 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 MEDIA_URL = "media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# With local storage, utils.views.media serves MEDIA_URL. Set
+# MEDIA_SENDFILE_HEADER to "X-Accel-Redirect" (nginx: an internal location at
+# MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT) or "X-Sendfile" (Apache,
+# lighttpd) to let the front server send the files.
+MEDIA_SENDFILE_HEADER = os.getenv("MEDIA_SENDFILE_HEADER", "")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
 
 # Backblaze B2 Configuration for Media Files
 # B2 will be used when USE_B2_STORAGE=True, local storage otherwise
 USE_B2_STORAGE = os.getenv("USE_B2_STORAGE", "False") == "True"
 
 if USE_B2_STORAGE:
+    # django-storages (and boto3, imported on first use) only for B2
+    INSTALLED_APPS.append("storages")
+
     # Backblaze B2 Settings (Private Bucket - Free Tier Compatible)
     AWS_ACCESS_KEY_ID = os.getenv("B2_APPLICATION_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.getenv("B2_APPLICATION_KEY")
@@ -290,15 +420,33 @@ if USE_B2_STORAGE:
     AWS_DEFAULT_ACL = None  # Use bucket's default ACL (private)
     AWS_QUERYSTRING_AUTH = True  # Generate signed URLs for private files
     AWS_QUERYSTRING_EXPIRE = 3600  # Signed URLs expire in 1 hour
+    # utils.storage.SignedURLCacheMixin: one signed URL per file and
+    # SIGNED_URL_BUCKET_SECONDS, cached per process (SIGNED_URL_CACHE_SIZE
+    # names) and in SIGNED_URL_CACHE. Keep the bucket shorter than
+    # AWS_QUERYSTRING_EXPIRE: a URL signed at the start of a bucket is handed
+    # out until its end and must stay usable for a while after that.
+    SIGNED_URL_BUCKET_SECONDS = int(os.getenv("SIGNED_URL_BUCKET_SECONDS", "1800"))
+    SIGNED_URL_CACHE_SIZE = 10000
+    SIGNED_URL_CACHE = "default"
+    # utils.storage.DiskCacheMixin: files read back from the bucket (open())
+    # are kept in an LRU on local disk, shared by the workers on a host, and
+    # revalidated with their ETag after MEDIA_DISK_CACHE_REVALIDATE_SECONDS.
+    # An empty MEDIA_DISK_CACHE_DIR disables it.
+    MEDIA_DISK_CACHE_DIR = os.getenv("MEDIA_DISK_CACHE_DIR", str(BASE_DIR / "cache" / "media"))
+    MEDIA_DISK_CACHE_MAX_BYTES = int(
+        os.getenv("MEDIA_DISK_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))
+    )
+    MEDIA_DISK_CACHE_REVALIDATE_SECONDS = 300
     AWS_S3_OBJECT_PARAMETERS = {
-        'CacheControl': 'max-age=86400',  # Cache for 1 day
+        # Avatars and thumbnails are named after their content and never rewritten
+        'CacheControl': 'max-age=31536000, immutable',
     }
 
 # Configure Django storage backends (Django 4.2+)
 if USE_B2_STORAGE:
     STORAGES = {
         "default": {
-            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+            "BACKEND": "utils.b2_storage.B2Storage",
         },
         "staticfiles": {
             "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -314,6 +462,36 @@ else:
         },
     }
 
+# Process pool for CPU-bound work kept off the request thread, e.g. avatar
+# thumbnails (utils.background). Each web worker starts its own pool on first
+# use; BACKGROUND_TASKS_EAGER runs the work inline instead (tests).
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "1"))
+BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "False") == "True"
+
+# Kanban order keys (Task.position) grow when tasks are repeatedly dropped in
+# the same place; a move that writes a longer key renumbers its column once
+# it commits.
+TASK_POSITION_REBALANCE_LENGTH = 32
+
+# Avatar uploads. With S3-compatible storage (USE_B2_STORAGE) clients can
+# upload straight to the bucket: POST /api/auth/avatar/upload/ returns a
+# presigned PUT valid for AVATAR_UPLOAD_EXPIRE seconds, and
+# POST /api/auth/avatar/confirm/ checks the object and attaches it.
+AVATAR_MAX_UPLOAD_BYTES = int(os.getenv("AVATAR_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+AVATAR_MAX_PIXELS = 40_000_000
+AVATAR_UPLOAD_EXPIRE = 600
+
+# Multipart uploads (avatars are the only files) stream through
+# utils.uploads.LimitedUploadHandler, which rejects a file with a 413 as soon
+# as it exceeds FILE_UPLOAD_MAX_BYTES; files over FILE_UPLOAD_MAX_MEMORY_SIZE
+# (Django's 2.5 MB default) are spooled to a temporary file, not kept in memory.
+FILE_UPLOAD_MAX_BYTES = AVATAR_MAX_UPLOAD_BYTES
+FILE_UPLOAD_HANDLERS = [
+    "utils.uploads.LimitedUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 
@@ -16,9 +16,10 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from utils import views as utils_views
 
 urlpatterns = [
     path(settings.ADMIN_URL, admin.site.urls),
@@ -26,7 +27,15 @@ urlpatterns = [
     path("api/workspaces/", include("Workspaces.urls")),
     path("api/projects/", include("Projects.urls")),
     path("api/tasks/", include("Tasks.urls")),
+    path("metrics", utils_views.metrics, name="metrics"),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+if not settings.USE_B2_STORAGE:
+    # Uploaded files, for local storage (B2 hands out presigned bucket URLs)
+    urlpatterns += [
+        re_path(
+            rf"^{settings.MEDIA_URL.strip('/')}/(?P<path>.+)$",
+            utils_views.media,
+            name="media",
+        ),
+    ]
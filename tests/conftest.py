@@ -72,3 +72,39 @@ def get_tokens_for_user():
         }
 
     return _get_tokens
+
+
+@pytest.fixture
+def s3_bucket(settings, tmp_path):
+    """
+    Configure the default storage as B2Storage on an in-process S3 stand-in (moto).
+
+    Yields the boto3 ``Bucket`` resource.
+    """
+    import boto3
+    from moto import mock_aws
+
+    with mock_aws():
+        bucket = boto3.resource(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        ).create_bucket(Bucket="pmtool-media")
+        settings.USE_B2_STORAGE = True
+        settings.SIGNED_URL_BUCKET_SECONDS = 1800
+        settings.SIGNED_URL_CACHE_SIZE = 100
+        settings.SIGNED_URL_CACHE = "default"
+        settings.MEDIA_DISK_CACHE_DIR = str(tmp_path / "media-cache")
+        settings.MEDIA_DISK_CACHE_MAX_BYTES = 1024 * 1024
+        settings.MEDIA_DISK_CACHE_REVALIDATE_SECONDS = 300
+        settings.STORAGES = {
+            **settings.STORAGES,
+            "default": {
+                "BACKEND": "utils.b2_storage.B2Storage",
+                "OPTIONS": {
+                    "bucket_name": bucket.name,
+                    "access_key": "test",
+                    "secret_key": "test",
+                    "region_name": "us-east-1",
+                },
+            },
+        }
+        yield bucket
@@ -6,6 +6,7 @@ from datetime import timedelta
 from Workspaces.models import Workspace
 from Projects.models import Project
 from Tasks.models import Task
+from utils.fractional_index import integer_key
 
 User = get_user_model()
 
@@ -73,6 +74,8 @@ class TaskFactory(factory.django.DjangoModelFactory):
     status = Task.Status.TODO
     priority = Task.Priority.MEDIUM
     due_date = factory.LazyFunction(lambda: timezone.now() + timedelta(days=7))
+    # Increasing keys, so tasks of a column are ordered as created
+    position = factory.Sequence(integer_key)
 
     @factory.post_generation
     def assignees(self, create, extracted, **kwargs):
@@ -0,0 +1,60 @@
+"""
+Tests for the API/admin middleware split.
+"""
+
+import pytest
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.integration
+class TestAPIMiddlewareSplit:
+    """Test cases for the browser middleware being skipped on API routes."""
+
+    def test_api_response_sets_no_browser_headers(self, authenticated_client):
+        """Test API responses carry no session/CSRF cookies or X-Frame-Options."""
+        response = authenticated_client.get(reverse("workspace_list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.cookies
+        assert "X-Frame-Options" not in response
+        assert not hasattr(response.wsgi_request, "session")
+
+    def test_api_write_with_jwt_needs_no_csrf_token(self, authenticated_client):
+        """Test JWT-authenticated writes work without a CSRF token."""
+        authenticated_client.handler.enforce_csrf_checks = True
+
+        response = authenticated_client.post(
+            reverse("create_workspace"), {"name": "No CSRF"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_admin_keeps_full_stack(self, settings):
+        """Test the admin login page still gets framing protection and a CSRF cookie."""
+        # The manifest storage needs collectstatic, which tests don't run
+        settings.STORAGES = {
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }
+        client = Client(enforce_csrf_checks=True)
+
+        response = client.get(f"/{settings.ADMIN_URL}login/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["X-Frame-Options"] == "DENY"
+        assert settings.CSRF_COOKIE_NAME in response.cookies
+
+    def test_admin_post_without_csrf_token_is_rejected(self):
+        """Test CSRF protection still applies outside the API."""
+        client = Client(enforce_csrf_checks=True)
+
+        response = client.post(
+            f"/{settings.ADMIN_URL}login/", {"username": "a", "password": "b"}
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
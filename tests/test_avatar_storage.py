@@ -0,0 +1,172 @@
+"""
+Tests for content-addressed avatar storage: deduplication, reference counts and gc_avatars.
+"""
+
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from Users.models import AvatarFile
+from Users.services import delete_user_service, update_user_service
+from utils.thumbnails import FORMATS, SIZES, thumbnail_name
+
+pytestmark = pytest.mark.django_db
+
+
+def png(color="teal"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 40), color).save(buffer, "PNG")
+    return SimpleUploadedFile("me.png", buffer.getvalue(), content_type="image/png")
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.BACKGROUND_TASKS_EAGER = True
+    return tmp_path
+
+
+def set_avatar(user, content, callbacks):
+    with callbacks(execute=True):
+        update_user_service(user.id, avatar=content)
+    user.refresh_from_db()
+    return user.avatar.name
+
+
+def gc(*args):
+    out = io.StringIO()
+    call_command("gc_avatars", *args, stdout=out)
+    return out.getvalue()
+
+
+def expire(name):
+    AvatarFile.objects.filter(name=name).update(updated_at=timezone.now() - timedelta(days=2))
+
+
+@pytest.mark.integration
+class TestContentAddressedAvatars:
+    """Test cases for deduplicated, reference-counted avatar storage."""
+
+    def test_identical_uploads_are_stored_once(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test users uploading the same bytes share one object named after its hash."""
+        first, second = user_factory(), user_factory()
+
+        name = set_avatar(first, png(), django_capture_on_commit_callbacks)
+        assert set_avatar(second, png(), django_capture_on_commit_callbacks) == name
+
+        assert name.startswith("avatars/") and len(name) == len("avatars/") + 32 + len(".png")
+        assert [path.name for path in (media / "avatars").glob("*.png")] == [name[8:]]
+        assert AvatarFile.objects.get(name=name).refcount == 2
+
+    def test_reupload_of_same_image_is_a_no_op(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test uploading one's current avatar again neither stores nor counts it twice."""
+        user = user_factory()
+        name = set_avatar(user, png(), django_capture_on_commit_callbacks)
+
+        set_avatar(user, png(), django_capture_on_commit_callbacks)
+
+        assert AvatarFile.objects.get(name=name).refcount == 1
+        assert len(list((media / "avatars").glob("*.png"))) == 1
+
+    def test_replacing_and_deleting_release_references(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test the previous avatar loses its reference on replace and on user deletion."""
+        user = user_factory()
+        old = set_avatar(user, png(), django_capture_on_commit_callbacks)
+        new = set_avatar(user, png("navy"), django_capture_on_commit_callbacks)
+
+        assert AvatarFile.objects.get(name=old).refcount == 0
+        assert AvatarFile.objects.get(name=new).refcount == 1
+
+        delete_user_service(user.id)
+
+        assert AvatarFile.objects.get(name=new).refcount == 0
+
+
+@pytest.mark.integration
+class TestGcAvatars:
+    """Test cases for the gc_avatars command."""
+
+    def test_deletes_unreferenced_avatars_and_thumbnails(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test an orphan past the grace period is removed with every thumbnail."""
+        user = user_factory()
+        old = set_avatar(user, png(), django_capture_on_commit_callbacks)
+        new = set_avatar(user, png("navy"), django_capture_on_commit_callbacks)
+        expire(old)
+
+        gc()
+
+        assert not AvatarFile.objects.filter(name=old).exists()
+        assert not (media / old).exists()
+        assert not any(
+            (media / thumbnail_name(old, size, ext)).exists() for size in SIZES for ext in FORMATS
+        )
+        assert (media / new).exists()
+        assert (media / thumbnail_name(new, 64, "webp")).exists()
+
+    def test_keeps_recent_orphans_and_dry_run_deletes_nothing(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test the grace period protects fresh orphans and --dry-run only reports."""
+        user = user_factory()
+        old = set_avatar(user, png(), django_capture_on_commit_callbacks)
+        set_avatar(user, png("navy"), django_capture_on_commit_callbacks)
+
+        gc()
+        assert (media / old).exists()
+
+        expire(old)
+        output = gc("--dry-run")
+        assert f"Would delete: {old}" in output
+        assert (media / old).exists()
+
+    def test_drifted_count_is_corrected_not_deleted(self, media, user_factory):
+        """Test a zero count on an avatar users still reference is repaired."""
+        user_factory(avatar="avatars/shared.png")
+        user_factory(avatar="avatars/shared.png")
+        (media / "avatars").mkdir()
+        (media / "avatars" / "shared.png").write_bytes(b"x")
+        AvatarFile.objects.create(name="avatars/shared.png", refcount=0)
+        expire("avatars/shared.png")
+
+        gc()
+
+        assert AvatarFile.objects.get(name="avatars/shared.png").refcount == 2
+        assert (media / "avatars" / "shared.png").exists()
+
+    def test_recount_creates_missing_rows(self, media, user_factory):
+        """Test --recount accounts for avatars stored before reference counting."""
+        user_factory(avatar="avatars/legacy.png")
+
+        output = gc("--recount")
+
+        assert "1 reference counts corrected" in output
+        assert AvatarFile.objects.get(name="avatars/legacy.png").refcount == 1
+
+    def test_bulk_deletes_from_the_bucket(self, s3_bucket, user_factory):
+        """Test B2 objects are removed with batched DeleteObjects requests."""
+        for index in range(3):
+            name = f"avatars/{index}.png"
+            s3_bucket.put_object(Key=name, Body=b"x")
+            s3_bucket.put_object(Key=thumbnail_name(name, 32, "webp"), Body=b"x")
+            AvatarFile.objects.create(name=name, refcount=0)
+            expire(name)
+        user_factory(avatar="avatars/kept.png")
+        s3_bucket.put_object(Key="avatars/kept.png", Body=b"x")
+
+        gc("--batch-size", "2")
+
+        assert [obj.key for obj in s3_bucket.objects.all()] == ["avatars/kept.png"]
+        assert not AvatarFile.objects.filter(refcount=0).exists()
@@ -0,0 +1,104 @@
+"""
+Tests for direct-to-storage avatar uploads, against an in-process S3 stand-in (moto).
+"""
+
+import io
+
+import pytest
+import requests
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+pytestmark = pytest.mark.django_db
+
+def png(side=64):
+    buffer = io.BytesIO()
+    Image.new("RGB", (side, side), "teal").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def authorise(client, content_type="image/png", size=None, data=None):
+    data = png() if data is None else data
+    return client.post(
+        reverse("avatar-upload"),
+        {"content_type": content_type, "size": len(data) if size is None else size},
+        format="json",
+    )
+
+
+def upload(authorisation, data):
+    return requests.put(authorisation["url"], data=data, headers=authorisation["headers"])
+
+
+@pytest.mark.integration
+class TestDirectAvatarUpload:
+    """Test cases for the avatar upload and confirm endpoints."""
+
+    def test_upload_and_confirm_attaches_avatar(
+        self, s3_bucket, authenticated_client, authenticated_user
+    ):
+        """Test the presigned PUT stores the file and confirm makes it the avatar."""
+        data = png()
+        authorisation = authorise(authenticated_client, data=data).data["data"]
+        assert authorisation["method"] == "PUT"
+        assert upload(authorisation, data).status_code == 200
+
+        response = authenticated_client.post(
+            reverse("avatar-confirm"), {"key": authorisation["key"]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        authenticated_user.refresh_from_db()
+        assert authenticated_user.avatar.name == authorisation["key"]
+        assert authorisation["key"] in response.data["data"]["avatar"]
+
+    def test_size_and_type_limits_are_enforced_up_front(
+        self, s3_bucket, authenticated_client, settings
+    ):
+        """Test oversized or non-image uploads are refused before any URL is signed."""
+        settings.AVATAR_MAX_UPLOAD_BYTES = 1000
+
+        too_big = authorise(authenticated_client, size=1001)
+        not_an_image = authorise(authenticated_client, content_type="application/pdf")
+
+        assert too_big.status_code == status.HTTP_400_BAD_REQUEST
+        assert "size" in too_big.data["errors"]
+        assert not_an_image.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_mismatching_upload_is_rejected_and_deleted(self, s3_bucket, authenticated_client):
+        """Test an object that differs from what was announced never becomes the avatar."""
+        authorisation = authorise(authenticated_client, data=png()).data["data"]
+        upload(authorisation, b"not an image at all")
+
+        response = authenticated_client.post(
+            reverse("avatar-confirm"), {"key": authorisation["key"]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(s3_bucket.objects.all()) == []
+
+    def test_cannot_confirm_another_users_upload(
+        self, s3_bucket, authenticated_client, another_user
+    ):
+        """Test an upload can only be confirmed by the user it was authorised for."""
+        data = png()
+        authorisation = authorise(authenticated_client, data=data).data["data"]
+        upload(authorisation, data)
+        other_client = APIClient()
+        other_client.force_authenticate(another_user)
+
+        response = other_client.post(
+            reverse("avatar-confirm"), {"key": authorisation["key"]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        another_user.refresh_from_db()
+        assert not another_user.avatar
+
+    def test_unavailable_with_local_storage(self, authenticated_client):
+        """Test the endpoint explains direct uploads need S3-compatible storage."""
+        response = authorise(authenticated_client)
+
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
@@ -0,0 +1,129 @@
+"""
+Tests for streaming avatar upload limits and header-only image validation.
+"""
+
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image, ImageFile
+from rest_framework import status
+
+from utils.thumbnails import render_thumbnails
+
+pytestmark = pytest.mark.django_db
+
+
+def image_file(size=(40, 40), format="PNG", name="me.png"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="application/octet-stream")
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def put_avatar(client, user, avatar):
+    # UpdateUserSerializer validates username and email as new values
+    return client.put(
+        reverse("user-update", args=[user.id]),
+        {"username": "renamed", "email": "renamed@example.com", "avatar": avatar},
+        format="multipart",
+    )
+
+
+@pytest.mark.integration
+class TestAvatarUploadValidation:
+    """Test cases for avatar uploads through the user endpoints."""
+
+    def test_only_the_header_is_parsed(
+        self, media, authenticated_client, authenticated_user, monkeypatch
+    ):
+        """Test a valid upload is accepted without decoding any pixels in the request."""
+
+        def no_decoding(*args, **kwargs):
+            pytest.fail("image decoded in the request thread")
+
+        monkeypatch.setattr(ImageFile.ImageFile, "load", no_decoding)
+        monkeypatch.setattr(Image.Image, "verify", no_decoding)
+
+        response = put_avatar(
+            authenticated_client, authenticated_user, image_file(name="photo.jpg")
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        authenticated_user.refresh_from_db()
+        # Named after the detected format, not the client's file name
+        assert authenticated_user.avatar.name.endswith(".png")
+
+    def test_too_many_pixels_is_rejected(
+        self, media, authenticated_client, authenticated_user, settings
+    ):
+        """Test images over AVATAR_MAX_PIXELS are refused from their header."""
+        settings.AVATAR_MAX_PIXELS = 1000
+
+        response = put_avatar(authenticated_client, authenticated_user, image_file((40, 40)))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "too many pixels" in str(response.data["errors"]["avatar"])
+
+    def test_non_images_are_rejected(self, media, authenticated_client, authenticated_user):
+        """Test files Pillow cannot identify never reach storage."""
+        response = put_avatar(
+            authenticated_client,
+            authenticated_user,
+            SimpleUploadedFile("me.png", b"definitely not a png"),
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "avatar" in response.data["errors"]
+        assert not (media / "avatars").exists()
+
+    def test_oversized_upload_is_stopped_while_streaming(
+        self, media, authenticated_client, authenticated_user, settings
+    ):
+        """Test a file over FILE_UPLOAD_MAX_BYTES is rejected with 413 as it arrives."""
+        settings.FILE_UPLOAD_MAX_BYTES = 1000
+        big = SimpleUploadedFile("me.png", image_file().read() + b"\0" * 5000)
+
+        response = put_avatar(authenticated_client, authenticated_user, big)
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_oversized_request_is_refused_before_reading(
+        self, media, authenticated_client, authenticated_user, settings, monkeypatch
+    ):
+        """Test a body longer than any allowed upload is rejected from its length."""
+        from utils.uploads import LimitedUploadHandler
+
+        settings.FILE_UPLOAD_MAX_BYTES = 1000
+        settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 1000
+        monkeypatch.setattr(
+            LimitedUploadHandler,
+            "receive_data_chunk",
+            lambda *args: pytest.fail("body was read"),
+        )
+
+        response = put_avatar(
+            authenticated_client,
+            authenticated_user,
+            SimpleUploadedFile("me.png", b"\0" * 5000),
+        )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.unit
+class TestThumbnailPixelGuard:
+    """Test cases for the decompression bomb guard of the thumbnail worker."""
+
+    def test_refuses_images_over_the_pixel_limit(self):
+        """Test render_thumbnails stops before decoding an oversized image."""
+        data = image_file((100, 100)).read()
+
+        with pytest.raises(ValueError, match="more than 5000 pixels"):
+            render_thumbnails(data, max_pixels=5000)
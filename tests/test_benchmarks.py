@@ -0,0 +1,109 @@
+"""
+Tests for the endpoint benchmark suite, the load generator and the import-time report.
+"""
+
+import argparse
+import json
+
+import pytest
+
+from benchmarks.endpoints import ENDPOINTS, shape_for, uncovered_url_names
+from benchmarks.import_time import check, parse_importtime
+from benchmarks.loadgen import Result, Target, extract_command, summarize
+
+
+@pytest.mark.unit
+class TestEndpointTable:
+    """Test cases for the benchmark endpoint table."""
+
+    def test_every_url_name_is_benchmarked(self):
+        """Test new URLs must get a benchmark entry (or an explicit exclusion)."""
+        assert uncovered_url_names() == []
+        assert "task_list" in ENDPOINTS
+
+    def test_shape_matches_requested_task_count(self):
+        """Test the dataset shape yields the requested number of tasks."""
+        shape = shape_for(100000)
+
+        assert shape["workspaces"] * shape["projects_per"] * shape["tasks_per"] == 100000
+
+
+@pytest.mark.unit
+class TestLoadgen:
+    """Test cases for the load generator helpers."""
+
+    def test_label_groups_requests_by_endpoint(self):
+        """Test ids and query values are stripped from endpoint labels."""
+        assert Target("GET", "/api/tasks/42/").label == "GET /api/tasks/{id}/"
+        assert (
+            Target("GET", "/api/tasks/?project_id=3&user_id=1").label
+            == "GET /api/tasks/?project_id&user_id"
+        )
+
+    def test_extracts_get_requests_from_performance_log(self, tmp_path, capsys):
+        """Test performance log lines become replayable JSONL with relative times."""
+        log = tmp_path / "performance.log"
+        log.write_text(
+            "[INFO] 2026-01-05 10:00:00 - pmtool.performance - GET task_list 200"
+            " | url_name='task_list' method='GET' path='/api/tasks/?project_id=3' status=200\n"
+            "[INFO] 2026-01-05 10:00:02 - pmtool.performance - POST create_task 201"
+            " | url_name='create_task' method='POST' path='/api/tasks/create/' status=201\n"
+            "[INFO] 2026-01-05 10:00:03 - pmtool.performance - GET task_detail 200"
+            " | url_name='task_detail' method='GET' path='/api/tasks/7/' status=200\n"
+        )
+
+        extract_command(argparse.Namespace(log=str(log)))
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines == [
+            {"method": "GET", "path": "/api/tasks/?project_id=3", "at": 0.0},
+            {"method": "GET", "path": "/api/tasks/7/", "at": 3.0},
+        ]
+
+    def test_summary_reports_percentiles_and_error_rate(self):
+        """Test results are grouped per endpoint with error rates and throughput."""
+        results = [Result("GET /api/tasks/{id}/", latency / 1000, 200) for latency in range(1, 100)]
+        results.append(Result("GET /api/tasks/{id}/", 0.5, 0))
+
+        summary = summarize(results, elapsed=10.0)
+
+        stats = summary["endpoints"]["GET /api/tasks/{id}/"]
+        assert stats["requests"] == 100 and stats["errors"] == 1
+        assert stats["throughput_rps"] == 10.0
+        assert stats["p50_ms"] == pytest.approx(51.0) and stats["max_ms"] == 500.0
+
+    def test_throttled_requests_are_not_errors(self):
+        """Test 429 responses are counted as throttled, apart from the error rate."""
+        results = [Result("GET /api/tasks/", 0.01, status) for status in (200, 200, 429, 500)]
+
+        stats = summarize(results, elapsed=1.0)["total"]
+
+        assert stats["errors"] == 1 and stats["error_rate"] == 0.25
+        assert stats["throttled"] == 1 and stats["throttled_rate"] == 0.25
+
+
+@pytest.mark.unit
+class TestImportTime:
+    """Test cases for the import-time report."""
+
+    def test_self_times_are_summed_per_top_level_package(self):
+        """Test nested modules count towards their top-level package, by self time."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       300 |        300 |     PIL._version\n"
+            "import time:       400 |        700 |   PIL\n"
+            "import time:      1000 |       1700 | django.db\n"
+            "System check identified no issues (0 silenced).\n"
+        )
+
+        assert parse_importtime(output) == {"PIL": 700, "django": 1000}
+
+    def test_budget_and_baseline_regressions_fail(self, capsys):
+        """Test totals over budget or over the threshold above the baseline are reported."""
+        results = {"wsgi": {"total_ms": 120.0}, "manage": {"total_ms": 100.0}}
+        baseline = {"wsgi": {"total_ms": 100.0}, "manage": {"total_ms": 100.0}}
+
+        assert check(results, {}, baseline, threshold=10.0) is True
+        assert check(results, {"manage": 90.0}, {}, threshold=10.0) is True
+        assert check(results, {"wsgi": 150.0}, baseline, threshold=25.0) is False
+        assert "FAIL wsgi: 100.0 -> 120.0 ms (+20.0%)" in capsys.readouterr().out
@@ -0,0 +1,71 @@
+"""
+Tests for the fractional index keys behind kanban task positions.
+"""
+
+import random
+
+import pytest
+
+from utils.fractional_index import integer_key, key_between
+
+
+@pytest.mark.unit
+class TestKeyBetween:
+    """Test cases for key_between and integer_key."""
+
+    def test_appends_stay_short(self):
+        """Test appending walks the integer keys and grows only logarithmically."""
+        keys, key = [], None
+        for _ in range(2000):
+            key = key_between(key, None)
+            keys.append(key)
+
+        assert keys == sorted(keys)
+        assert keys == [integer_key(index) for index in range(2000)]
+        assert keys[:2] == ["i0", "i1"] and keys[36] == "j00"
+        assert max(len(key) for key in keys) == 4
+
+    def test_prepends_sort_first(self):
+        """Test keys generated before the first one keep sorting before it."""
+        keys, key = [], None
+        for _ in range(2000):
+            key = key_between(None, key)
+            keys.insert(0, key)
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_random_inserts_keep_order(self):
+        """Test keys inserted anywhere always sort between their neighbours."""
+        rng = random.Random(7)
+        keys = []
+        for _ in range(2000):
+            index = rng.randint(0, len(keys))
+            before = keys[index - 1] if index else None
+            after = keys[index] if index < len(keys) else None
+            keys.insert(index, key_between(before, after))
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_repeated_inserts_at_one_spot_grow_the_key(self):
+        """Test squeezing into the same gap lengthens keys, which triggers rebalancing."""
+        low, high = "i0", "i1"
+        for _ in range(50):
+            high = key_between(low, high)
+
+        assert low < high < "i1"
+        assert len(high) > 8
+
+    def test_only_lowercase_alphanumerics(self):
+        """Test keys avoid characters collations could order differently."""
+        keys = [key_between(None, None), integer_key(10**6), key_between("i0", "i1")]
+
+        assert all(key.isalnum() and key == key.lower() for key in keys)
+
+    def test_rejects_unordered_bounds(self):
+        """Test a lower bound that does not sort first is refused."""
+        with pytest.raises(ValueError):
+            key_between("i1", "i0")
+        with pytest.raises(ValueError):
+            key_between("i1", "i1")
@@ -0,0 +1,169 @@
+"""
+Tests for the gunicorn server profiles in gunicorn.conf.py.
+"""
+
+import os
+import runpy
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG = str(ROOT / "gunicorn.conf.py")
+
+
+def load_config(monkeypatch, **env):
+    for name in (
+        "GUNICORN_PROFILE",
+        "WEB_CONCURRENCY",
+        "GUNICORN_THREADS",
+        "GUNICORN_PRELOAD",
+        "PROMETHEUS_MULTIPROC_DIR",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONFIG)
+
+
+@pytest.mark.unit
+class TestServerProfiles:
+    """Test cases for the server profile selection and sizing."""
+
+    def test_default_profile_is_gthread_sized_from_cpus(self, monkeypatch):
+        """Test the default profile runs CPUs + 1 threaded workers with preload."""
+        config = load_config(monkeypatch)
+
+        assert config["worker_class"] == "gthread"
+        assert config["workers"] == config["cpu_count"]() + 1
+        assert config["threads"] == 4
+        assert config["preload_app"] is True
+        assert 0 < config["max_requests_jitter"] < config["max_requests"]
+
+    def test_sync_profile_uses_two_workers_per_cpu(self, monkeypatch):
+        """Test the sync profile runs 2 * CPUs + 1 single-threaded workers."""
+        config = load_config(monkeypatch, GUNICORN_PROFILE="sync")
+
+        assert config["worker_class"] == "sync"
+        assert config["workers"] == 2 * config["cpu_count"]() + 1
+        assert config["threads"] == 1
+
+    def test_uvicorn_profile_serves_asgi_app(self, monkeypatch):
+        """Test the uvicorn profile points gunicorn at the ASGI application."""
+        config = load_config(monkeypatch, GUNICORN_PROFILE="uvicorn")
+
+        assert config["worker_class"] == "uvicorn_worker.UvicornWorker"
+        assert config["wsgi_app"] == "pmtool.asgi:application"
+
+    def test_env_overrides_sizing(self, monkeypatch):
+        """Test WEB_CONCURRENCY, GUNICORN_THREADS and GUNICORN_PRELOAD override the profile."""
+        config = load_config(
+            monkeypatch, WEB_CONCURRENCY="7", GUNICORN_THREADS="2", GUNICORN_PRELOAD="False"
+        )
+
+        assert config["workers"] == 7
+        assert config["threads"] == 2
+        assert config["preload_app"] is False
+
+    def test_unknown_profile_is_rejected(self, monkeypatch):
+        """Test a mistyped GUNICORN_PROFILE fails at startup."""
+        with pytest.raises(RuntimeError, match="Unknown GUNICORN_PROFILE"):
+            load_config(monkeypatch, GUNICORN_PROFILE="eventlet")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot_gunicorn(tmp_path, metrics_dir):
+    """Start ``gunicorn`` like the Render start command; returns (process, base URL)."""
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'db.sqlite3'}",
+        "PROMETHEUS_MULTIPROC_DIR": str(metrics_dir),
+        "GUNICORN_PROFILE": "sync",
+        "WEB_CONCURRENCY": "1",
+        "METRICS_TOKEN": "",
+        "LOG_QUEUE_ENABLED": "False",
+    }
+    env.pop("LOG_WRITER_PORT", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_for(url, process, seconds=30):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            pytest.fail(f"gunicorn exited:\n{process.stdout.read().decode()}")
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                return response.status, response.read()
+        except OSError:
+            time.sleep(0.2)
+    pytest.fail(f"{url} did not answer within {seconds}s")
+
+
+@pytest.mark.unit
+class TestMetricsDirectory:
+    """Test cases for preparing PROMETHEUS_MULTIPROC_DIR."""
+
+    def test_stale_files_are_removed_at_first_load(self, tmp_path):
+        """Test a fresh master starts from an empty directory."""
+        metrics_dir = tmp_path / "metrics"
+        metrics_dir.mkdir()
+        (metrics_dir / "counter_123.db").write_bytes(b"stale")
+
+        subprocess.run(
+            [sys.executable, "-c", f"import runpy; runpy.run_path({CONFIG!r})"],
+            env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(metrics_dir)},
+            check=True,
+        )
+
+        assert metrics_dir.is_dir()
+        assert list(metrics_dir.iterdir()) == []
+
+    def test_live_files_survive_a_reload(self, monkeypatch, tmp_path):
+        """Test reading the config once metrics exist (SIGHUP) leaves their files alone."""
+        import prometheus_client  # noqa: F401  (metrics exist in this process)
+
+        metrics_dir = tmp_path / "metrics"
+        metrics_dir.mkdir()
+        (metrics_dir / "gauge_livesum_1.db").write_bytes(b"live")
+
+        load_config(monkeypatch, PROMETHEUS_MULTIPROC_DIR=str(metrics_dir))
+
+        assert (metrics_dir / "gauge_livesum_1.db").read_bytes() == b"live"
+
+
+@pytest.mark.integration
+class TestGunicornBoot:
+    """Test cases for starting the real server with gunicorn.conf.py."""
+
+    def test_boots_with_missing_metrics_directory(self, tmp_path):
+        """Test a preloading master starts when PROMETHEUS_MULTIPROC_DIR does not exist yet."""
+        metrics_dir = tmp_path / "metrics" / "missing"
+        process, base_url = boot_gunicorn(tmp_path, metrics_dir)
+        try:
+            status, body = wait_for(f"{base_url}/metrics", process)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        assert status == 200
+        assert b"pmtool_requests_in_flight" in body
+        assert metrics_dir.is_dir()
@@ -0,0 +1,116 @@
+"""
+Tests for Idempotency-Key support on the create endpoints.
+"""
+
+import hashlib
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from Workspaces.models import Workspace
+
+pytestmark = pytest.mark.django_db
+
+
+def create(client, key, name="Retried"):
+    headers = {} if key is None else {"HTTP_IDEMPOTENCY_KEY": key}
+    return client.post(reverse("create_workspace"), {"name": name}, format="json", **headers)
+
+
+@pytest.mark.integration
+class TestIdempotentCreate:
+    """Test cases for the idempotent decorator on create endpoints."""
+
+    def test_retry_replays_first_response_without_creating(self, authenticated_client):
+        """Test a retry with the same key returns the stored response and creates nothing."""
+        first = create(authenticated_client, "key-1")
+        retry = create(authenticated_client, "key-1")
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first
+        assert Workspace.objects.filter(name="Retried").count() == 1
+
+    def test_requests_without_key_are_not_deduplicated(self, authenticated_client):
+        """Test the endpoint behaves as before without the header."""
+        create(authenticated_client, None)
+        create(authenticated_client, None)
+
+        assert Workspace.objects.filter(name="Retried").count() == 2
+
+    def test_key_reused_for_different_body_is_rejected(self, authenticated_client):
+        """Test a key cannot be replayed for a different payload."""
+        create(authenticated_client, "key-1")
+
+        response = create(authenticated_client, "key-1", name="Something else")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert not Workspace.objects.filter(name="Something else").exists()
+
+    def test_keys_are_scoped_per_user(self, authenticated_client, another_user):
+        """Test another user's identical key runs the request instead of replaying."""
+        other_client = APIClient()
+        other_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(another_user).access_token}"
+        )
+        create(authenticated_client, "shared-key")
+
+        response = create(other_client, "shared-key")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in response
+        assert Workspace.objects.filter(name="Retried").count() == 2
+
+    def test_concurrent_duplicate_gets_conflict(self, authenticated_client, monkeypatch):
+        """Test a duplicate arriving while the first request holds the key gets 409."""
+        monkeypatch.setattr(cache, "add", lambda *args, **kwargs: False)
+
+        response = create(authenticated_client, "key-1")
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not Workspace.objects.exists()
+
+    def test_expired_lock_taken_by_a_retry_is_not_released(
+        self, authenticated_client, authenticated_user, monkeypatch
+    ):
+        """Test a request outliving the lock timeout leaves the retry's lock in place."""
+        from Workspaces.views import create_workspace_service
+
+        digest = hashlib.sha256(b"key-1").hexdigest()[:32]
+        lock_key = f"idempotency:{authenticated_user.pk}:{digest}:lock"
+
+        def slow_create(*args, **kwargs):
+            # The lock expires and a retry takes it while this request runs
+            cache.delete(lock_key)
+            cache.add(lock_key, "retry-token", 60)
+            return create_workspace_service(*args, **kwargs)
+
+        monkeypatch.setattr("Workspaces.views.create_workspace_service", slow_create)
+
+        response = create(authenticated_client, "key-1")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert cache.get(lock_key) == "retry-token"
+
+    def test_failed_request_can_be_retried_with_same_key(self, authenticated_client):
+        """Test failed responses are not stored, so a corrected retry with the key runs."""
+        failed = authenticated_client.post(
+            reverse("create_workspace"), {}, format="json", HTTP_IDEMPOTENCY_KEY="key-1"
+        )
+        assert failed.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = create(authenticated_client, "key-1")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in response
+
+    def test_overlong_key_is_rejected(self, authenticated_client):
+        """Test keys longer than 255 characters are refused."""
+        response = create(authenticated_client, "k" * 256)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,94 @@
+"""
+Tests for per-request performance instrumentation.
+"""
+
+import logging
+
+import pytest
+from django.urls import resolve, reverse
+from rest_framework import status
+
+from utils.instrumentation import RequestMetrics
+from utils.middleware import format_server_timing
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.unit
+class TestFormatServerTiming:
+    """Test cases for the Server-Timing header value."""
+
+    def test_formats_phases_in_milliseconds(self):
+        """Test each phase is rendered with its duration in ms."""
+        metrics = RequestMetrics(query_count=3)
+        metrics.add_time("db", 0.0125)
+        metrics.add_time("total", 0.05)
+
+        value = format_server_timing(metrics)
+
+        assert value == 'db;dur=12.50;desc="3 queries", total;dur=50.00'
+
+    def test_add_time_accumulates(self):
+        """Test repeated timings for a phase are summed."""
+        metrics = RequestMetrics()
+        metrics.add_time("serializer", 0.01)
+        metrics.add_time("serializer", 0.02)
+
+        assert metrics.timings["serializer"] == pytest.approx(0.03)
+
+
+@pytest.mark.integration
+class TestPerformanceMiddleware:
+    """Test cases for PerformanceMiddleware."""
+
+    def test_server_timing_header(self, authenticated_client, task_factory, settings):
+        """Test the response carries every measured phase."""
+        settings.SERVER_TIMING_HEADER = True
+        task_factory.create_batch(3)
+
+        response = authenticated_client.get(reverse("task_list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        header = response["Server-Timing"]
+        for phase in ("db", "serializer", "render", "total"):
+            assert f"{phase};dur=" in header
+
+    def test_server_timing_header_disabled(self, authenticated_client, settings):
+        """Test the header is omitted when disabled."""
+        settings.SERVER_TIMING_HEADER = False
+
+        response = authenticated_client.get(reverse("task_list"))
+
+        assert "Server-Timing" not in response
+
+    def test_logs_structured_fields(self, authenticated_client, caplog):
+        """Test the request is logged with its URL name and query count."""
+        # pmtool.performance does not propagate, so attach caplog directly
+        perf_logger = logging.getLogger("pmtool.performance")
+        perf_logger.addHandler(caplog.handler)
+        try:
+            authenticated_client.get(reverse("project_list"))
+        finally:
+            perf_logger.removeHandler(caplog.handler)
+
+        record = next(r for r in caplog.records if r.name == "pmtool.performance")
+        assert record.url_name == "project_list"
+        assert record.status == 200
+        assert record.queries >= 1
+        assert record.total_ms > 0
+
+    def test_logs_query_budget_violations(self, authenticated_client, caplog, monkeypatch):
+        """Test a request running more queries than its view's budget is logged."""
+        url = reverse("project_list")
+        monkeypatch.setattr(resolve(url).func, "query_budget", 0)
+        query_logger = logging.getLogger("pmtool.queries")
+        query_logger.addHandler(caplog.handler)
+        try:
+            authenticated_client.get(url)
+        finally:
+            query_logger.removeHandler(caplog.handler)
+
+        record = next(r for r in caplog.records if r.msg == "Query budget exceeded")
+        assert record.url_name == "project_list"
+        assert record.budget == 0
+        assert record.queries >= 1
@@ -0,0 +1,287 @@
+"""
+Tests for the non-blocking logging pipeline.
+"""
+
+import json
+import logging
+import os
+import queue
+import time
+from logging.handlers import SocketHandler
+
+import pytest
+
+from utils.log import (
+    BoundedQueueHandler,
+    LogPipeline,
+    SamplingFilter,
+    StructuredFormatter,
+    configure_logging,
+    get_log_pipeline,
+    start_log_writer,
+)
+
+
+class ListHandler(logging.Handler):
+    """Handler collecting formatted messages in memory."""
+
+    def __init__(self, name, level=logging.NOTSET):
+        super().__init__(level)
+        self.name = name
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.mark.unit
+class TestLogPipeline:
+    """Test cases for LogPipeline."""
+
+    def test_routes_records_to_each_loggers_own_handlers(self):
+        """Test loggers keep their handler sets and handler levels behind the queue."""
+        console = ListHandler("console")
+        errors = ListHandler("error_file", level=logging.ERROR)
+        app_logger = logging.getLogger("tests.pipeline.app")
+        other_logger = logging.getLogger("tests.pipeline.other")
+        app_logger.handlers = [console, errors]
+        other_logger.handlers = [console]
+        app_logger.propagate = other_logger.propagate = False
+        pipeline = LogPipeline(maxsize=100)
+
+        pipeline.install([app_logger, other_logger])
+        try:
+            app_logger.warning("saved %s", 42)
+            app_logger.error("failed")
+            other_logger.warning("other")
+        finally:
+            pipeline.stop()
+
+        assert [type(h) for h in app_logger.handlers] == [BoundedQueueHandler]
+        assert console.messages == ["saved 42", "failed", "other"]
+        assert errors.messages == ["failed"]
+
+    def test_drops_and_counts_records_when_queue_is_full(self):
+        """Test a full queue drops records instead of blocking the caller."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), route=("console",))
+        logger = logging.getLogger("tests.pipeline.full")
+        logger.handlers = [handler]
+        logger.propagate = False
+
+        logger.warning("kept")
+        logger.warning("dropped")
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+    def test_records_are_queued_unformatted(self):
+        """Test the logging thread neither merges arguments nor renders tracebacks."""
+        handler = BoundedQueueHandler(queue.Queue(), route=("console",))
+        handler.setFormatter(StructuredFormatter())
+        logger = logging.getLogger("tests.pipeline.unformatted")
+        logger.handlers = [handler]
+        logger.propagate = False
+
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed %s", 42)
+
+        record = handler.queue.get_nowait()
+        assert (record.msg, record.args) == ("failed %s", (42,))
+        assert record.exc_info is not None and record.exc_text is None
+        assert not hasattr(record, "message")
+
+    def test_tracebacks_are_rendered_by_the_listener(self):
+        """Test exceptions logged through the pipeline still reach handlers in full."""
+        console = ListHandler("console")
+        logger = logging.getLogger("tests.pipeline.traceback")
+        logger.handlers = [console]
+        logger.propagate = False
+        pipeline = LogPipeline(maxsize=100)
+        pipeline.install([logger])
+
+        try:
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("failed %s", 42)
+        finally:
+            pipeline.stop()
+
+        assert console.messages[0].startswith("failed 42\nTraceback")
+        assert "ValueError: boom" in console.messages[0]
+
+    def test_listener_is_restarted_only_on_request_after_fork(self):
+        """Test a forked child gets no listener until restart_after_fork is called."""
+        console = ListHandler("console")
+        logger = logging.getLogger("tests.pipeline.fork")
+        logger.handlers = [console]
+        logger.propagate = False
+        pipeline = LogPipeline(maxsize=100)
+        pipeline.install([logger])
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            result = [pipeline.listener._thread.is_alive()]
+            pipeline.restart_after_fork()
+            logger.warning("from child")
+            pipeline.stop()
+            result.append(console.messages == ["from child"])
+            os.write(write_end, json.dumps(result).encode())
+            os._exit(0)
+        os.close(write_end)
+        try:
+            with os.fdopen(read_end) as child_output:
+                result = json.loads(child_output.read())
+            os.waitpid(pid, 0)
+        finally:
+            pipeline.stop()
+
+        assert result == [False, True]
+
+
+@pytest.mark.unit
+class TestConfigureLogging:
+    """Test cases for configure_logging."""
+
+    def test_only_loggers_from_logging_settings_are_queued(
+        self, settings, tmp_path, monkeypatch
+    ):
+        """Test loggers configured elsewhere (gunicorn's error log) keep their handlers."""
+        settings.LOG_QUEUE_ENABLED = True
+        settings.LOG_WRITER_ADDRESS = None
+        # Leave the pipeline of the test session's own LOGGING running
+        monkeypatch.setattr("utils.log._pipeline", None)
+        foreign = logging.getLogger("tests.configure.foreign")
+        foreign_file = logging.FileHandler(tmp_path / "foreign.log")
+        foreign.handlers = [foreign_file]
+        root = logging.getLogger()
+        root_handlers = root.handlers[:]
+        try:
+            configure_logging(
+                {
+                    "version": 1,
+                    "disable_existing_loggers": False,
+                    "handlers": {"console": {"class": "logging.StreamHandler"}},
+                    "root": {"handlers": []},
+                    "loggers": {
+                        "tests.configure.app": {"handlers": ["console"], "propagate": False}
+                    },
+                }
+            )
+            get_log_pipeline().stop()
+        finally:
+            root.handlers = root_handlers
+            foreign_file.close()
+
+        assert [type(h) for h in logging.getLogger("tests.configure.app").handlers] == [
+            BoundedQueueHandler
+        ]
+        assert foreign.handlers == [foreign_file]
+
+
+@pytest.mark.unit
+class TestLogWriter:
+    """Test cases for the single log writer."""
+
+    def test_writes_forwarded_records_to_named_files(self, tmp_path):
+        """Test records sent over the socket land in the file handlers they name."""
+        log_file = tmp_path / "pmtool.log"
+        logging_settings = {
+            "formatters": {"simple": {"format": "{levelname} {message}", "style": "{"}},
+            "handlers": {
+                "console": {"class": "logging.StreamHandler"},
+                "file": {
+                    "class": "logging.FileHandler",
+                    "filename": str(log_file),
+                    "formatter": "simple",
+                },
+            },
+        }
+        server = start_log_writer(("127.0.0.1", 0), logging_settings)
+        sender = SocketHandler(*server.server_address)
+        record = logging.makeLogRecord(
+            {"msg": "Task created: %s", "args": (7,), "levelno": logging.INFO,
+             "levelname": "INFO", "_log_files": ("file",)}
+        )
+        try:
+            sender.handle(record)
+            wait_for(lambda: log_file.exists() and log_file.read_text())
+        finally:
+            sender.close()
+            server.shutdown()
+            server.server_close()
+
+        assert log_file.read_text() == "INFO Task created: 7\n"
+
+
+@pytest.mark.unit
+class TestStructuredFormatter:
+    """Test cases for StructuredFormatter."""
+
+    def test_appends_extra_fields(self):
+        """Test extra fields are appended and private attributes skipped."""
+        record = logging.makeLogRecord(
+            {"msg": "GET task_list 200", "url_name": "task_list", "_queue_route": ("x",)}
+        )
+
+        formatted = StructuredFormatter("{message}", style="{").format(record)
+
+        assert formatted == "GET task_list 200 | url_name='task_list'"
+
+    def test_sampling_markers_are_not_fields(self):
+        """Test the sampling marker and decision are left out, the sampling rate kept."""
+        record = logging.makeLogRecord(
+            {"msg": "Tasks retrieved", "sampled": True, "_sample_keep": True, "sample_every": 100}
+        )
+
+        formatted = StructuredFormatter("{message}", style="{").format(record)
+
+        assert formatted == "Tasks retrieved | sample_every=100"
+
+
+@pytest.mark.unit
+class TestSamplingFilter:
+    """Test cases for SamplingFilter."""
+
+    def test_keeps_one_in_every_sampled_record(self):
+        """Test handlers sharing the filter keep the same sampled records."""
+        sampling = SamplingFilter(every=5)
+        console = ListHandler("console")
+        file = ListHandler("file")
+        for handler in (console, file):
+            handler.addFilter(sampling)
+        logger = logging.getLogger("tests.sampling.views")
+        logger.handlers = [console, file]
+        logger.propagate = False
+
+        for _ in range(10):
+            logger.info("Retrieved tasks", extra={"sampled": True})
+        logger.info("Task created successfully")
+
+        expected = ["Retrieved tasks"] * 2 + ["Task created successfully"]
+        assert console.messages == expected
+        assert file.messages == expected
+
+    def test_marks_kept_records_with_rate(self):
+        """Test kept records carry sample_every and other messages count separately."""
+        sampling = SamplingFilter(every=3)
+        records = [
+            logging.makeLogRecord({"msg": msg, "sampled": True})
+            for msg in ("Retrieved tasks", "Retrieved projects", "Retrieved tasks")
+        ]
+
+        kept = [record for record in records if sampling.filter(record)]
+
+        assert [record.msg for record in kept] == ["Retrieved tasks", "Retrieved projects"]
+        assert all(record.sample_every == 3 for record in kept)
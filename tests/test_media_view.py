@@ -0,0 +1,146 @@
+"""
+Tests for the local-storage media view (utils.views.media).
+"""
+
+import pytest
+from django.urls import reverse
+
+from utils.views import FileRange, parse_byte_range
+
+HASHED = "avatars/0123456789abcdef0123456789abcdef.png"
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_SENDFILE_HEADER = ""
+    (tmp_path / "avatars").mkdir()
+    (tmp_path / HASHED).write_bytes(bytes(range(100)))
+    (tmp_path / "avatars" / "me.png").write_bytes(b"legacy")
+    return tmp_path
+
+
+def url(name):
+    return reverse("media", args=[name])
+
+
+def body(response):
+    return b"".join(response.streaming_content)
+
+
+@pytest.mark.unit
+class TestParseByteRange:
+    """Test cases for Range header parsing."""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("bytes=0-9", (0, 9)),
+            ("bytes=90-", (90, 99)),
+            ("bytes=-10", (90, 99)),
+            ("bytes=95-200", (95, 99)),
+            ("bytes=0-1,5-6", None),
+            ("items=0-1", None),
+            ("bytes=abc", None),
+        ],
+    )
+    def test_ranges(self, header, expected):
+        """Test single ranges are resolved and anything else means the whole file."""
+        assert parse_byte_range(header, 100) == expected
+
+    def test_unsatisfiable(self):
+        """Test ranges starting past the end are refused."""
+        with pytest.raises(ValueError):
+            parse_byte_range("bytes=100-", 100)
+
+    def test_file_range_stops_at_its_end(self, tmp_path):
+        """Test reads through FileRange never go past the range."""
+        path = tmp_path / "f"
+        path.write_bytes(b"0123456789")
+        file = open(path, "rb")
+        file.seek(2)
+
+        part = FileRange(file, 3)
+
+        assert part.read(100) == b"234"
+        assert part.read() == b""
+        assert part.fileno() == file.fileno()
+        part.close()
+
+
+@pytest.mark.integration
+class TestMediaView:
+    """Test cases for serving files from MEDIA_ROOT."""
+
+    def test_serves_file_with_validators(self, client, media):
+        """Test a full response carries ETag, Last-Modified and the cache policy."""
+        response = client.get(url(HASHED))
+
+        assert response.status_code == 200
+        assert body(response) == bytes(range(100))
+        assert response["Content-Type"] == "image/png"
+        assert response["Content-Length"] == "100"
+        assert response["Accept-Ranges"] == "bytes"
+        assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+        assert response["ETag"] and response["Last-Modified"]
+
+    def test_mutable_names_must_revalidate(self, client, media):
+        """Test files not named after their content are revalidated."""
+        assert client.get(url("avatars/me.png"))["Cache-Control"] == "public, no-cache"
+
+    def test_conditional_get_returns_304(self, client, media):
+        """Test a matching If-None-Match gets an empty 304."""
+        etag = client.get(url(HASHED))["ETag"]
+
+        response = client.get(url(HASHED), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_range_request_returns_206(self, client, media):
+        """Test a byte range is answered with just those bytes."""
+        response = client.get(url(HASHED), HTTP_RANGE="bytes=10-19")
+
+        assert response.status_code == 206
+        assert body(response) == bytes(range(10, 20))
+        assert response["Content-Length"] == "10"
+        assert response["Content-Range"] == "bytes 10-19/100"
+
+    def test_stale_if_range_gets_the_whole_file(self, client, media):
+        """Test a Range for an older version of the file is ignored."""
+        response = client.get(url(HASHED), HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"old"')
+
+        assert response.status_code == 200
+        assert len(body(response)) == 100
+
+    def test_unsatisfiable_range_returns_416(self, client, media):
+        """Test a range past the end is refused with the file size."""
+        response = client.get(url(HASHED), HTTP_RANGE="bytes=500-")
+
+        assert response.status_code == 416
+        assert response["Content-Range"] == "bytes */100"
+
+    def test_missing_and_escaping_paths_are_404(self, client, media):
+        """Test unknown files, directories and paths outside MEDIA_ROOT are not served."""
+        assert client.get(url("avatars/nope.png")).status_code == 404
+        assert client.get(url("avatars")).status_code == 404
+        assert client.get("/media/../pmtool/settings.py").status_code == 404
+
+    def test_x_accel_redirect_handoff(self, client, media, settings):
+        """Test nginx is told which internal location to send."""
+        settings.MEDIA_SENDFILE_HEADER = "X-Accel-Redirect"
+        settings.MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+        response = client.get(url(HASHED))
+
+        assert response["X-Accel-Redirect"] == f"/protected-media/{HASHED}"
+        assert response.content == b""
+        assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    def test_x_sendfile_handoff(self, client, media, settings):
+        """Test Apache/lighttpd get the absolute path."""
+        settings.MEDIA_SENDFILE_HEADER = "X-Sendfile"
+
+        response = client.get(url(HASHED))
+
+        assert response["X-Sendfile"] == str(media / HASHED)
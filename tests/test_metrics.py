@@ -0,0 +1,54 @@
+"""
+Tests for the Prometheus metrics endpoint.
+"""
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from utils.metrics import record_cache_access
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.integration
+class TestMetricsEndpoint:
+    """Test cases for /metrics."""
+
+    def test_exposes_request_metrics(self, authenticated_client, api_client, settings):
+        """Test handled requests show up as latency and query histograms."""
+        settings.METRICS_TOKEN = ""
+        authenticated_client.get(reverse("task_list"))
+
+        response = api_client.get(reverse("metrics"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/plain")
+        body = response.content.decode()
+        assert (
+            'pmtool_request_duration_seconds_count{method="GET",status="200",'
+            'url_name="task_list"}' in body
+        )
+        assert 'pmtool_request_db_queries_bucket{le="1.0",url_name="task_list"}' in body
+        assert "pmtool_requests_in_flight" in body
+
+    def test_exposes_cache_lookups(self, api_client, settings):
+        """Test cache hits and misses are counted per cache."""
+        settings.METRICS_TOKEN = ""
+        record_cache_access("test-cache", hit=True)
+        record_cache_access("test-cache", hit=False)
+
+        body = api_client.get(reverse("metrics")).content.decode()
+
+        assert 'pmtool_cache_requests_total{cache="test-cache",result="hit"}' in body
+        assert 'pmtool_cache_requests_total{cache="test-cache",result="miss"}' in body
+
+    def test_requires_token_when_configured(self, api_client, settings):
+        """Test scrapes without the configured bearer token are rejected."""
+        settings.METRICS_TOKEN = "scrape-secret"
+
+        assert api_client.get(reverse("metrics")).status_code == 401
+        response = api_client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret"
+        )
+        assert response.status_code == status.HTTP_200_OK
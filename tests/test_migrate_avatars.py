@@ -0,0 +1,129 @@
+"""
+Tests for the migrate_avatars_to_b2 command, against an in-process S3 stand-in (moto).
+"""
+
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from Users.management.commands.migrate_avatars_to_b2 import Command
+from utils.media_transfer import TransferItem
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def media(tmp_path, user_factory):
+    """Two users' avatars (one with thumbnails) on local disk."""
+    (tmp_path / "avatars" / "thumbs").mkdir(parents=True)
+    for name, size in (
+        ("avatars/a.png", 100),
+        ("avatars/b.png", 200),
+        ("avatars/thumbs/a_32.webp", 10),
+    ):
+        (tmp_path / name).write_bytes(b"x" * size)
+    user_factory(
+        avatar="avatars/a.png", avatar_thumbnails={"32": {"webp": "avatars/thumbs/a_32.webp"}}
+    )
+    user_factory(avatar="avatars/b.png")
+    user_factory(avatar="avatars/gone.png")
+    return tmp_path
+
+
+def migrate(media, *args):
+    out = io.StringIO()
+    call_command(
+        "migrate_avatars_to_b2",
+        "--source",
+        str(media),
+        "--checkpoint",
+        str(media / "checkpoint"),
+        *args,
+        stdout=out,
+    )
+    return out.getvalue()
+
+
+def keys(bucket):
+    return {obj.key: obj.size for obj in bucket.objects.all()}
+
+
+@pytest.mark.integration
+class TestMigrateAvatarsToB2:
+    """Test cases for the parallel, resumable avatar migration."""
+
+    def test_uploads_avatars_and_thumbnails(self, s3_bucket, media):
+        """Test every local file is uploaded under its storage name and missing ones are counted."""
+        output = migrate(media, "--workers", "2")
+
+        assert keys(s3_bucket) == {
+            "avatars/a.png": 100,
+            "avatars/b.png": 200,
+            "avatars/thumbs/a_32.webp": 10,
+        }
+        assert "1 missing" in output
+        assert (media / "checkpoint").read_text().count("\n") == 3
+
+    def test_shared_avatar_is_uploaded_once(self, s3_bucket, media, user_factory):
+        """Test files referenced by several users are uploaded and counted once."""
+        user_factory(
+            avatar="avatars/a.png",
+            avatar_thumbnails={"32": {"webp": "avatars/thumbs/a_32.webp"}},
+        )
+
+        output = migrate(media, "--workers", "4")
+
+        assert len(keys(s3_bucket)) == 3
+        assert "3 local files" in output
+        assert "Migrated: 3 " in output
+        assert (media / "checkpoint").read_text().count("\n") == 3
+
+    def test_skips_objects_already_in_the_bucket(self, s3_bucket, media):
+        """Test files already present with the same size are not uploaded again."""
+        s3_bucket.put_object(Key="avatars/a.png", Body=b"y" * 100)
+        s3_bucket.put_object(Key="avatars/b.png", Body=b"y" * 5)  # partial, re-upload
+
+        migrate(media)
+
+        assert s3_bucket.Object("avatars/a.png").get()["Body"].read() == b"y" * 100
+        assert keys(s3_bucket)["avatars/b.png"] == 200
+
+    def test_resumes_from_checkpoint(self, s3_bucket, media):
+        """Test names recorded in the checkpoint are skipped on a rerun."""
+        (media / "checkpoint").write_text("avatars/a.png\navatars/thumbs/a_32.webp\n")
+
+        migrate(media)
+
+        assert set(keys(s3_bucket)) == {"avatars/b.png"}
+
+    def test_failures_are_reported_and_retried_on_rerun(self, s3_bucket, media, monkeypatch):
+        """Test a failed upload fails the command but keeps the finished ones checkpointed."""
+        local_files = Command._local_files
+
+        def with_broken_file(self, storage):
+            items, missing = local_files(self, storage)
+            return items + [TransferItem("avatars/broken.png", str(media / "nope"), 1)], missing
+
+        monkeypatch.setattr(Command, "_local_files", with_broken_file)
+
+        with pytest.raises(CommandError, match="1 uploads failed"):
+            migrate(media)
+
+        assert "avatars/broken.png" not in (media / "checkpoint").read_text()
+        assert len(keys(s3_bucket)) == 3
+
+    def test_large_files_use_multipart_upload(self, s3_bucket, media):
+        """Test files over the threshold are uploaded in parts."""
+        (media / "avatars" / "a.png").write_bytes(b"x" * (6 * 1024 * 1024))
+
+        migrate(media, "--multipart-threshold", "5", "--chunk-size", "5")
+
+        assert s3_bucket.Object("avatars/a.png").e_tag.strip('"').endswith("-2")
+
+    def test_dry_run_uploads_nothing(self, s3_bucket, media):
+        """Test a dry run only reports what it would upload."""
+        output = migrate(media, "--dry-run")
+
+        assert keys(s3_bucket) == {}
+        assert "3 to upload" in output
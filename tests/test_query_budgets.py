@@ -0,0 +1,112 @@
+"""
+Query budget tests.
+
+Every API view declares the most queries it may run with
+``utils.instrumentation.query_budget``. Each endpoint is requested with a
+small dataset and again after the data has grown: the query count must
+stay within the budget and must not grow with the number of rows.
+"""
+
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, resolve
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.endpoints import ENDPOINTS
+from utils.instrumentation import get_query_budget
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = "testpass123"
+
+
+@pytest.fixture
+def dataset(user_factory, workspace_factory, project_factory, task_factory):
+    """A workspace with a project, and a function adding ``n`` rows of everything to it."""
+    User = get_user_model()
+    owner = user_factory(password=PASSWORD)
+    workspace = workspace_factory(owner=owner, members=[owner])
+    project = project_factory(workspace=workspace)
+    task = task_factory(project=project, author=owner)
+    other = User.objects.create(username="budget_other")
+    ctx = {
+        "tag": "budget",
+        "user": owner,
+        "password": PASSWORD,
+        "user_id": other.pk,
+        "workspace_id": workspace.pk,
+        "project_id": project.pk,
+        "task_id": task.pk,
+    }
+
+    def grow(n):
+        # Users without a password: hashing one per user would dominate the test
+        members = User.objects.bulk_create(User(username=f"budget_{i}") for i in range(n))
+        workspace.members.add(*members)
+        other_workspace = workspace_factory(owner=owner, members=[owner])
+        for _ in range(n):
+            project_factory(workspace=workspace)
+            project_factory(workspace=other_workspace)
+            task_factory(project=project, author=owner, assignees=members[:2])
+        task.assignees.add(*members)
+
+    return ctx, grow
+
+
+def count_queries(name, ctx, iteration):
+    endpoint = ENDPOINTS[name]
+    headers = {}
+    if endpoint.auth:
+        headers["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(ctx['user'])}"
+    if endpoint.body:
+        headers["data"] = json.dumps(endpoint.body(ctx, iteration))
+        headers["content_type"] = "application/json"
+    client = Client()
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, endpoint.method.lower())(
+            endpoint.path(ctx, iteration), **headers
+        )
+    assert response.status_code == endpoint.expected_status, response.content
+    return len(queries)
+
+
+def named_views(patterns=None):
+    """Yield (url name, view) for every named URL outside the admin."""
+    for entry in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(entry, URLResolver):
+            if entry.namespace != "admin":
+                yield from named_views(entry.url_patterns)
+        elif entry.name:
+            yield entry.name, entry.callback
+
+
+@pytest.mark.integration
+class TestQueryBudgets:
+    """Test every endpoint against its query budget at two data sizes."""
+
+    def test_every_api_view_declares_a_budget(self):
+        """Test no API view ships without a query budget."""
+        missing = [name for name, view in named_views() if get_query_budget(view) is None]
+
+        assert missing == []
+
+    @pytest.mark.parametrize("name", sorted(ENDPOINTS))
+    def test_query_count_within_budget_and_constant(self, name, dataset):
+        """Test the endpoint stays within budget and its query count does not grow with data."""
+        ctx, grow = dataset
+        endpoint = ENDPOINTS[name]
+        if endpoint.prepare:
+            endpoint.prepare(ctx, 2)
+        budget = get_query_budget(resolve(endpoint.path(ctx, 0)).func)
+
+        small = count_queries(name, ctx, 0)
+        grow(8)
+        large = count_queries(name, ctx, 1)
+
+        assert small <= budget
+        assert large == small, f"{name}: {small} queries with little data, {large} with more"
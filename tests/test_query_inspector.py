@@ -0,0 +1,112 @@
+"""
+Tests for the N+1 / duplicate query detector.
+"""
+
+import logging
+
+import pytest
+from django.test import RequestFactory
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+
+from Tasks.models import Task
+from Tasks.serializers import TaskSerializer
+from utils.query_inspector import (
+    DuplicateQueryError,
+    QueryInspector,
+    QueryInspectorMiddleware,
+    normalize_sql,
+)
+from utils.responses import success_response
+
+pytestmark = pytest.mark.django_db
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def unprefetched_task_list(request):
+    """View that serializes tasks without prefetching their assignees."""
+    return success_response(data=TaskSerializer(Task.objects.all(), many=True).data)
+
+
+@pytest.mark.unit
+class TestNormalizeSql:
+    """Test cases for normalize_sql."""
+
+    def test_replaces_literals_and_placeholders(self):
+        """Test literals and placeholders are replaced with ?."""
+        sql = "SELECT * FROM tasks WHERE id = 42 AND name = 'it''s' AND status = %s"
+
+        assert normalize_sql(sql) == (
+            "SELECT * FROM tasks WHERE id = ? AND name = ? AND status = ?"
+        )
+
+    def test_collapses_in_lists(self):
+        """Test IN lists of any length have the same shape."""
+        short = normalize_sql("SELECT * FROM t WHERE id IN (%s, %s)")
+        long = normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s, %s)")
+
+        assert short == long == "SELECT * FROM t WHERE id IN (...)"
+
+
+@pytest.mark.unit
+class TestQueryInspector:
+    """Test cases for QueryInspector."""
+
+    def test_flags_serializer_n_plus_one(self, task_factory):
+        """Test per-row assignee lookups are reported with their serializer field."""
+        task_factory.create_batch(4)
+        inspector = QueryInspector(threshold=2)
+
+        with inspector.watch():
+            TaskSerializer(Task.objects.all(), many=True).data
+
+        [repeated] = inspector.repeated_queries()
+        assert repeated.count == 4
+        assert repeated.serializer_field == "TaskSerializer.assignees"
+        assert repeated.origin.startswith("tests/test_query_inspector.py")
+
+    def test_ignores_shapes_within_threshold(self, task_factory):
+        """Test shapes repeated up to the threshold are not reported."""
+        task_factory.create_batch(2)
+        inspector = QueryInspector(threshold=2)
+
+        with inspector.watch():
+            TaskSerializer(Task.objects.all(), many=True).data
+
+        assert inspector.repeated_queries() == []
+
+
+@pytest.mark.integration
+class TestQueryInspectorMiddleware:
+    """Test cases for QueryInspectorMiddleware."""
+
+    def test_logs_repeated_queries(self, task_factory, settings, caplog):
+        """Test findings are logged to pmtool.queries."""
+        settings.QUERY_INSPECTOR_ENABLED = True
+        settings.QUERY_INSPECTOR_THRESHOLD = 2
+        settings.QUERY_INSPECTOR_RAISE = False
+        task_factory.create_batch(3)
+        middleware = QueryInspectorMiddleware(unprefetched_task_list)
+        queries_logger = logging.getLogger("pmtool.queries")
+        queries_logger.addHandler(caplog.handler)
+        try:
+            response = middleware(RequestFactory().get("/"))
+        finally:
+            queries_logger.removeHandler(caplog.handler)
+
+        assert response.status_code == 200
+        [record] = [r for r in caplog.records if r.name == "pmtool.queries"]
+        assert record.count == 3
+        assert record.serializer_field == "TaskSerializer.assignees"
+
+    def test_raises_when_configured(self, task_factory, settings):
+        """Test findings fail the request when QUERY_INSPECTOR_RAISE is set."""
+        settings.QUERY_INSPECTOR_ENABLED = True
+        settings.QUERY_INSPECTOR_THRESHOLD = 2
+        settings.QUERY_INSPECTOR_RAISE = True
+        task_factory.create_batch(3)
+        middleware = QueryInspectorMiddleware(unprefetched_task_list)
+
+        with pytest.raises(DuplicateQueryError, match="TaskSerializer.assignees"):
+            middleware(RequestFactory().get("/"))
@@ -0,0 +1,111 @@
+"""
+Tests for the bulk dataset seeder and the seed_perf_data command.
+"""
+
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+from Projects.models import Project
+from Tasks.models import Task
+from Workspaces.models import Workspace
+from utils.seeding import SEED_PASSWORD, seed_dataset
+
+pytestmark = pytest.mark.django_db
+
+
+def snapshot():
+    tasks = Task.objects.order_by("id")
+    return (
+        list(tasks.values_list("project__name", "author__username", "status", "priority")),
+        sorted(Task.assignees.through.objects.values_list("task__name", "user__username")),
+        sorted(Workspace.members.through.objects.values_list("workspace__name", "user__username")),
+    )
+
+
+@pytest.mark.unit
+class TestSeedDataset:
+    """Test cases for seed_dataset."""
+
+    def test_creates_requested_rows(self):
+        """Test rows and M2M links are bulk inserted with the requested shape."""
+        summary = seed_dataset(
+            users=20, workspaces=2, projects_per=3, tasks_per=5, assignees_per=2, chunk_size=7
+        )
+
+        assert (summary.users, summary.workspaces, summary.projects) == (20, 2, 6)
+        assert summary.tasks == Task.objects.count() == 30
+        assert summary.assignments == Task.assignees.through.objects.count()
+        assert get_user_model().objects.get(username="perf0").check_password(SEED_PASSWORD)
+
+    def test_workspace_membership_and_assignees(self):
+        """Test owners are members, and tasks are only assigned to workspace members."""
+        seed_dataset(
+            users=30, workspaces=3, projects_per=2, tasks_per=10, assignees_per=2, members_per=5
+        )
+
+        for workspace in Workspace.objects.all():
+            members = set(workspace.members.values_list("id", flat=True))
+            assert len(members) == 5 and workspace.owner_id in members
+        for task in Task.objects.select_related("project__workspace"):
+            members = set(task.project.workspace.members.values_list("id", flat=True))
+            assert task.author_id in members
+            assert set(task.assignees.values_list("id", flat=True)) <= members
+            assert task.assignees.count() <= 4
+
+    def test_distributions_are_skewed(self):
+        """Test statuses, due dates and project sizes vary like real data."""
+        seed_dataset(users=50, workspaces=2, projects_per=10, tasks_per=50, assignees_per=1)
+
+        statuses = set(Task.objects.values_list("status", flat=True))
+        sizes = [project.tasks.count() for project in Project.objects.all()]
+        due_dates = Task.objects.exclude(due_date=None).count()
+
+        assert statuses == {"todo", "in_progress", "done"}
+        assert sum(sizes) == 1000 and min(sizes) < 50 < max(sizes)
+        assert 0.6 < due_dates / 1000 < 0.8
+
+    def test_same_seed_gives_same_dataset(self):
+        """Test a seed reproduces the same rows and links."""
+        shape = dict(users=15, workspaces=2, projects_per=2, tasks_per=5, assignees_per=2)
+        seed_dataset(**shape, seed=3)
+        first = snapshot()
+        Workspace.objects.all().delete()
+        get_user_model().objects.all().delete()
+
+        seed_dataset(**shape, seed=3)
+
+        assert snapshot() == first
+
+
+@pytest.mark.unit
+class TestSeedPerfDataCommand:
+    """Test cases for the seed_perf_data management command."""
+
+    def test_seeds_and_reports_progress(self):
+        """Test the command seeds the dataset and prints progress and a summary."""
+        out = StringIO()
+
+        call_command(
+            "seed_perf_data",
+            "--users=10",
+            "--workspaces=2",
+            "--projects-per=2",
+            "--tasks-per=25",
+            "--chunk-size=20",
+            stdout=out,
+        )
+
+        assert Task.objects.count() == 100
+        assert "tasks" in out.getvalue() and "100%" in out.getvalue()
+        assert "Tasks: 100" in out.getvalue()
+
+    def test_refuses_existing_prefix(self, user_factory):
+        """Test seeding twice with the same prefix is rejected before inserting."""
+        user_factory(username="perf0")
+
+        with pytest.raises(CommandError):
+            call_command("seed_perf_data", "--users=5", stdout=StringIO())
+        assert Workspace.objects.count() == 0
@@ -0,0 +1,221 @@
+"""
+Tests for the storage helpers in utils.storage.
+"""
+
+import os
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from utils import metrics
+from utils.storage import DiskCache, SignedURLCache
+
+
+class Signer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"https://bucket.example/a.png?signature={self.calls}"
+
+
+@pytest.fixture
+def b2_settings(settings):
+    settings.SIGNED_URL_BUCKET_SECONDS = 1800
+    settings.SIGNED_URL_CACHE_SIZE = 100
+    settings.SIGNED_URL_CACHE = "default"
+    settings.MEDIA_DISK_CACHE_DIR = ""
+    return settings
+
+
+def make_b2_storage(**kwargs):
+    from utils.b2_storage import B2Storage
+
+    return B2Storage(
+        access_key="key-id",
+        secret_key="secret",
+        bucket_name="pmtool-media",
+        endpoint_url="https://s3.us-east-005.backblazeb2.com",
+        region_name="us-east-005",
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+class TestSignedURLCache:
+    """Test cases for SignedURLCache."""
+
+    def test_same_url_for_the_whole_bucket(self):
+        """Test a name is signed once per bucket and the URL reused until it ends."""
+        urls = SignedURLCache(bucket_seconds=60, max_entries=10, cache_alias="default")
+        sign = Signer()
+
+        first = urls.get_or_sign("a.png", sign, now=120)
+        again = urls.get_or_sign("a.png", sign, now=179.9)
+        next_bucket = urls.get_or_sign("a.png", sign, now=180)
+
+        assert first == again
+        assert next_bucket != first
+        assert sign.calls == 2
+
+    def test_workers_share_the_first_signed_url(self):
+        """Test another process' cache gets the URL from the shared tier."""
+        worker_a = SignedURLCache(bucket_seconds=60, max_entries=10, cache_alias="default")
+        worker_b = SignedURLCache(bucket_seconds=60, max_entries=10, cache_alias="default")
+        sign = Signer()
+
+        assert worker_a.get_or_sign("a.png", sign, now=10) == worker_b.get_or_sign(
+            "a.png", sign, now=20
+        )
+        assert sign.calls == 1
+
+    def test_local_tier_is_bounded(self):
+        """Test the least recently used names are evicted from the process LRU."""
+        urls = SignedURLCache(bucket_seconds=60, max_entries=2, cache_alias="default")
+        for name in ("a.png", "b.png", "c.png"):
+            urls.get_or_sign(name, Signer(), now=0)
+
+        assert list(urls._entries) == ["b.png", "c.png"]
+
+    def test_shared_entry_expires_with_its_bucket(self, monkeypatch):
+        """Test the shared cache keeps a URL only until its bucket ends."""
+        timeouts = []
+        add = cache.add
+
+        def spy(key, value, timeout):
+            timeouts.append(timeout)
+            return add(key, value, timeout)
+
+        monkeypatch.setattr(cache, "add", spy)
+
+        SignedURLCache(bucket_seconds=60, max_entries=10, cache_alias="default").get_or_sign(
+            "a.png", Signer(), now=105
+        )
+
+        assert timeouts == [16]
+
+
+@pytest.mark.unit
+class TestB2Storage:
+    """Test cases for presigned URLs of the B2 backend."""
+
+    def test_urls_are_stable_within_a_bucket(self, b2_settings, monkeypatch):
+        """Test repeated url() calls return one presigned URL without re-signing."""
+        storage = make_b2_storage()
+        first = storage.url("avatars/a.png")
+        monkeypatch.setattr(
+            storage.connection.meta.client,
+            "generate_presigned_url",
+            lambda *args, **kwargs: pytest.fail("signed again"),
+        )
+
+        assert storage.url("avatars/a.png") == first
+        assert "X-Amz-Signature=" in first
+
+    def test_explicit_arguments_bypass_the_cache(self, b2_settings):
+        """Test url() with an expiry or parameters signs a new URL."""
+        storage = make_b2_storage()
+        storage.url("avatars/a.png")
+
+        url = storage.url("avatars/a.png", expire=60)
+
+        assert "X-Amz-Expires=60" in url
+
+    def test_bucket_must_be_shorter_than_url_lifetime(self, b2_settings):
+        """Test a configuration that would hand out expired URLs is rejected."""
+        with pytest.raises(ImproperlyConfigured):
+            make_b2_storage(querystring_expire=1800)
+
+
+def cache_count(result):
+    return metrics.CACHE_REQUESTS.labels("media_disk", result)._value.get()
+
+
+@pytest.mark.unit
+class TestDiskCache:
+    """Test cases for DiskCache."""
+
+    def test_put_then_get(self, tmp_path):
+        """Test a stored file is returned with its ETag."""
+        disk = DiskCache(str(tmp_path), max_bytes=1000)
+
+        path = disk.put("avatars/a.png", [b"ab", b"cd"], '"etag-1"')
+
+        assert open(path, "rb").read() == b"abcd"
+        assert disk.get("avatars/a.png")[:2] == (path, '"etag-1"')
+        assert disk.get("avatars/b.png") is None
+
+    def test_least_recently_used_files_are_evicted(self, tmp_path):
+        """Test going over max_bytes deletes the oldest files down to 90% of it."""
+        disk = DiskCache(str(tmp_path), max_bytes=1000)
+        for index, name in enumerate(("a", "b", "c")):
+            path = disk.put(name, [b"x" * 100], "etag")
+            os.utime(path, (index, index))
+        disk.get("a")  # now the most recently used
+
+        disk.max_bytes = 250
+        disk.trim()
+
+        assert disk.get("a") is not None
+        assert disk.get("b") is None
+        assert disk.get("c") is not None
+
+
+@pytest.mark.integration
+class TestDiskCachedB2Storage:
+    """Test cases for reading B2 files through the local disk cache."""
+
+    def test_second_read_is_served_from_disk(self, s3_bucket, monkeypatch):
+        """Test only the first open() downloads the object, and the file has a fileno."""
+        s3_bucket.put_object(Key="avatars/a.png", Body=b"image")
+        hits = cache_count("hit")
+        with default_storage.open("avatars/a.png") as fh:
+            assert fh.read() == b"image"
+
+        monkeypatch.setattr(
+            default_storage.connection.meta.client,
+            "get_object",
+            lambda **kwargs: pytest.fail("downloaded again"),
+        )
+        with default_storage.open("avatars/a.png") as fh:
+            assert fh.read() == b"image"
+            assert fh.fileno() > 0
+        assert cache_count("hit") == hits + 1
+
+    def test_stale_copy_is_revalidated_by_etag(self, s3_bucket, settings):
+        """Test an unchanged object is kept and a changed one downloaded again."""
+        settings.MEDIA_DISK_CACHE_REVALIDATE_SECONDS = 0
+        s3_bucket.put_object(Key="avatars/a.png", Body=b"first")
+        unchanged = metrics.MEDIA_CACHE_REVALIDATIONS.labels("unchanged")._value.get()
+
+        default_storage.open("avatars/a.png").close()
+        assert default_storage.open("avatars/a.png").read() == b"first"
+        assert (
+            metrics.MEDIA_CACHE_REVALIDATIONS.labels("unchanged")._value.get() == unchanged + 1
+        )
+
+        s3_bucket.put_object(Key="avatars/a.png", Body=b"second")
+        assert default_storage.open("avatars/a.png").read() == b"second"
+
+    def test_delete_drops_the_local_copy(self, s3_bucket):
+        """Test deleted files are neither served from disk nor found remotely."""
+        s3_bucket.put_object(Key="avatars/a.png", Body=b"image")
+        default_storage.open("avatars/a.png").close()
+        path = default_storage.disk_cache.path("avatars/a.png")
+
+        default_storage.delete("avatars/a.png")
+
+        assert not os.path.exists(path)
+        with pytest.raises(FileNotFoundError):
+            default_storage.open("avatars/a.png")
+
+    def test_saved_files_are_kept_locally(self, s3_bucket):
+        """Test an upload can be read back (e.g. by the thumbnailer) without a download."""
+        name = default_storage.save("avatars/new.png", ContentFile(b"image"))
+
+        assert open(default_storage.local_path(name), "rb").read() == b"image"
+        assert default_storage.local_path("avatars/other.png") is None
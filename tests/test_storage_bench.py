@@ -0,0 +1,78 @@
+"""
+Tests for the storage_bench management command.
+"""
+
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from Users.management.commands.storage_bench import parse_size
+
+
+def bench(*args):
+    out = io.StringIO()
+    call_command(
+        "storage_bench",
+        "--sizes",
+        "1KB,4KB",
+        "--concurrency",
+        "1,2",
+        "--objects",
+        "3",
+        *args,
+        stdout=out,
+    )
+    return out.getvalue()
+
+
+@pytest.mark.unit
+class TestParseSize:
+    """Test cases for object size arguments."""
+
+    def test_units(self):
+        """Test sizes accept bytes, KB and MB."""
+        assert parse_size("512") == 512
+        assert parse_size("64KB") == 64 * 1024
+        assert parse_size("1.5mb") == 1536 * 1024
+
+
+@pytest.mark.integration
+class TestStorageBench:
+    """Test cases for benchmarking the configured default storage."""
+
+    def test_filesystem_report(self, settings, tmp_path):
+        """Test every size and concurrency level is measured and the objects removed."""
+        settings.MEDIA_ROOT = str(tmp_path)
+
+        output = bench("--output", str(tmp_path / "report.json"))
+
+        report = json.loads((tmp_path / "report.json").read_text())
+        assert report["backend"] == "django.core.files.storage.filesystem.FileSystemStorage"
+        assert [(r["size"], r["concurrency"]) for r in report["results"]] == [
+            (1024, 1),
+            (1024, 2),
+            (4096, 1),
+            (4096, 2),
+        ]
+        for result in report["results"]:
+            assert set(result["operations"]) == {"upload", "presign", "download", "delete"}
+            assert result["operations"]["download"]["ops"] == 3
+            assert result["operations"]["upload"]["mb_per_second"] > 0
+        assert "download" in output
+        assert not any(path.is_file() for path in (tmp_path / "storage-bench").rglob("*"))
+
+    def test_s3_report_on_stdout(self, s3_bucket):
+        """Test the S3 backend is measured and ``--output -`` prints only the JSON."""
+        report = json.loads(bench("--output", "-"))
+
+        assert report["backend"] == "utils.b2_storage.B2Storage"
+        assert report["disk_cache"] is False
+        assert sum(r["operations"]["upload"]["errors"] for r in report["results"]) == 0
+        assert list(s3_bucket.objects.all()) == []
+
+    def test_invalid_arguments(self):
+        """Test malformed sizes are rejected."""
+        with pytest.raises(CommandError):
+            call_command("storage_bench", "--sizes", "big")
@@ -0,0 +1,109 @@
+"""
+Tests for the token-bucket throttles.
+"""
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from utils.throttling import ListUserThrottle
+
+pytestmark = pytest.mark.django_db
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def rates(settings):
+    """Small rates so buckets empty after a few requests."""
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            "list": "3/min",
+            "list_ip": "100/min",
+            "login_ip": "100/min",
+            "login_username": "2/min",
+            "register_ip": "100/min",
+        },
+    }
+    return settings
+
+
+@pytest.mark.unit
+class TestTokenBucketThrottle:
+    """Test cases for the token-bucket algorithm."""
+
+    def make_request(self, user):
+        request = APIRequestFactory().get("/api/tasks/")
+        request.user = user
+        return request
+
+    def test_burst_then_refill(self, rates, user_factory, monkeypatch):
+        """Test a full bucket allows a burst, then refills at the sustained rate."""
+        clock = Clock()
+        monkeypatch.setattr(ListUserThrottle, "timer", clock)
+        request = self.make_request(user_factory())
+
+        allowed = [ListUserThrottle().allow_request(request, None) for _ in range(4)]
+        assert allowed == [True, True, True, False]
+
+        throttle = ListUserThrottle()
+        assert throttle.allow_request(request, None) is False
+        assert throttle.wait() == pytest.approx(20.0)
+
+        clock.now += 20  # 3/min refills one token every 20 seconds
+        assert ListUserThrottle().allow_request(request, None) is True
+        assert ListUserThrottle().allow_request(request, None) is False
+
+    def test_buckets_are_per_user(self, rates, user_factory):
+        """Test one user emptying its bucket does not throttle another."""
+        first, second = self.make_request(user_factory()), self.make_request(user_factory())
+        for _ in range(3):
+            ListUserThrottle().allow_request(first, None)
+
+        assert ListUserThrottle().allow_request(first, None) is False
+        assert ListUserThrottle().allow_request(second, None) is True
+
+    def test_disabled_throttling_allows_everything(self, rates, user_factory):
+        """Test THROTTLE_ENABLED=False turns every bucket off."""
+        rates.THROTTLE_ENABLED = False
+        request = self.make_request(user_factory())
+
+        assert all(ListUserThrottle().allow_request(request, None) for _ in range(10))
+
+
+@pytest.mark.integration
+class TestThrottledEndpoints:
+    """Test cases for throttles on the API routes."""
+
+    def test_list_endpoint_returns_429_with_retry_after(self, rates, authenticated_client):
+        """Test a user over the list rate gets 429 and a Retry-After header."""
+        for _ in range(3):
+            assert authenticated_client.get(reverse("task_list")).status_code == 200
+
+        response = authenticated_client.get(reverse("task_list"))
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) > 0
+
+    def test_login_attempts_are_limited_per_username(self, rates, api_client, user_factory):
+        """Test repeated logins for one username are throttled, others are not."""
+        user_factory(username="victim", password="testpass123")
+        url = reverse("token_obtain_pair")
+        for _ in range(2):
+            api_client.post(url, {"username": "victim", "password": "wrong"}, format="json")
+
+        blocked = api_client.post(
+            url, {"username": "Victim", "password": "testpass123"}, format="json"
+        )
+        other = api_client.post(url, {"username": "someone", "password": "x"}, format="json")
+
+        assert blocked.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert other.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,160 @@
+"""
+Tests for the avatar thumbnail pipeline (utils.thumbnails, utils.background).
+"""
+
+import io
+import threading
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image, JpegImagePlugin
+
+from Users.services import update_user_service
+from utils.background import run_in_background
+from utils.thumbnails import FORMATS, SIZES, render_thumbnails, thumbnail_name
+
+pytestmark = pytest.mark.django_db
+
+
+def encode(size, mode="RGB", format="PNG", color=(200, 40, 40)):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.BACKGROUND_TASKS_EAGER = True
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestRenderThumbnails:
+    """Test cases for render_thumbnails."""
+
+    def test_renders_every_size_and_format(self):
+        """Test each size is rendered as a square WebP and JPEG."""
+        rendered = render_thumbnails(encode((900, 600)))
+
+        assert set(rendered) == {(size, ext) for size in SIZES for ext in FORMATS}
+        for (size, extension), data in rendered.items():
+            with Image.open(io.BytesIO(data)) as image:
+                assert image.size == (size, size)
+                assert image.format == FORMATS[extension][0]
+
+    def test_large_jpeg_is_decoded_at_reduced_scale(self, monkeypatch):
+        """Test JPEGs take the draft() path instead of decoding every pixel."""
+        decoded_sizes = []
+        original = JpegImagePlugin.JpegImageFile.draft
+
+        def draft(self, mode, size):
+            result = original(self, mode, size)
+            decoded_sizes.append(self.size)
+            return result
+
+        monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", draft)
+
+        rendered = render_thumbnails(encode((4000, 3000), format="JPEG"))
+
+        # 1/8 scale is the smallest that still covers 256 x 256
+        assert decoded_sizes == [(500, 375)]
+        assert len(rendered) == len(SIZES) * len(FORMATS)
+
+    def test_transparency_kept_in_webp_and_flattened_in_jpeg(self):
+        """Test alpha survives in WebP while the JPEG fallback is opaque."""
+        rendered = render_thumbnails(encode((300, 300), "RGBA", color=(0, 0, 0, 0)))
+
+        with Image.open(io.BytesIO(rendered[64, "webp"])) as webp:
+            assert webp.mode == "RGBA"
+        with Image.open(io.BytesIO(rendered[64, "jpg"])) as jpeg:
+            assert jpeg.getpixel((32, 32)) == pytest.approx((255, 255, 255), abs=2)
+
+    def test_thumbnail_name(self):
+        """Test variants are stored next to the original under thumbs/."""
+        assert thumbnail_name("avatars/me.png", 64, "webp") == "avatars/thumbs/me_64.webp"
+
+
+@pytest.mark.integration
+class TestAvatarThumbnails:
+    """Test cases for thumbnail generation on avatar upload."""
+
+    def test_update_generates_thumbnails_after_commit(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test a new avatar gets every variant stored and recorded on the user."""
+        user = user_factory()
+        upload = SimpleUploadedFile("me.png", encode((800, 800)), content_type="image/png")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            update_user_service(user.id, avatar=upload)
+
+        user.refresh_from_db()
+        assert set(user.avatar_thumbnails) == {str(size) for size in SIZES}
+        for variants in user.avatar_thumbnails.values():
+            assert set(variants) == set(FORMATS)
+            assert all((media / name).exists() for name in variants.values())
+
+    def test_replaced_avatar_discards_stale_thumbnails(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test thumbnails finishing after the avatar changed are not attached."""
+        user = user_factory()
+        first = SimpleUploadedFile("first.png", encode((100, 100)), content_type="image/png")
+        second = SimpleUploadedFile(
+            "second.png", encode((100, 100), color="navy"), content_type="image/png"
+        )
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            update_user_service(user.id, avatar=first)
+        with django_capture_on_commit_callbacks(execute=True):
+            update_user_service(user.id, avatar=second)
+        callbacks[0]()
+
+        user.refresh_from_db()
+        stem = user.avatar.name.removeprefix("avatars/").rsplit(".", 1)[0]
+        assert user.avatar_thumbnails["64"]["webp"] == f"avatars/thumbs/{stem}_64.webp"
+
+    def test_identical_avatar_reuses_thumbnails(
+        self, media, user_factory, django_capture_on_commit_callbacks
+    ):
+        """Test a second user uploading the same image gets the stored thumbnails."""
+        first, second = user_factory(), user_factory()
+        with django_capture_on_commit_callbacks(execute=True):
+            update_user_service(first.id, avatar=SimpleUploadedFile("a.png", encode((80, 80))))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            update_user_service(second.id, avatar=SimpleUploadedFile("b.png", encode((80, 80))))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert second.avatar.name == first.avatar.name
+        assert second.avatar_thumbnails == first.avatar_thumbnails
+        assert len(list((media / "avatars" / "thumbs").iterdir())) == len(SIZES) * len(FORMATS)
+
+    def test_serializer_exposes_variant_urls(self, media, authenticated_client, user_factory):
+        """Test the user endpoints return a URL per size and format."""
+        user = user_factory(avatar_thumbnails={"32": {"webp": "avatars/thumbs/a_32.webp"}})
+
+        response = authenticated_client.get(reverse("user-detail", args=[user.id]))
+
+        assert response.data["data"]["avatar_thumbnails"] == {
+            "32": {"webp": "/media/avatars/thumbs/a_32.webp"}
+        }
+
+    def test_process_pool_runs_off_the_calling_thread(self, settings):
+        """Test rendering happens in a worker process and reports back here."""
+        settings.BACKGROUND_TASKS_EAGER = False
+        done = threading.Event()
+        results = []
+
+        run_in_background(
+            render_thumbnails,
+            encode((120, 80)),
+            (32,),
+            on_done=lambda result: results.append(result) or done.set(),
+        )
+
+        assert done.wait(timeout=60)
+        assert set(results[0]) == {(32, "webp"), (32, "jpg")}
@@ -0,0 +1,88 @@
+from botocore.exceptions import ClientError
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+from utils.storage import DiskCacheMixin, SignedURLCacheMixin
+
+
+class DirectUploadMixin:
+    """
+    ``S3Boto3Storage`` mixin for uploads that go from the client straight to
+    the bucket, never through a web worker.
+
+    ``presigned_put`` authorises one PUT of exactly ``size`` bytes of
+    ``content_type`` (both are signed headers, so the bucket rejects anything
+    else). Backblaze B2 does not support browser POST policies, so a
+    presigned PUT is the form that works on every S3-compatible backend.
+    ``head`` and ``read_prefix`` let the upload be checked afterwards without
+    downloading it.
+    """
+
+    def presigned_put(self, name: str, content_type: str, size: int, expire: int) -> str:
+        return self.connection.meta.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": self._normalize_name(clean_name(name)),
+                "ContentType": content_type,
+                "ContentLength": size,
+            },
+            ExpiresIn=expire,
+            HttpMethod="PUT",
+        )
+
+    def head(self, name: str) -> dict:
+        """Return the ``size`` and ``content_type`` of a stored object."""
+        try:
+            response = self.connection.meta.client.head_object(
+                Bucket=self.bucket_name, Key=self._normalize_name(clean_name(name))
+            )
+        except ClientError as err:
+            if err.response["ResponseMetadata"]["HTTPStatusCode"] == 404:
+                raise FileNotFoundError(f"File does not exist: {name}")
+            raise
+        return {"size": response["ContentLength"], "content_type": response.get("ContentType")}
+
+    def read_prefix(self, name: str, length: int) -> bytes:
+        """Return the first ``length`` bytes of a stored object (one ranged GET)."""
+        response = self.connection.meta.client.get_object(
+            Bucket=self.bucket_name,
+            Key=self._normalize_name(clean_name(name)),
+            Range=f"bytes=0-{length - 1}",
+        )
+        return response["Body"].read()
+
+
+class BulkDeleteMixin:
+    """``S3Boto3Storage`` mixin deleting many objects per request (DeleteObjects)."""
+
+    # The most keys S3 accepts in one DeleteObjects call
+    delete_batch_size = 1000
+
+    def delete_many(self, names: list[str]) -> list[str]:
+        """Delete ``names``; return those the bucket failed to delete."""
+        client = self.connection.meta.client
+        keys = {self._normalize_name(clean_name(name)): name for name in names}
+        failed = []
+        batch = list(keys)
+        for start in range(0, len(batch), self.delete_batch_size):
+            response = client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={
+                    "Objects": [
+                        {"Key": key} for key in batch[start : start + self.delete_batch_size]
+                    ],
+                    "Quiet": True,
+                },
+            )
+            failed.extend(keys[error["Key"]] for error in response.get("Errors", []))
+        return failed
+
+
+class B2Storage(
+    SignedURLCacheMixin, DiskCacheMixin, DirectUploadMixin, BulkDeleteMixin, S3Boto3Storage
+):
+    """
+    ``S3Boto3Storage`` for the private B2 bucket, handing out cached presigned
+    URLs and reading files through a local disk cache.
+    """
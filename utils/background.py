@@ -0,0 +1,80 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    The process pool of the current process, created on first use.
+
+    Created lazily (and again after a fork) so that each gunicorn worker owns
+    its pool instead of inheriting the master's. Workers are spawned, not
+    forked: a forked child of a threaded worker could inherit locks held by
+    other threads.
+    """
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.BACKGROUND_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def run_in_background(
+    func: Callable, *args, on_done: Optional[Callable] = None
+) -> Optional[Future]:
+    """
+    Run the CPU-bound ``func(*args)`` in the process pool, off the request thread.
+
+    ``func`` and its arguments must be picklable and ``func`` must not touch
+    Django (the pool's processes never call ``django.setup()``). Its result
+    is passed to ``on_done``, which runs back in this process (on the pool's
+    management thread), so that is where storage and database writes go.
+    Failures are logged, never raised to the caller.
+
+    With ``BACKGROUND_TASKS_EAGER`` (tests, one-off commands) both run inline
+    and ``None`` is returned.
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        try:
+            result = func(*args)
+            if on_done is not None:
+                on_done(result)
+        except Exception:
+            logger.exception("Background task failed", extra={"task": func.__name__})
+        return None
+
+    submitter = threading.current_thread()
+
+    def callback(future: Future) -> None:
+        try:
+            result = future.result()
+            if on_done is not None:
+                on_done(result)
+        except Exception:
+            logger.exception("Background task failed", extra={"task": func.__name__})
+        finally:
+            # The pool's thread is not a request, so nothing else closes the
+            # connections on_done opened (a future that finished before
+            # add_done_callback runs its callback in the submitting thread).
+            if threading.current_thread() is not submitter:
+                connections.close_all()
+
+    future = get_executor().submit(func, *args)
+    future.add_done_callback(callback)
+    return future
@@ -0,0 +1,35 @@
+from importlib.util import find_spec
+
+from django.core import checks
+from django.db import models
+
+
+class ImageField(models.ImageField):
+    """
+    ``ImageField`` whose system check does not import Pillow.
+
+    Django's check imports ``PIL.Image`` to see whether Pillow is installed,
+    which adds ~15 ms to every management command. Finding the module spec
+    answers the same question without importing it; Pillow is then loaded
+    only when an image is actually validated or measured.
+    """
+
+    def _check_image_library_installed(self):
+        if find_spec("PIL") is not None:
+            return []
+        return [
+            checks.Error(
+                "Cannot use ImageField because Pillow is not installed.",
+                hint=(
+                    "Get Pillow at https://pypi.org/project/Pillow/ "
+                    'or run command "python -m pip install Pillow".'
+                ),
+                obj=self,
+                id="fields.E210",
+            )
+        ]
+
+    def deconstruct(self):
+        # Migrations see a plain ImageField, so swapping classes needs none
+        name, path, args, kwargs = super().deconstruct()
+        return name, "django.db.models.ImageField", args, kwargs
@@ -0,0 +1,157 @@
+"""
+Lexicographic fractional indexing: string keys that sort in list order.
+
+A key can always be generated between two others, so moving an item
+rewrites only that item's key. Keys are an "integer part" (a head character
+giving its length, then digits) followed by an optional fraction; appending
+increments the integer part, which keeps keys short however many items are
+added at the ends, while repeated inserts at one spot grow the fraction.
+
+Only digits and lowercase letters are used, so database collations order
+keys the same way Python does.
+"""
+
+from typing import Optional
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+# Heads "i".."z" start positive integers of 1..18 digits, "h".."0" negative
+# ones of 1..18 digits (in decreasing order, so smaller integers sort first).
+FIRST_POSITIVE_HEAD = "i"
+INTEGER_ZERO = FIRST_POSITIVE_HEAD + "0"
+SMALLEST_INTEGER = "0" + "0" * 18
+
+
+def _integer_length(head: str) -> int:
+    index = DIGITS.index(head)
+    first_positive = DIGITS.index(FIRST_POSITIVE_HEAD)
+    if index >= first_positive:
+        return index - first_positive + 2
+    return first_positive - index + 1
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"invalid order key: {key!r}")
+    return key[:length]
+
+
+def _increment_integer(integer: str) -> Optional[str]:
+    """The next integer part, or None past the largest one."""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < BASE:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    # Every digit carried: move to the next length
+    if head == "h":
+        return INTEGER_ZERO
+    if head == "z":
+        return None
+    head = DIGITS[DIGITS.index(head) + 1]
+    if head > FIRST_POSITIVE_HEAD:
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> Optional[str]:
+    """The previous integer part, or None before the smallest one."""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == FIRST_POSITIVE_HEAD:
+        return "h" + DIGITS[-1]
+    if head == "0":
+        return None
+    head = DIGITS[DIGITS.index(head) - 1]
+    if head < "h":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """
+    A fraction strictly between fractions ``a`` and ``b`` (None: 1).
+
+    Neither may end in a zero digit; neither does the result, so there is
+    always room below it.
+    """
+    if b is not None:
+        # Skip the common prefix (a is padded with zeros)
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # Adjacent first digits: b's first digit alone is already above a ...
+    if b is not None and len(b) > 1:
+        return b[:1]
+    # ... or keep a's and find room after it
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    A key sorting after ``a`` and before ``b``.
+
+    ``None`` stands for the start (``a``) or the end (``b``) of the list, so
+    ``key_between(last, None)`` appends and ``key_between(None, None)`` is
+    the first key of an empty list. Raises ``ValueError`` unless ``a < b``.
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} does not sort before {b!r}")
+    if a is None:
+        if b is None:
+            return INTEGER_ZERO
+        integer = _integer_part(b)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint("", b[len(integer):])
+        if integer < b:
+            return integer
+        previous = _decrement_integer(integer)
+        if previous is None:
+            raise ValueError("cannot generate a key before the smallest key")
+        return previous
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        following = _increment_integer(integer_a)
+        return following if following is not None else integer_a + _midpoint(fraction_a, None)
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    following = _increment_integer(integer_a)
+    if following is not None and following < b:
+        return following
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def integer_key(index: int) -> str:
+    """
+    The key ``index`` appends into an empty list end up with.
+
+    ``[integer_key(i) for i in range(n)]`` are the shortest evenly spaced
+    keys for ``n`` items, which is what a rebalance writes.
+    """
+    # Appending walks "i0".."iz", then "j00".."jzz", and so on
+    length = 1
+    while index >= BASE**length:
+        index -= BASE**length
+        length += 1
+    head = DIGITS[DIGITS.index(FIRST_POSITIVE_HEAD) + length - 1]
+    return head + "".join(DIGITS[index // BASE**p % BASE] for p in reversed(range(length)))
@@ -0,0 +1,137 @@
+import functools
+import hashlib
+import json
+import logging
+import secrets
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utils import metrics as prometheus
+from utils.responses import error_response
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Delete a key only while it still holds the caller's token
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _fingerprint(request: Request) -> str:
+    body = json.dumps(request.data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def idempotent(view: Callable) -> Callable:
+    """
+    Make a create endpoint safe to retry with an ``Idempotency-Key`` header.
+
+    The first successful (2xx) response for a key is stored per user in the
+    ``IDEMPOTENCY_CACHE`` cache for ``IDEMPOTENCY_TTL`` seconds. Retries with
+    the same key and body get that response back, marked with an
+    ``Idempotent-Replayed: true`` header, without running the view again.
+    Failed requests are not stored, so they can be retried with the same key.
+
+    While a request holds a key (an atomic ``cache.add`` lock), a concurrent
+    duplicate gets ``409 Conflict``; reusing a key for a different body gets
+    ``422``. Requests without the header behave as before. The lock holds a
+    random token and is only released by its holder: a request that outlives
+    ``IDEMPOTENCY_LOCK_TIMEOUT`` must not release the lock a retry took
+    after it expired.
+
+    Apply it directly above the view function, below ``@api_view`` and
+    ``@permission_classes``, so it runs after authentication.
+    """
+
+    @functools.wraps(view)
+    def wrapper(request: Request, *args, **kwargs) -> Response:
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+            return error_response(
+                message=f"{HEADER} must be 1 to {MAX_KEY_LENGTH} printable characters",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache = caches[settings.IDEMPOTENCY_CACHE]
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        cache_key = f"idempotency:{request.user.pk}:{digest}"
+        fingerprint = _fingerprint(request)
+
+        stored = cache.get(cache_key)
+        prometheus.record_cache_access("idempotency", stored is not None)
+        if stored is not None:
+            return _replay(stored, fingerprint, request)
+
+        lock_key = f"{cache_key}:lock"
+        # An int, which the Redis backend stores as is (not pickled), so the
+        # release script can compare it
+        token = secrets.randbits(63)
+        if not cache.add(lock_key, token, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            logger.warning(
+                "Concurrent request with the same idempotency key",
+                extra={"user_id": request.user.pk, "path": request.path},
+            )
+            return error_response(
+                message="A request with this Idempotency-Key is already being processed",
+                status_code=status.HTTP_409_CONFLICT,
+            )
+        try:
+            # The previous holder may have stored its response meanwhile
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint, request)
+            response = view(request, *args, **kwargs)
+            if status.is_success(response.status_code):
+                cache.set(
+                    cache_key,
+                    (fingerprint, response.status_code, response.data),
+                    settings.IDEMPOTENCY_TTL,
+                )
+            return response
+        finally:
+            _release_lock(cache, lock_key, token)
+
+    return wrapper
+
+
+def _release_lock(cache, lock_key: str, token: int) -> None:
+    """Delete ``lock_key`` if it still holds ``token``."""
+    if isinstance(cache, RedisCache):
+        # Compare-and-delete in one step on the server
+        client = cache._cache.get_client(write=True)
+        client.eval(RELEASE_SCRIPT, 1, cache.make_and_validate_key(lock_key), token)
+        return
+    # Other backends have no compare-and-delete; the gap between get and
+    # delete is much shorter than the lock timeout that opens the race.
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _replay(stored: tuple, fingerprint: str, request: Request) -> Response:
+    stored_fingerprint, status_code, data = stored
+    if stored_fingerprint != fingerprint:
+        return error_response(
+            message=f"{HEADER} was already used for a different request",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    logger.info(
+        "Idempotent request replayed",
+        extra={"user_id": request.user.pk, "path": request.path},
+    )
+    response = Response(data, status=status_code)
+    response[REPLAYED_HEADER] = "true"
+    return response
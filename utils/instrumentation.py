@@ -0,0 +1,111 @@
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+from rest_framework.serializers import ListSerializer
+
+
+@dataclass
+class RequestMetrics:
+    """
+    Timings collected while a single request is being handled.
+
+    Attributes:
+        query_count: Number of SQL statements executed
+        timings: Seconds spent per phase (``db``, ``serializer``, ``render``, ``total``)
+    """
+
+    query_count: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+
+_current_metrics: contextvars.ContextVar[Optional[RequestMetrics]] = (
+    contextvars.ContextVar("request_metrics", default=None)
+)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Return the metrics of the request being handled, if any."""
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_metrics() -> Iterator[RequestMetrics]:
+    """Bind a fresh RequestMetrics to the current context for the duration of the block."""
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def track(phase: str) -> Iterator[None]:
+    """
+    Add the time spent inside the block to ``phase`` of the current request.
+
+    Does nothing when no request metrics are being collected.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(phase, perf_counter() - start)
+
+
+def _is_top_level(serializer) -> bool:
+    parent = serializer.parent
+    return parent is None or (
+        isinstance(parent, ListSerializer) and parent.parent is None
+    )
+
+
+class InstrumentedSerializerMixin:
+    """
+    Record the time spent serializing output as the ``serializer`` phase.
+
+    Only the outermost serializer is timed so nested serializers are not
+    counted twice. Queries triggered while serializing (lazy relations) are
+    included in this phase as well as in ``db``.
+    """
+
+    def to_representation(self, instance):
+        if _current_metrics.get() is None or not _is_top_level(self):
+            return super().to_representation(instance)
+        with track("serializer"):
+            return super().to_representation(instance)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declare the most SQL queries a view may run, whatever the amount of data.
+
+    Apply it above ``@api_view`` so the budget is set on the view Django
+    resolves. PerformanceMiddleware logs requests over budget to
+    ``pmtool.queries``, and tests/test_query_budgets.py checks each endpoint
+    against its budget at two data sizes.
+
+    Args:
+        max_queries: Maximum number of queries per request, authentication included
+    """
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+def get_query_budget(view) -> Optional[int]:
+    """Return the budget declared with ``query_budget`` on ``view``, if any."""
+    return getattr(view, "query_budget", None)
@@ -0,0 +1,339 @@
+import atexit
+import itertools
+import logging
+import logging.config
+import pickle
+import queue
+import socketserver
+import struct
+import threading
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener, SocketHandler
+from typing import Iterable, Optional
+
+from django.utils.module_loading import import_string
+
+from utils.metrics import LOG_RECORDS_DROPPED
+
+# Attributes every LogRecord has; anything else was passed through ``extra``,
+# except SamplingFilter's marker and decision (its rate, sample_every, is kept).
+_RESERVED_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "sampled", "_sample_keep"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter that appends the record's ``extra`` fields as ``key=value`` pairs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        fields = {
+            key: value
+            for key, value in record.__dict__.items()
+            if key not in _RESERVED_ATTRS and not key.startswith("_")
+        }
+        if not fields:
+            return message
+        pairs = " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return f"{message} | {pairs}"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in ``every`` records logged with ``extra={"sampled": True}``.
+
+    Meant for high-volume INFO messages such as "Tasks retrieved successfully".
+    Each message is sampled independently, and kept records carry a
+    ``sample_every`` field so counts can be scaled back up. Records without
+    the marker always pass.
+
+    Attach it to handlers: logger filters do not see records propagated from
+    child loggers such as ``Tasks.services``. The decision is stored on the
+    record, so every handler sharing the filter keeps the same records.
+    """
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = max(1, int(every))
+        self._counters: defaultdict[str, itertools.count] = defaultdict(itertools.count)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or not getattr(record, "sampled", False):
+            return True
+        keep = getattr(record, "_sample_keep", None)
+        if keep is None:
+            keep = record._sample_keep = not next(self._counters[record.msg]) % self.every
+            if keep:
+                record.sample_every = self.every
+        return keep
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the thread that logs.
+
+    Records are queued as they are: unlike ``QueueHandler.prepare`` (meant
+    for queues that pickle), nothing is formatted here, so merging the
+    message with its arguments and rendering tracebacks happen on the
+    listener thread. Records that do not fit in the bounded queue are
+    dropped and counted in ``dropped`` and in the
+    ``pmtool_log_records_dropped_total`` metric.
+    """
+
+    _drop_lock = threading.Lock()
+
+    def __init__(self, log_queue: queue.Queue, route: tuple[str, ...]):
+        super().__init__(log_queue)
+        self.route = route
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Each logger has its own record: tagging it needs no copy
+        record._queue_route = self.route
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+            LOG_RECORDS_DROPPED.labels(record.name).inc()
+
+
+class RoutingQueueListener(QueueListener):
+    """Single writer thread that hands each record to the handlers of its route."""
+
+    def __init__(self, log_queue: queue.Queue, routes: dict):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.routes = routes
+
+    def handle(self, record: logging.LogRecord) -> None:
+        record = self.prepare(record)
+        for handler in self.routes.get(record._queue_route, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room instead of failing on a full queue at shutdown.
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """
+    Moves the handlers of a set of loggers behind one bounded queue.
+
+    Each distinct handler list becomes a route: the loggers only get a
+    BoundedQueueHandler tagging records with their route, and a single
+    RoutingQueueListener thread formats and writes them. Threads do not
+    survive ``fork()``, so a process forked after ``install`` (a preloaded
+    gunicorn worker) must call ``restart_after_fork``; gunicorn.conf.py does
+    so from its post_fork hook, which leaves other forks (subprocesses,
+    multiprocessing) without a listener thread they never use.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.routes: dict[tuple[str, ...], list[logging.Handler]] = {}
+        self.queue_handlers: dict[tuple[str, ...], BoundedQueueHandler] = {}
+        self.listener: Optional[RoutingQueueListener] = None
+
+    def install(
+        self,
+        loggers: Iterable[logging.Logger],
+        writer: Optional[logging.Handler] = None,
+    ) -> None:
+        """
+        Replace the handlers of ``loggers`` with queue handlers.
+
+        Args:
+            loggers: Loggers whose handlers should run on the listener thread
+            writer: Optional handler (a SocketHandler to the log writer) that
+                receives records for file handlers instead of the files themselves
+        """
+        for logger in loggers:
+            if not logger.handlers:
+                continue
+            route = tuple(handler.name or repr(handler) for handler in logger.handlers)
+            if route not in self.queue_handlers:
+                self.routes[route] = _forward_files(logger.handlers, writer)
+                self.queue_handlers[route] = BoundedQueueHandler(self.queue, route)
+            logger.handlers = [self.queue_handlers[route]]
+        self.start()
+
+    def start(self) -> None:
+        self.listener = RoutingQueueListener(self.queue, self.routes)
+        self.listener.start()
+
+    def restart_after_fork(self) -> None:
+        """Start a listener in a forked child, with a fresh queue (its lock may be held)."""
+        self.queue = queue.Queue(self.maxsize)
+        for queue_handler in self.queue_handlers.values():
+            queue_handler.queue = self.queue
+        self.start()
+
+    def stop(self) -> None:
+        """Write out every queued record and stop the listener thread."""
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    @property
+    def dropped(self) -> int:
+        return sum(handler.dropped for handler in self.queue_handlers.values())
+
+
+class _WriterForwarder(logging.Handler):
+    """Sends records meant for file handlers to the log writer process."""
+
+    def __init__(self, writer: logging.Handler, file_handlers: list[logging.Handler]):
+        super().__init__(level=min(handler.level for handler in file_handlers))
+        self.writer = writer
+        self.file_handlers = file_handlers
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Filters (sampling) run here; the writer only checks handler levels.
+        record._log_files = tuple(
+            handler.name for handler in self.file_handlers if handler.filter(record)
+        )
+        if record._log_files:
+            self.writer.handle(record)
+
+
+def _forward_files(
+    handlers: list[logging.Handler], writer: Optional[logging.Handler]
+) -> list[logging.Handler]:
+    if writer is None:
+        return list(handlers)
+    file_handlers = [h for h in handlers if isinstance(h, logging.FileHandler)]
+    if not file_handlers:
+        return list(handlers)
+    for handler in file_handlers:
+        handler.close()
+    local = [h for h in handlers if not isinstance(h, logging.FileHandler)]
+    return local + [_WriterForwarder(writer, file_handlers)]
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
+def configure_logging(logging_settings: dict) -> None:
+    """
+    LOGGING_CONFIG callable: apply LOGGING, then move its handlers off the request thread.
+
+    With LOG_QUEUE_ENABLED every handler runs on one listener thread fed by a
+    queue of LOG_QUEUE_MAXSIZE records. With LOG_WRITER_ADDRESS set, records
+    for file handlers are sent to the log writer (see ``start_log_writer``) so
+    a single process owns and rotates the log files.
+    """
+    from django.conf import settings
+
+    global _pipeline
+    logging.config.dictConfig(logging_settings)
+    if not settings.LOG_QUEUE_ENABLED:
+        return
+    if _pipeline is not None:
+        _pipeline.stop()
+
+    writer = None
+    if settings.LOG_WRITER_ADDRESS:
+        host, port = settings.LOG_WRITER_ADDRESS.rsplit(":", 1)
+        writer = SocketHandler(host, int(port))
+    # Only the loggers LOGGING configures: the writer builds just the handlers
+    # named in LOGGING, and other loggers (gunicorn's) keep their own handlers.
+    loggers = [logging.getLogger()] + [
+        logging.getLogger(name) for name in logging_settings.get("loggers", {})
+    ]
+    _pipeline = LogPipeline(settings.LOG_QUEUE_MAXSIZE)
+    _pipeline.install(loggers, writer)
+
+
+def get_log_pipeline() -> Optional[LogPipeline]:
+    """Return the pipeline installed by configure_logging, if any."""
+    return _pipeline
+
+
+def restart_log_pipeline() -> None:
+    """Restart the pipeline's listener in a forked gunicorn worker (post_fork hook)."""
+    if _pipeline is not None:
+        _pipeline.restart_after_fork()
+
+
+def _flush_at_exit() -> None:
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+atexit.register(_flush_at_exit)
+
+
+class _LogRecordStreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Records arrive as produced by logging.handlers.SocketHandler:
+        # a 4-byte big-endian length followed by a pickled record dict.
+        while True:
+            header = self.rfile.read(4)
+            if len(header) < 4:
+                break
+            (length,) = struct.unpack(">L", header)
+            record = logging.makeLogRecord(pickle.loads(self.rfile.read(length)))
+            self.server.dispatch(record)
+
+
+class LogWriterServer(socketserver.ThreadingTCPServer):
+    """Receives records from workers and writes them to the configured log files."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], handlers: dict[str, logging.Handler]):
+        super().__init__(address, _LogRecordStreamHandler)
+        self.handlers = handlers
+
+    def dispatch(self, record: logging.LogRecord) -> None:
+        for name in getattr(record, "_log_files", ()):
+            handler = self.handlers.get(name)
+            if handler is not None and record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def start_log_writer(address: tuple[str, int], logging_settings: dict) -> LogWriterServer:
+    """
+    Start the single log writer on a background thread.
+
+    Only the file handlers of ``logging_settings`` are built, and the
+    process's own logging configuration is left untouched (this runs inside
+    the gunicorn master). Bind to loopback only: records are unpickled.
+    """
+    handlers = {
+        name: _build_handler(logging_settings, name)
+        for name, spec in logging_settings["handlers"].items()
+        if issubclass(import_string(spec["class"]), logging.FileHandler)
+    }
+    server = LogWriterServer(address, handlers)
+    threading.Thread(target=server.serve_forever, name="log-writer", daemon=True).start()
+    return server
+
+
+def _build_handler(logging_settings: dict, name: str) -> logging.Handler:
+    spec = dict(logging_settings["handlers"][name])
+    handler_class = import_string(spec.pop("class"))
+    level = spec.pop("level", logging.NOTSET)
+    formatter = spec.pop("formatter", None)
+    spec.pop("filters", None)
+    handler = handler_class(**spec)
+    handler.setLevel(level)
+    handler.name = name
+    if formatter:
+        handler.setFormatter(_build_formatter(logging_settings["formatters"][formatter]))
+    return handler
+
+
+def _build_formatter(spec: dict) -> logging.Formatter:
+    spec = dict(spec)
+    factory = spec.pop("()", logging.Formatter)
+    if isinstance(factory, str):
+        factory = import_string(factory)
+    return factory(
+        fmt=spec.get("format"), datefmt=spec.get("datefmt"), style=spec.get("style", "%")
+    )
@@ -0,0 +1,181 @@
+import logging
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+@dataclass
+class TransferItem:
+    name: str  # storage name, e.g. "avatars/me.png"
+    path: str  # local file
+    size: int
+
+
+@dataclass
+class TransferStats:
+    files: int
+    bytes: int
+    uploaded: int = 0
+    uploaded_bytes: int = 0
+    failed: int = 0
+    errors: list[tuple[str, str]] = field(default_factory=list)
+    started: float = field(default_factory=perf_counter)
+
+    @property
+    def done(self) -> int:
+        return self.uploaded + self.failed
+
+    @property
+    def seconds(self) -> float:
+        return perf_counter() - self.started
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.uploaded_bytes / self.seconds if self.seconds else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if not self.uploaded_bytes:
+            return None
+        return (self.bytes - self.uploaded_bytes) / self.bytes_per_second
+
+
+class Checkpoint:
+    """
+    Append-only file of the names already transferred, one per line.
+
+    Every completed upload is flushed immediately, so a run that crashes or
+    is interrupted can be restarted and continues where it stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path) as fh:
+                self.done = {line.rstrip("\n") for line in fh if line.strip()}
+        self._fh = open(path, "a")
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.done
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            self.done.add(name)
+            self._fh.write(name + "\n")
+            self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def object_key(storage, name: str) -> str:
+    """The bucket key ``S3Boto3Storage`` stores ``name`` under."""
+    from storages.utils import clean_name
+
+    return storage._normalize_name(clean_name(name))
+
+
+def list_object_sizes(storage, prefix: str) -> dict[str, int]:
+    """Sizes of every object under ``prefix``, by key: one LIST per 1000 objects."""
+    client = storage.connection.meta.client
+    paginator = client.get_paginator("list_objects_v2")
+    sizes = {}
+    pages = paginator.paginate(Bucket=storage.bucket_name, Prefix=object_key(storage, prefix))
+    for page in pages:
+        for obj in page.get("Contents", []):
+            sizes[obj["Key"]] = obj["Size"]
+    return sizes
+
+
+def delete_files(storage, names: Iterable[str]) -> list[str]:
+    """
+    Delete ``names`` from ``storage``; return the ones that could not be deleted.
+
+    Uses the storage's ``delete_many`` (one request per 1000 objects on S3)
+    when it has one, a ``delete()`` per file otherwise. Missing files count
+    as deleted.
+    """
+    names = list(names)
+    if hasattr(storage, "delete_many"):
+        return storage.delete_many(names)
+    failed = []
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError as e:
+            failed.append(name)
+            logger.error("Media delete failed", extra={"key": name, "error": str(e)})
+    return failed
+
+
+def upload_files(
+    items: Iterable[TransferItem],
+    storage,
+    workers: int = 8,
+    checkpoint: Optional[Checkpoint] = None,
+    multipart_threshold: int = 8 * MB,
+    multipart_chunksize: int = 8 * MB,
+    progress: Optional[Callable[[TransferStats], None]] = None,
+) -> TransferStats:
+    """
+    Upload local files to an ``S3Boto3Storage`` bucket from ``workers`` threads.
+
+    Files are written to their storage key directly with boto3's transfer
+    manager, which switches to a multipart upload (parts sent in parallel)
+    above ``multipart_threshold``. Unlike ``storage.save()``, existing keys are
+    overwritten instead of probed with a HEAD request and renamed; callers
+    filter out what is already there (``list_object_sizes``). Each finished
+    name is added to ``checkpoint``; failures are counted, not raised.
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    items = list(items)
+    stats = TransferStats(files=len(items), bytes=sum(item.size for item in items))
+    config = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=multipart_chunksize,
+        max_concurrency=4,
+    )
+
+    def upload(item: TransferItem) -> None:
+        params = storage.get_object_parameters(item.name)
+        params.setdefault(
+            "ContentType", mimetypes.guess_type(item.name)[0] or "application/octet-stream"
+        )
+        # storage.connection is per thread; boto3 clients are thread-safe
+        storage.connection.meta.client.upload_file(
+            item.path,
+            storage.bucket_name,
+            object_key(storage, item.name),
+            ExtraArgs=params,
+            Config=config,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(upload, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                stats.failed += 1
+                stats.errors.append((item.name, str(e)))
+                logger.error("Media upload failed", extra={"key": item.name, "error": str(e)})
+            else:
+                stats.uploaded += 1
+                stats.uploaded_bytes += item.size
+                if checkpoint is not None:
+                    checkpoint.add(item.name)
+            if progress is not None:
+                progress(stats)
+    return stats
@@ -0,0 +1,97 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Metric values are kept per process. When PROMETHEUS_MULTIPROC_DIR is set
+# (every gunicorn worker must share it) each worker writes its samples to that
+# directory and the /metrics view aggregates them, so any worker can answer.
+# gunicorn.conf.py empties the directory before anything is loaded; creating
+# it here as well means no process fails on a missing one, whoever imports
+# this module first.
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    "pmtool_request_duration_seconds",
+    "Time spent handling a request.",
+    ["url_name", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "pmtool_request_db_queries",
+    "Number of SQL queries executed per request.",
+    ["url_name"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 250),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "pmtool_requests_in_flight",
+    "Requests currently being handled.",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "pmtool_cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss).",
+    ["cache", "result"],
+)
+MEDIA_CACHE_REVALIDATIONS = Counter(
+    "pmtool_media_cache_revalidations_total",
+    "Conditional requests for stale media in the local disk cache, by result.",
+    ["result"],
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    "pmtool_query_budget_exceeded_total",
+    "Requests that ran more SQL queries than their view's query budget.",
+    ["url_name"],
+)
+THROTTLED_REQUESTS = Counter(
+    "pmtool_throttled_requests_total",
+    "Requests rejected with 429 by a throttle, by throttle scope.",
+    ["scope"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "pmtool_log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+    ["logger"],
+)
+
+
+def observe_request(
+    url_name: str, method: str, status: int, seconds: float, queries: int
+) -> None:
+    """Record a finished request."""
+    REQUEST_LATENCY.labels(url_name, method, str(status)).observe(seconds)
+    REQUEST_DB_QUERIES.labels(url_name).observe(queries)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Count a cache lookup; the hit rate is hits / (hits + misses)."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_media_revalidation(changed: bool) -> None:
+    """Count a disk cache revalidation: the remote object changed or was unchanged (304)."""
+    MEDIA_CACHE_REVALIDATIONS.labels("changed" if changed else "unchanged").inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Serialize all metrics in the Prometheus text format.
+
+    Returns:
+        The exposition payload and its content type
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
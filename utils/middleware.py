@@ -0,0 +1,171 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.db import connections
+from django.middleware import clickjacking, csrf
+
+from utils import metrics as prometheus
+from utils.instrumentation import RequestMetrics, collect_metrics, get_query_budget
+
+logger = logging.getLogger("pmtool.performance")
+query_logger = logging.getLogger("pmtool.queries")
+
+
+def get_url_name(request) -> str:
+    """Return the resolved URL name of ``request`` (``<unresolved>`` for 404s)."""
+    match = getattr(request, "resolver_match", None)
+    if match is None or not match.url_name:
+        return "<unresolved>"
+    return match.url_name
+
+
+def format_server_timing(metrics: RequestMetrics) -> str:
+    """Render ``metrics`` as a ``Server-Timing`` header value (durations in ms)."""
+    entries = []
+    for phase, seconds in metrics.timings.items():
+        entry = f"{phase};dur={seconds * 1000:.2f}"
+        if phase == "db":
+            entry += f';desc="{metrics.query_count} queries"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class PerformanceMiddleware:
+    """
+    Measure where each request spends its time.
+
+    Collects the SQL query count and DB time (through ``execute_wrapper``),
+    serializer time (see ``InstrumentedSerializerMixin``), render time and
+    total time. The result is written to the ``pmtool.performance`` logger as
+    structured fields, exported as Prometheus metrics and, when
+    ``SERVER_TIMING_HEADER`` is enabled, returned to the client in a
+    ``Server-Timing`` header. Requests running more queries than their
+    view's ``query_budget`` are logged to ``pmtool.queries``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = perf_counter()
+        prometheus.REQUESTS_IN_FLIGHT.inc()
+        try:
+            with collect_metrics() as metrics, ExitStack() as stack:
+                db_wrapper = _DatabaseTimer(metrics)
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(db_wrapper))
+                request.metrics = metrics
+                response = self.get_response(request)
+        finally:
+            prometheus.REQUESTS_IN_FLIGHT.dec()
+        total = perf_counter() - start
+        metrics.add_time("total", total)
+
+        url_name = get_url_name(request)
+        prometheus.observe_request(
+            url_name, request.method, response.status_code, total, metrics.query_count
+        )
+        logger.info(
+            "%s %s %s",
+            request.method,
+            url_name,
+            response.status_code,
+            extra={
+                "url_name": url_name,
+                "method": request.method,
+                "path": request.get_full_path(),
+                "status": response.status_code,
+                "queries": metrics.query_count,
+                **{f"{phase}_ms": round(s * 1000, 2) for phase, s in metrics.timings.items()},
+            },
+        )
+        match = getattr(request, "resolver_match", None)
+        budget = get_query_budget(match.func) if match is not None else None
+        if budget is not None and metrics.query_count > budget:
+            prometheus.QUERY_BUDGET_EXCEEDED.labels(url_name).inc()
+            query_logger.warning(
+                "Query budget exceeded",
+                extra={
+                    "url_name": url_name,
+                    "path": request.get_full_path(),
+                    "queries": metrics.query_count,
+                    "budget": budget,
+                },
+            )
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = format_server_timing(metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        render_start = perf_counter()
+        metrics = request.metrics
+
+        def record_render_time(rendered_response):
+            metrics.add_time("render", perf_counter() - render_start)
+
+        response.add_post_render_callback(record_render_time)
+        return response
+
+
+class _DatabaseTimer:
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.query_count += 1
+            self.metrics.add_time("db", perf_counter() - start)
+
+
+class SkipForAPIMixin:
+    """
+    Pass API requests straight through a browser-oriented middleware.
+
+    The API authenticates with JWT only: it sets no cookies, reads no session
+    and renders no pages to frame, so sessions, CSRF, messages, cookie
+    authentication and X-Frame-Options only cost time there. Requests
+    outside ``API_PATH_PREFIX`` (the admin) still get the full behaviour.
+    Subclassing the Django middleware keeps the admin system checks happy.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.api_prefix = settings.API_PATH_PREFIX
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.api_prefix):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SkipForAPIMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(SkipForAPIMixin, csrf.CsrfViewMiddleware):
+    # Safe only while no API authentication class reads cookies (see
+    # REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"]).
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if request.path_info.startswith(self.api_prefix):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(SkipForAPIMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SkipForAPIMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(SkipForAPIMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
@@ -0,0 +1,180 @@
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import ListSerializer, Serializer
+
+from utils.middleware import get_url_name
+
+logger = logging.getLogger("pmtool.queries")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+# Frames from installed packages and from this instrumentation package are
+# never reported as the origin of a query.
+_IGNORED_PATHS = (
+    os.sep + "site-packages" + os.sep,
+    os.path.dirname(os.path.abspath(__file__)) + os.sep,
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a SQL statement to its shape so repeated lookups compare equal.
+
+    Literals and placeholders become ``?`` and ``IN`` lists collapse to
+    ``IN (...)`` regardless of their length.
+    """
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = shape.replace("%s", "?")
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class DuplicateQueryError(AssertionError):
+    """Raised when QUERY_INSPECTOR_RAISE is on and a request repeats a query shape."""
+
+
+@dataclass
+class RepeatedQuery:
+    """
+    A query shape executed more often than the inspector threshold.
+
+    Attributes:
+        sql: Normalized SQL shape
+        count: Number of times the shape was executed
+        origin: First project frame that issued it (``path:line in function``)
+        serializer_field: Serializer field being rendered, e.g. ``TaskSerializer.assignees``
+    """
+
+    sql: str
+    count: int
+    origin: Optional[str] = None
+    serializer_field: Optional[str] = None
+
+    def describe(self) -> str:
+        source = self.serializer_field or self.origin or "unknown origin"
+        return f"{self.count}x from {source}: {self.sql}"
+
+
+class QueryInspector:
+    """
+    Execute wrapper that counts query shapes and locates repeated ones.
+
+    The call stack is only inspected the second time a shape is seen, so
+    queries that run once cost no more than a regex normalization.
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.counts: Counter[str] = Counter()
+        self.sources: dict[str, tuple[Optional[str], Optional[str]]] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = normalize_sql(sql)
+        self.counts[shape] += 1
+        if self.counts[shape] == 2:
+            self.sources[shape] = _locate_caller(sys._getframe(1))
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def watch(self) -> Iterator["QueryInspector"]:
+        """Inspect every query executed on any database connection inside the block."""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def repeated_queries(self) -> list[RepeatedQuery]:
+        """Return the shapes executed more than ``threshold`` times, most frequent first."""
+        return [
+            RepeatedQuery(shape, count, *self.sources.get(shape, (None, None)))
+            for shape, count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+
+def _locate_caller(frame) -> tuple[Optional[str], Optional[str]]:
+    origin = None
+    serializer_field = None
+    base_dir = str(settings.BASE_DIR)
+    while frame is not None:
+        code = frame.f_code
+        if serializer_field is None:
+            owner = frame.f_locals.get("self")
+            field = frame.f_locals.get("field")
+            if (
+                isinstance(owner, Serializer)
+                and not isinstance(owner, ListSerializer)
+                and field is not None
+            ):
+                serializer_field = f"{type(owner).__name__}.{field.field_name}"
+        if origin is None and code.co_filename.startswith(base_dir):
+            if not any(path in code.co_filename for path in _IGNORED_PATHS):
+                path = os.path.relpath(code.co_filename, base_dir)
+                origin = f"{path}:{frame.f_lineno} in {code.co_name}"
+        if origin is not None and serializer_field is not None:
+            break
+        frame = frame.f_back
+    return origin, serializer_field
+
+
+class QueryInspectorMiddleware:
+    """
+    Flag N+1 and duplicate queries per request (development and staging).
+
+    Enabled by QUERY_INSPECTOR_ENABLED. Every query shape executed more than
+    QUERY_INSPECTOR_THRESHOLD times is written to the ``pmtool.queries``
+    logger together with the view and the code that issued it. With
+    QUERY_INSPECTOR_RAISE set a DuplicateQueryError is raised instead, which
+    makes the offending test fail.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECTOR_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = QueryInspector(settings.QUERY_INSPECTOR_THRESHOLD)
+        with inspector.watch():
+            response = self.get_response(request)
+
+        repeated = inspector.repeated_queries()
+        if not repeated:
+            return response
+
+        url_name = get_url_name(request)
+        match = getattr(request, "resolver_match", None)
+        view = match._func_path if match else None
+        for query in repeated:
+            logger.warning(
+                "Repeated query in %s: %s",
+                url_name,
+                query.describe(),
+                extra={
+                    "url_name": url_name,
+                    "view": view,
+                    "count": query.count,
+                    "origin": query.origin,
+                    "serializer_field": query.serializer_field,
+                    "sql": query.sql,
+                },
+            )
+        if settings.QUERY_INSPECTOR_RAISE:
+            raise DuplicateQueryError(
+                f"{url_name} repeated {len(repeated)} query shape(s): "
+                + "; ".join(query.describe() for query in repeated)
+            )
+        return response
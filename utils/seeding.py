@@ -0,0 +1,249 @@
+import collections
+import itertools
+import random
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from Projects.models import Project
+from Tasks.models import Task
+from Workspaces.models import Workspace
+from utils.fractional_index import integer_key
+
+# Every seeded user gets this password (hashed once, not once per user)
+SEED_PASSWORD = "perfpass123"
+
+# Share of tasks per status and priority
+STATUS_WEIGHTS = {
+    Task.Status.TODO: 0.45,
+    Task.Status.IN_PROGRESS: 0.2,
+    Task.Status.DONE: 0.35,
+}
+PRIORITY_WEIGHTS = {
+    Task.Priority.LOW: 0.3,
+    Task.Priority.MEDIUM: 0.5,
+    Task.Priority.HIGH: 0.2,
+}
+# Share of tasks with a due date, and the window it falls in (days from today)
+DUE_DATE_SHARE = 0.7
+DUE_DATE_WINDOW = (-60, 120)
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+@dataclass
+class SeedSummary:
+    users: int
+    workspaces: int
+    projects: int
+    tasks: int
+    assignments: int
+    seconds: float
+
+
+def seed_dataset(
+    *,
+    users: int,
+    workspaces: int,
+    projects_per: int,
+    tasks_per: int,
+    assignees_per: int,
+    members_per: int = 10,
+    seed: int = 0,
+    chunk_size: int = 5000,
+    prefix: str = "perf",
+    progress: Optional[ProgressCallback] = None,
+) -> SeedSummary:
+    """
+    Insert a synthetic dataset with bulk inserts.
+
+    Rows are built in memory and written ``chunk_size`` at a time with
+    ``bulk_create``, M2M links included (through-table rows), so seeding
+    scales to millions of tasks. Distributions are skewed the way real
+    data is: a few users belong to many workspaces, project sizes vary
+    around ``tasks_per``, and statuses, priorities and due dates follow
+    STATUS_WEIGHTS, PRIORITY_WEIGHTS and DUE_DATE_WINDOW. The same ``seed``
+    produces the same dataset (due dates are relative to today).
+
+    Args:
+        users: Number of users
+        workspaces: Number of workspaces
+        projects_per: Projects per workspace
+        tasks_per: Average tasks per project (the total is exact)
+        assignees_per: Average assignees per task, picked among the workspace members
+        members_per: Members per workspace (the owner included)
+        seed: Random seed
+        chunk_size: Rows per INSERT
+        prefix: Username prefix; must not clash with existing usernames
+        progress: Called as ``progress(stage, done, total)`` after each chunk
+
+    Returns:
+        SeedSummary with the number of rows created per table
+    """
+    rng = random.Random(seed)
+    started = perf_counter()
+    report = progress or (lambda stage, done, total: None)
+    User = get_user_model()
+
+    password = make_password(SEED_PASSWORD)
+    user_ids = _insert(
+        User,
+        (
+            User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", password=password)
+            for i in range(users)
+        ),
+        users,
+        chunk_size,
+        "users",
+        report,
+    )
+
+    # Zipf-like popularity: the first users are members of many workspaces.
+    popularity = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(user_ids))))
+    owners = [rng.choice(user_ids) for _ in range(workspaces)]
+    workspace_ids = _insert(
+        Workspace,
+        (
+            Workspace(name=f"Workspace {i}", owner_id=owners[i], description="")
+            for i in range(workspaces)
+        ),
+        workspaces,
+        chunk_size,
+        "workspaces",
+        report,
+    )
+    members = {
+        workspace_id: _pick_members(rng, user_ids, popularity, owner_id, members_per)
+        for workspace_id, owner_id in zip(workspace_ids, owners)
+    }
+    Membership = Workspace.members.through
+    _insert(
+        Membership,
+        (
+            Membership(workspace_id=workspace_id, user_id=user_id)
+            for workspace_id, member_ids in members.items()
+            for user_id in member_ids
+        ),
+        sum(len(m) for m in members.values()),
+        chunk_size,
+        "memberships",
+        report,
+    )
+
+    project_workspaces = [w for w in workspace_ids for _ in range(projects_per)]
+    project_ids = _insert(
+        Project,
+        (
+            Project(name=f"Project {i}", workspace_id=workspace_id, description="")
+            for i, workspace_id in enumerate(project_workspaces)
+        ),
+        len(project_workspaces),
+        chunk_size,
+        "projects",
+        report,
+    )
+
+    total_tasks = len(project_ids) * tasks_per
+    sizes = _split(rng, total_tasks, len(project_ids))
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time(17)))
+    Assignment = Task.assignees.through
+    assignments = 0
+    done = 0
+    column_sizes = collections.Counter()
+    task_projects = (
+        (project_id, members[workspace_id])
+        for project_id, workspace_id, size in zip(project_ids, project_workspaces, sizes)
+        for _ in range(size)
+    )
+    for chunk in _chunks(task_projects, chunk_size):
+        tasks = []
+        for i, (project_id, project_members) in enumerate(chunk):
+            due_date = None
+            if rng.random() < DUE_DATE_SHARE:
+                due_date = today + timedelta(days=rng.randint(*DUE_DATE_WINDOW))
+            author_id = rng.choice(project_members)
+            task_status = rng.choices(statuses, status_weights)[0]
+            tasks.append(
+                Task(
+                    name=f"Task {done + i}",
+                    project_id=project_id,
+                    author_id=author_id,
+                    status=task_status,
+                    priority=rng.choices(priorities, priority_weights)[0],
+                    due_date=due_date,
+                    position=integer_key(column_sizes[project_id, task_status]),
+                )
+            )
+            column_sizes[project_id, task_status] += 1
+        links = []
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            for task, (_, project_members) in zip(tasks, chunk):
+                # 0 to 2 * assignees_per assignees, assignees_per on average
+                count = sum(rng.random() < 0.5 for _ in range(2 * assignees_per))
+                for user_id in rng.sample(project_members, min(count, len(project_members))):
+                    links.append(Assignment(task_id=task.id, user_id=user_id))
+            Assignment.objects.bulk_create(links)
+        assignments += len(links)
+        done += len(tasks)
+        report("tasks", done, total_tasks)
+
+    return SeedSummary(
+        users=len(user_ids),
+        workspaces=len(workspace_ids),
+        projects=len(project_ids),
+        tasks=done,
+        assignments=assignments,
+        seconds=perf_counter() - started,
+    )
+
+
+def _pick_members(
+    rng: random.Random, user_ids: list[int], popularity: list[float], owner_id: int, count: int
+) -> list[int]:
+    picked = {owner_id}
+    target = min(count, len(user_ids))
+    while len(picked) < target:
+        picked.update(rng.choices(user_ids, cum_weights=popularity, k=target - len(picked)))
+    picked.discard(owner_id)
+    return [owner_id] + sorted(picked)[: target - 1]
+
+
+def _split(rng: random.Random, total: int, parts: int) -> list[int]:
+    """Split ``total`` into ``parts`` skewed (log-normal) sizes that add up exactly."""
+    if not parts:
+        return []
+    weights = [rng.lognormvariate(0, 0.75) for _ in range(parts)]
+    scale = total / sum(weights)
+    sizes = [int(weight * scale) for weight in weights]
+    for index in rng.sample(range(parts), total - sum(sizes)):
+        sizes[index] += 1
+    return sizes
+
+
+def _chunks(rows: Iterator, size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(model, rows, total: int, chunk_size: int, stage: str, report) -> list[int]:
+    ids: list[int] = []
+    for chunk in _chunks(rows, chunk_size):
+        with transaction.atomic():
+            ids.extend(obj.pk for obj in model.objects.bulk_create(chunk))
+        report(stage, len(ids), total)
+    return ids
@@ -0,0 +1,317 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from utils import metrics as prometheus
+
+logger = logging.getLogger(__name__)
+
+
+class SignedURLCache:
+    """
+    Two-tier cache of presigned URLs, valid for one fixed time bucket.
+
+    Time is cut into buckets of ``bucket_seconds`` aligned to the epoch. The
+    first lookup of a name in a bucket signs a URL and every later lookup in
+    the same bucket returns that exact URL: from a per-process LRU of
+    ``max_entries`` names, else from the shared ``cache_alias`` cache, where
+    ``cache.add`` makes concurrent signers in different workers agree on the
+    first URL stored. Clients therefore see the same URL for a whole bucket
+    and can cache the object, and signing happens once per name and bucket.
+
+    A URL is handed out until its bucket ends, so it has to be signed for
+    longer than a bucket; what is left of its lifetime after that is how long
+    clients can still use it.
+    """
+
+    def __init__(self, bucket_seconds: int, max_entries: int, cache_alias: str):
+        self.bucket_seconds = bucket_seconds
+        self.max_entries = max_entries
+        self.cache_alias = cache_alias
+        self._entries: OrderedDict[str, tuple[int, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_sign(
+        self, name: str, sign: Callable[[], str], now: Optional[float] = None
+    ) -> str:
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds)
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == bucket:
+                self._entries.move_to_end(name)
+                prometheus.record_cache_access("signed_url_local", True)
+                return entry[1]
+        prometheus.record_cache_access("signed_url_local", False)
+
+        cache = caches[self.cache_alias]
+        digest = hashlib.sha256(name.encode()).hexdigest()[:32]
+        key = f"signed-url:{bucket}:{digest}"
+        url = cache.get(key)
+        prometheus.record_cache_access("signed_url_shared", url is not None)
+        if url is None:
+            url = sign()
+            remaining = (bucket + 1) * self.bucket_seconds - now
+            if not cache.add(key, url, max(1, int(remaining) + 1)):
+                # Another worker signed it first; hand out the same URL
+                url = cache.get(key, url)
+
+        with self._lock:
+            self._entries[name] = (bucket, url)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return url
+
+
+class SignedURLCacheMixin:
+    """
+    Storage mixin serving ``url()`` from a ``SignedURLCache``.
+
+    For query-string authenticated backends (``S3Boto3Storage`` with
+    ``AWS_QUERYSTRING_AUTH``), where every ``url()`` call would otherwise
+    presign a new, different URL. Calls with ``parameters``, ``expire`` or
+    ``http_method`` bypass the cache. Configure with
+    ``SIGNED_URL_BUCKET_SECONDS``, ``SIGNED_URL_CACHE_SIZE`` and
+    ``SIGNED_URL_CACHE``; ``AWS_QUERYSTRING_EXPIRE`` must be longer than a
+    bucket.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if settings.SIGNED_URL_BUCKET_SECONDS >= self.querystring_expire:
+            raise ImproperlyConfigured(
+                "SIGNED_URL_BUCKET_SECONDS must be shorter than AWS_QUERYSTRING_EXPIRE"
+            )
+        self.signed_urls = SignedURLCache(
+            bucket_seconds=settings.SIGNED_URL_BUCKET_SECONDS,
+            max_entries=settings.SIGNED_URL_CACHE_SIZE,
+            cache_alias=settings.SIGNED_URL_CACHE,
+        )
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if parameters or expire is not None or http_method or not self.querystring_auth:
+            return super().url(name, parameters, expire, http_method)
+        sign = super().url
+        return self.signed_urls.get_or_sign(name, lambda: sign(name))
+
+
+class DiskCache:
+    """
+    Size-bounded LRU of remote files on local disk.
+
+    Each name is stored as a plain file, ``<directory>/<ab>/<sha256 of name>``,
+    next to a ``.etag`` file holding the remote ETag; the ETag file's mtime is
+    when the copy was last known to be current. Files are written to a
+    temporary name and renamed into place, so every process on the host can
+    share the directory. Hits bump the file's mtime, and once the files add
+    up to more than ``max_bytes`` the least recently used are deleted until
+    they are back under 90% of it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None  # estimate, corrected by every trim
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        digest = hashlib.sha256(name.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, name: str) -> Optional[tuple[str, str, float]]:
+        """Return the cached file's path, ETag and when it was last validated."""
+        path = self.path(name)
+        try:
+            with open(path + ".etag") as fh:
+                etag = fh.read()
+            validated = os.stat(path + ".etag").st_mtime
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path, etag, validated
+
+    def mark_valid(self, name: str) -> None:
+        os.utime(self.path(name) + ".etag")
+
+    def put(self, name: str, chunks: Iterable[bytes], etag: str) -> str:
+        """Store ``chunks`` as the cached copy of ``name``; return its path."""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = 0
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                    size += len(chunk)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "w") as fh:
+            fh.write(etag)
+        os.replace(temp, path + ".etag")
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()[0]
+            else:
+                self._size += size
+            full = self._size > self.max_bytes
+        if full:
+            self.trim()
+        return path
+
+    def discard(self, name: str) -> None:
+        path = self.path(name)
+        for stale in (path + ".etag", path):
+            try:
+                os.unlink(stale)
+            except FileNotFoundError:
+                pass
+
+    def trim(self) -> None:
+        """Delete least recently used files until under 90% of ``max_bytes``."""
+        total, files = self._disk_usage()
+        if total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            for mtime, size, path in sorted(files):
+                if total <= target:
+                    break
+                for stale in (path + ".etag", path):
+                    try:
+                        os.unlink(stale)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+        with self._lock:
+            self._size = total
+
+    def _disk_usage(self) -> tuple[int, list[tuple[float, int, str]]]:
+        total, files = 0, []
+        if not os.path.isdir(self.directory):
+            return 0, files
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".") or entry.name.endswith(".etag"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                total += stat.st_size
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return total, files
+
+
+class DiskCacheMixin:
+    """
+    ``S3Boto3Storage`` mixin reading files through a local ``DiskCache``.
+
+    ``open()`` for reading returns a real file on local disk (so it has a
+    ``fileno()``: it can be mmapped or passed to ``sendfile``), downloading
+    the object only on a miss. Saved files are kept too, so reading back an
+    upload (thumbnails) does not download it. A copy older than
+    ``MEDIA_DISK_CACHE_REVALIDATE_SECONDS`` is revalidated with a conditional
+    GET (``If-None-Match``), which costs a round trip but no transfer when the
+    object did not change. Hits, misses and revalidations are counted in the
+    Prometheus metrics (cache ``media_disk``). Configure with
+    ``MEDIA_DISK_CACHE_DIR`` (empty disables the cache),
+    ``MEDIA_DISK_CACHE_MAX_BYTES`` and ``MEDIA_DISK_CACHE_REVALIDATE_SECONDS``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.disk_cache = None
+        if settings.MEDIA_DISK_CACHE_DIR:
+            self.disk_cache = DiskCache(
+                settings.MEDIA_DISK_CACHE_DIR, settings.MEDIA_DISK_CACHE_MAX_BYTES
+            )
+
+    def _open(self, name, mode="rb"):
+        if self.disk_cache is None or any(flag in mode for flag in "wa+"):
+            return super()._open(name, mode)
+        return File(open(self.cached_path(name), mode), name)
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        if self.disk_cache is not None:
+            # Keep what was just uploaded: it is usually read back right away
+            # (thumbnails). No ETag yet, so the first revalidation downloads it.
+            content.seek(0)
+            self.disk_cache.put(name, content.chunks(), etag="")
+        return name
+
+    def local_path(self, name: str) -> Optional[str]:
+        """Path of a current local copy of ``name``, or None; never downloads."""
+        if self.disk_cache is None:
+            return None
+        cached = self.disk_cache.get(name)
+        if cached is None:
+            return None
+        path, etag, validated = cached
+        if time.time() - validated >= settings.MEDIA_DISK_CACHE_REVALIDATE_SECONDS:
+            return None
+        return path
+
+    def cached_path(self, name: str) -> str:
+        """Local path of an up-to-date copy of ``name``, downloading it if needed."""
+        from botocore.exceptions import ClientError
+        from storages.utils import clean_name
+
+        cached = self.disk_cache.get(name)
+        if cached is not None:
+            path, etag, validated = cached
+            if time.time() - validated < settings.MEDIA_DISK_CACHE_REVALIDATE_SECONDS:
+                prometheus.record_cache_access("media_disk", True)
+                return path
+        prometheus.record_cache_access("media_disk", False)
+
+        params = {"Bucket": self.bucket_name, "Key": self._normalize_name(clean_name(name))}
+        if cached is not None:
+            params["IfNoneMatch"] = etag
+        try:
+            response = self.connection.meta.client.get_object(**params)
+        except ClientError as err:
+            status = err.response["ResponseMetadata"]["HTTPStatusCode"]
+            if status == 304:
+                prometheus.record_media_revalidation(changed=False)
+                self.disk_cache.mark_valid(name)
+                return path
+            if status == 404:
+                self.disk_cache.discard(name)
+                raise FileNotFoundError(f"File does not exist: {name}")
+            raise
+        if cached is not None:
+            prometheus.record_media_revalidation(changed=True)
+        logger.debug("Media cache fill", extra={"key": name})
+        return self.disk_cache.put(
+            name, response["Body"].iter_chunks(1024 * 1024), response["ETag"]
+        )
+
+    def delete(self, name):
+        super().delete(name)
+        if self.disk_cache is not None:
+            self.disk_cache.discard(name)
+
+    def delete_many(self, names: list[str]) -> list[str]:
+        failed = super().delete_many(names)
+        if self.disk_cache is not None:
+            for name in names:
+                self.disk_cache.discard(name)
+        return failed
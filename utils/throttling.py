@@ -0,0 +1,134 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from utils import metrics as prometheus
+
+logger = logging.getLogger("django.security.throttling")
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token-bucket throttle for DRF views.
+
+    A rate of ``"N/period"`` from ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]``
+    gives each client a bucket of N tokens refilled continuously at N per
+    period, so bursts of up to N requests pass and the sustained rate is
+    capped. Each bucket is a ``(tokens, updated_at)`` pair in the
+    ``THROTTLE_CACHE`` cache: one ``get`` and one ``set`` per request,
+    whatever the rate. DRF's own throttles keep every request timestamp of
+    the window instead.
+
+    The read-modify-write is not atomic, so concurrent requests from the
+    same client can occasionally share a token. With a per-process cache
+    (locmem) each worker keeps its own buckets; configure a shared cache
+    (``REDIS_URL``) to enforce the limit across workers.
+
+    Subclasses set ``scope`` and implement ``get_ident_for``.
+    """
+
+    def get_rate(self):
+        # Read on every instantiation (not at import) so settings overrides apply
+        if not settings.THROTTLE_ENABLED:
+            return None
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE]
+
+    def get_ident_for(self, request):
+        """Return the client identity the bucket belongs to (``None``: not throttled)."""
+        raise NotImplementedError(".get_ident_for() must be overridden")
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_for(request)
+        if ident is None:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        cache = self.cache
+        now = self.timer()
+        refill_per_second = self.num_requests / self.duration
+        tokens, updated_at = cache.get(key, (self.num_requests, now))
+        tokens = min(self.num_requests, tokens + (now - updated_at) * refill_per_second)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill_per_second
+            prometheus.THROTTLED_REQUESTS.labels(self.scope).inc()
+            # Sampled: a client hammering a route would otherwise flood the log;
+            # the Prometheus counter keeps the exact count.
+            logger.warning(
+                "Request throttled",
+                extra={"scope": self.scope, "key": key, "path": request.path, "sampled": True},
+            )
+            return False
+        # An untouched bucket refills completely within ``duration`` seconds,
+        # after which a missing key means the same thing as a full bucket.
+        cache.set(key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per authenticated user, per client IP for anonymous requests."""
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per client IP (see ``REST_FRAMEWORK["NUM_PROXIES"]``)."""
+
+    def get_ident_for(self, request):
+        return self.get_ident(request)
+
+
+class UsernameTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per username submitted in the request body (login attempts)."""
+
+    def get_ident_for(self, request):
+        username = request.data.get("username") if hasattr(request.data, "get") else None
+        if not isinstance(username, str) or not username:
+            return None
+        # Hashed: usernames may be long or contain characters cache keys can't
+        return hashlib.sha256(username.lower().encode()).hexdigest()[:32]
+
+
+class ListUserThrottle(UserTokenBucketThrottle):
+    scope = "list"
+
+
+class ListIPThrottle(IPTokenBucketThrottle):
+    scope = "list_ip"
+
+
+class LoginIPThrottle(IPTokenBucketThrottle):
+    scope = "login_ip"
+
+
+class LoginUsernameThrottle(UsernameTokenBucketThrottle):
+    scope = "login_username"
+
+
+class RegisterIPThrottle(IPTokenBucketThrottle):
+    scope = "register_ip"
+
+
+LIST_THROTTLES = [ListUserThrottle, ListIPThrottle]
+LOGIN_THROTTLES = [LoginIPThrottle, LoginUsernameThrottle]
@@ -0,0 +1,105 @@
+import io
+import urllib.request
+from pathlib import PurePosixPath
+from typing import Optional
+
+# Square edge lengths (px) rendered for every uploaded image
+SIZES = (32, 64, 256)
+# extension -> (Pillow format, save options). WebP for clients that accept it,
+# JPEG as the fallback every client can decode.
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+def thumbnail_name(name: str, size: int, extension: str) -> str:
+    """Storage name of one variant: ``avatars/a.png`` -> ``avatars/thumbs/a_64.webp``."""
+    path = PurePosixPath(name)
+    return str(path.parent / "thumbs" / f"{path.stem}_{size}.{extension}")
+
+
+def read_source(source: bytes | str) -> bytes:
+    """Return encoded image bytes given directly, as an http(s) URL or as a local path."""
+    if isinstance(source, bytes):
+        return source
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source, timeout=30) as response:
+            return response.read()
+    with open(source, "rb") as fh:
+        return fh.read()
+
+
+def render_thumbnails(
+    source: bytes | str, sizes=SIZES, max_pixels: Optional[int] = None
+) -> dict[tuple[int, str], bytes]:
+    """
+    Render square, centre-cropped thumbnails of an encoded image.
+
+    ``source`` is the image itself or where to read it from (see
+    ``read_source``), so the download too can happen in a worker process.
+    Returns the encoded bytes of every ``(size, extension)`` pair of ``sizes``
+    and ``FORMATS``. Only needs Pillow (imported here, not at module import),
+    so it can run in a worker process that has not set Django up.
+
+    Large uploads are cheap to shrink: JPEGs are decoded directly at 1/2 to
+    1/8 scale with ``draft()`` (DCT scaling, the full-size pixels are never
+    materialised), other formats are box-reduced by an integer factor with
+    ``reduce()`` before the final Lanczos resize.
+
+    Images with more than ``max_pixels`` pixels raise ``ValueError`` before
+    any pixel is decoded, so a decompression bomb that got stored anyway
+    cannot exhaust the worker's memory.
+    """
+    from PIL import Image, ImageOps
+
+    largest = max(sizes)
+    with Image.open(io.BytesIO(read_source(source))) as image:
+        if max_pixels is not None and image.width * image.height > max_pixels:
+            raise ValueError(f"Image has more than {max_pixels} pixels")
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+
+    side = min(image.size)
+    left, top = (image.width - side) // 2, (image.height - side) // 2
+    image = image.crop((left, top, left + side, top + side))
+    factor = side // (largest * 2)
+    if factor > 1:
+        image = image.reduce(factor)
+
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    if has_alpha:
+        # JPEG has no alpha channel: flatten onto white for the fallback
+        opaque = Image.new("RGB", image.size, "white")
+        opaque.paste(image, mask=image.getchannel("A"))
+    else:
+        opaque = image
+
+    rendered = {}
+    for size in sorted(sizes, reverse=True):
+        for extension, (format, options) in FORMATS.items():
+            source = image if format == "WEBP" else opaque
+            buffer = io.BytesIO()
+            source.resize((size, size), Image.Resampling.LANCZOS).save(
+                buffer, format, **options
+            )
+            rendered[size, extension] = buffer.getvalue()
+    return rendered
+
+
+def probe_image(head: bytes) -> tuple[str, int, int]:
+    """
+    Return the MIME type, width and height of an encoded image.
+
+    Only the header is parsed, so ``head`` may be just the first few hundred
+    KB of the file and the cost does not depend on the image size. Raises
+    ``ValueError`` if Pillow cannot identify it.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(head)) as image:
+            return Image.MIME.get(image.format, ""), image.width, image.height
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ValueError("Not a supported image") from e
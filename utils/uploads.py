@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadTooLarge(APIException, RequestDataTooBig):
+    """
+    An uploaded file is over ``FILE_UPLOAD_MAX_BYTES``.
+
+    A 413 from API views; as a ``SuspiciousOperation`` everywhere else (the
+    admin), which Django answers with a 400.
+    """
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Uploaded file is too large."
+    default_code = "upload_too_large"
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    """
+    First upload handler: stops a request as soon as a file is too large.
+
+    Every chunk passes through to the next handlers (memory, then a
+    temporary file past ``FILE_UPLOAD_MAX_MEMORY_SIZE``), so memory stays
+    bounded and a file over ``FILE_UPLOAD_MAX_BYTES`` is rejected when that
+    many bytes have arrived instead of after the whole body was read. A
+    request whose declared length cannot fit is rejected before any of it
+    is read.
+    """
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        # Room for one full file plus the form fields Django allows
+        limit = settings.FILE_UPLOAD_MAX_BYTES + (settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0)
+        if content_length > limit:
+            raise UploadTooLarge(self._detail())
+        return None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.FILE_UPLOAD_MAX_BYTES:
+            raise UploadTooLarge(self._detail())
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+    def _detail(self):
+        return f"Uploaded files can be at most {settings.FILE_UPLOAD_MAX_BYTES} bytes."
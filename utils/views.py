@@ -0,0 +1,184 @@
+import mimetypes
+import os
+import re
+import stat
+from typing import Optional
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET, require_safe
+
+from utils.instrumentation import query_budget
+from utils.metrics import render_metrics
+
+
+@query_budget(0)
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Prometheus scrape endpoint.
+
+    When METRICS_TOKEN is set the scraper must send it as a bearer token.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        provided = request.headers.get("Authorization", "")
+        if not constant_time_compare(provided, expected):
+            return HttpResponse(status=401)
+    payload, content_type = render_metrics()
+    return HttpResponse(payload, content_type=content_type)
+
+
+# Names derived from the content (avatars, their thumbnails) or random ones
+# (direct uploads): the file behind them never changes
+IMMUTABLE_NAME = re.compile(r"(^|/)[0-9a-f]{32}(_\d+)?\.\w+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Anything else may be replaced in place: cache, but revalidate (ETag)
+MUTABLE_CACHE_CONTROL = "public, no-cache"
+
+
+class FileRange:
+    """
+    ``length`` bytes of an open file, from its current position.
+
+    Reads stop at the end of the range, so Django streams just the range,
+    while ``fileno()`` lets the WSGI server's ``wsgi.file_wrapper`` send it
+    with ``sendfile()`` (gunicorn starts at the file's position and sends
+    ``Content-Length`` bytes).
+    """
+
+    def __init__(self, file, length: int):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def seekable(self) -> bool:
+        # Keeps FileResponse from measuring the whole file as Content-Length
+        return False
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def parse_byte_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    First and last byte of a single ``Range: bytes=...`` request.
+
+    Returns None when the whole file should be sent instead: no header, a
+    malformed one, or several ranges (RFC 9110 lets servers ignore
+    ``Range``). Raises ``ValueError`` when the range is unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first + last).isdigit():
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = size - 1 if not last else min(int(last), size - 1)
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    if end < start:
+        return None
+    return start, end
+
+
+@query_budget(0)
+@require_safe
+def media(request: HttpRequest, path: str) -> HttpResponse:
+    """
+    Serve an uploaded file from ``MEDIA_ROOT`` (local storage only).
+
+    Sends ``ETag`` and ``Last-Modified`` and answers conditional requests
+    with 304 or 412. A single ``Range`` (checked against ``If-Range``) gets
+    a 206. Files go out through ``FileResponse``, which WSGI servers send
+    with ``sendfile()``. With ``MEDIA_SENDFILE_HEADER`` set to
+    ``X-Accel-Redirect`` (nginx, under ``MEDIA_ACCEL_REDIRECT_PREFIX``) or
+    ``X-Sendfile`` (Apache, lighttpd) the front server sends the file and
+    handles ranges itself. Content-addressed names are cached for a year as
+    immutable.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("File not found")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("File not found")
+
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    last_modified = int(st.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if IMMUTABLE_NAME.search(path) else MUTABLE_CACHE_CONTROL
+        ),
+    }
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        for header, value in headers.items():
+            conditional[header] = value
+        return conditional
+
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    if settings.MEDIA_SENDFILE_HEADER:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        if settings.MEDIA_SENDFILE_HEADER == "X-Accel-Redirect":
+            relative = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, "/")
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(relative)
+        else:
+            response[settings.MEDIA_SENDFILE_HEADER] = full_path
+        return response
+
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if "Range" in request.headers and if_range in (None, etag, headers["Last-Modified"]):
+        try:
+            byte_range = parse_byte_range(request.headers["Range"], st.st_size)
+        except ValueError:
+            return HttpResponse(
+                status=416, headers={**headers, "Content-Range": f"bytes */{st.st_size}"}
+            )
+
+    file = open(full_path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type, headers=headers)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(
+            FileRange(file, end - start + 1),
+            status=206,
+            content_type=content_type,
+            headers=headers,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+    response["Accept-Ranges"] = "bytes"
+    return response